@@ -1,7 +1,14 @@
+import os
+import sys
 import streamlit as st
 import altair as alt
 import pandas as pd
 
+# Seniority tags are shared with the pipeline
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.config import SENIOR_PLUS_LEVELS
+from src.utils import match_seniority
+
 def apply_custom_css():
     """
     Applies custom CSS to enhance the dashboard aesthetics.
@@ -154,9 +161,8 @@ def render_job_card(job, type="added"):
     if len(loc_str_list) > 2:
         loc_display += f" +{len(loc_str_list)-2}"
         
-    # Seniority check (simple keyword based for visual tag)
-    title_lower = title.lower()
-    is_senior = any(x in title_lower for x in ['senior', 'staff', 'principal', 'lead', 'director'])
+    # Seniority tag comes from the card; legacy cards without it are classified the same way
+    is_senior = (job.get('seniority') or match_seniority(title.lower())) in SENIOR_PLUS_LEVELS
     
     tags = []
     if is_us: tags.append('<span class="chip us">US</span>')
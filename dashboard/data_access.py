@@ -1,12 +1,16 @@
 import os
+import sys
 import json
 import sqlite3
 import pandas as pd
 from datetime import datetime, timedelta
-import glob
 
 # Constants
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Snapshot/diff decoding is shared with the pipeline (gzip NDJSON + legacy .json)
+sys.path.append(BASE_DIR)
+from src.storage import snapshots
 DB_PATH = os.path.join(BASE_DIR, "news.db")
 COMPANIES_PATH = os.path.join(BASE_DIR, "src", "config", "companies.json")
 DATA_DIFFS_DIR = os.path.join(BASE_DIR, "data", "diffs")
@@ -52,11 +56,39 @@ def toggle_star(slug):
     finally:
         conn.close()
 
+def _manifest_query(sql: str, params) -> list:
+    """Runs a snapshot_manifest query; returns [] when the table is missing/empty."""
+    conn = get_connection()
+    try:
+        return conn.execute(sql, params).fetchall()
+    except sqlite3.Error:
+        return []
+    finally:
+        conn.close()
+
+
+def _manifest_complete() -> bool:
+    """True once scripts/build_manifest.py has indexed the files written before the manifest existed."""
+    return bool(_manifest_query("SELECT 1 FROM snapshot_manifest_state WHERE name='indexed_at'", ()))
+
+
+def _manifest_path(path: str) -> str:
+    return path if os.path.isabs(path) else os.path.join(BASE_DIR, path)
+
+
 def get_open_job_count(slug, ats_type=None):
     """
     Returns total open filtered jobs by finding the latest snapshot in data/filtered.
     If ats_type is not provided, tries to find it.
     """
+    # Indexed: latest filtered snapshot already records its job count
+    rows = _manifest_query(
+        "SELECT job_count FROM snapshot_manifest WHERE company_slug=? AND kind='filtered' ORDER BY run_timestamp DESC LIMIT 1",
+        (slug,),
+    )
+    if rows:
+        return int(rows[0][0] or 0)
+
     slug_safe = slug.replace(" ", "_").lower()
     
     # If we don't know ATS, searching might be slow, but let's try assuming structure:
@@ -84,18 +116,17 @@ def get_open_job_count(slug, ats_type=None):
     # Find latest json file
     # Files are named by timestamp, so mapping sort works
     try:
-        files = glob.glob(os.path.join(target_dir, "*.json"))
+        files = snapshots.list_files(target_dir)
         if not files:
             return 0
             
-        # Get latest file by string creation time or filename (iso format sorts correctly)
-        latest_file = max(files, key=os.path.basename)
+        # Get latest file by timestamp (iso format sorts correctly)
+        latest_file = files[max(files)]
         
-        with open(latest_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            if isinstance(data, list):
-                return len(data)
-            return 0
+        data = snapshots.load(latest_file)
+        if isinstance(data, list):
+            return len(data)
+        return 0
     except Exception as e:
         print(f"Error reading open jobs for {slug}: {e}")
         return 0
@@ -347,42 +378,51 @@ def get_company_news_daily(company_slug=None, start_date=None, end_date=None):
 
 def get_diff_for(company_slug, date_str):
     found_file = None
-    if os.path.exists(DATA_DIFFS_DIR):
+    rows = _manifest_query(
+        """
+        SELECT path FROM snapshot_manifest
+        WHERE company_slug=? AND kind='diff' AND run_timestamp >= ? AND run_timestamp < ?
+        ORDER BY run_timestamp DESC LIMIT 1
+        """,
+        (company_slug, f"{date_str}T", f"{date_str}U"),
+    )
+    if rows and snapshots.exists(_manifest_path(rows[0][0])):
+        found_file = _manifest_path(rows[0][0])
+    if not found_file and os.path.exists(DATA_DIFFS_DIR):
         for ats in os.listdir(DATA_DIFFS_DIR):
             ats_dir = os.path.join(DATA_DIFFS_DIR, ats)
             if not os.path.isdir(ats_dir): continue
             slug_dir = os.path.join(ats_dir, company_slug)
             if os.path.isdir(slug_dir):
-                for filename in os.listdir(slug_dir):
-                    if filename.endswith(".json") and date_str in filename:
-                        found_file = os.path.join(slug_dir, filename)
+                for ts_str, path in snapshots.list_files(slug_dir, include_archived=True).items():
+                    if date_str in ts_str:
+                        found_file = path
                         break
             if found_file: break
-    if found_file and os.path.exists(found_file):
+    if found_file and snapshots.exists(found_file):
         try:
-            with open(found_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return snapshots.load(found_file)
         except Exception as e:
             print(f"Error reading diff file {found_file}: {e}")
             return None
     return None
 
 def get_available_diff_dates(company_slug):
-    dates = set()
-    if os.path.exists(DATA_DIFFS_DIR):
+    rows = _manifest_query(
+        "SELECT DISTINCT substr(run_timestamp, 1, 10) FROM snapshot_manifest WHERE company_slug=? AND kind='diff'",
+        (company_slug,),
+    )
+    dates = set(r[0] for r in rows)
+    # Until the manifest has been backfilled, older diffs exist only on disk
+    if not _manifest_complete() and os.path.exists(DATA_DIFFS_DIR):
         for ats in os.listdir(DATA_DIFFS_DIR):
             ats_dir = os.path.join(DATA_DIFFS_DIR, ats)
             if not os.path.isdir(ats_dir): continue
             slug_dir = os.path.join(ats_dir, company_slug)
             if os.path.isdir(slug_dir):
-                for filename in os.listdir(slug_dir):
-                    if not filename.endswith(".json"): continue
-                    try:
-                        parts = filename.replace(".json", "").split("_")
-                        ts_str = parts[-1] 
-                        if len(ts_str) >= 10:
-                            dates.add(ts_str[:10])
-                    except: pass
+                for ts_str in snapshots.list_files(slug_dir, include_archived=True):
+                    if len(ts_str) >= 10:
+                        dates.add(ts_str[:10])
     return sorted(list(dates), reverse=True)
 
 def get_recent_added_jobs(days_back=7):
@@ -398,30 +438,24 @@ def get_recent_added_jobs(days_back=7):
         
         if not os.path.exists(slug_dir): continue
         
-        for filename in os.listdir(slug_dir):
-            if not filename.endswith(".json"): continue
+        for ts_str, filepath in snapshots.list_files(slug_dir).items():
             try:
-                # Safer parsing
-                parts = filename.replace(".json", "").split("_")
-                ts_str = parts[-1]
                 if len(ts_str) < 10: continue
                 file_date = ts_str[:10]
                 
                 if file_date >= start_date:
-                    filepath = os.path.join(slug_dir, filename)
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        # Support top-level or nested added
-                        added = data.get("added", [])
-                        if not added:
-                            added = data.get("details", {}).get("added", [])
-                            
-                        for job in added:
-                            # Parse locations to string here to avoid display bugs later?
-                            # Or just pass raw.
-                            job["_company"] = slug
-                            job["_date_added"] = file_date
-                            all_added_jobs.append(job)
+                    data = snapshots.load(filepath)
+                    # Support top-level or nested added
+                    added = data.get("added", [])
+                    if not added:
+                        added = data.get("details", {}).get("added", [])
+                        
+                    for job in added:
+                        # Parse locations to string here to avoid display bugs later?
+                        # Or just pass raw.
+                        job["_company"] = slug
+                        job["_date_added"] = file_date
+                        all_added_jobs.append(job)
                             
             except Exception: continue
             
@@ -556,6 +590,20 @@ def get_company_signals(company_slug=None, start_date=None, end_date=None, *, lo
     return _read_sql(query, params=params)
 
 
+def get_range_diff(start_date: str, end_date: str, company_slug=None) -> dict:
+    """Net added/removed/changed jobs between two dates (see src.analytics.range_diff)."""
+    from src.analytics.range_diff import compute_range_diff
+
+    conn = get_connection()
+    try:
+        return compute_range_diff(start_date, end_date, company_slug, conn=conn)
+    except sqlite3.OperationalError:
+        # DB predates the job_changes table
+        return {}
+    finally:
+        conn.close()
+
+
 def get_company_lifespan(company_slug: str, as_of_date: str, *, window_days: int = 180) -> pd.DataFrame:
     return _read_sql(
         """
@@ -111,6 +111,26 @@ def calculate_company_opportunity_score(stats, news_counts, open_now_count=0):
         "breakdown": breakdown
     }
 
+def location_facets(locations):
+    """
+    Returns the set of lowercased location facets for a job's locations:
+    city, state, metro, raw string and "remote" for remote locations.
+    """
+    facets = set()
+    if not isinstance(locations, list):
+        return {str(locations).lower()}
+    for loc in locations:
+        if isinstance(loc, dict):
+            for key in ("city", "state", "metro", "raw", "name"):
+                val = loc.get(key)
+                if val:
+                    facets.add(str(val).lower())
+            if loc.get("is_remote"):
+                facets.add("remote")
+        elif loc:
+            facets.add(str(loc).lower())
+    return facets
+
 def calculate_role_match_score(job, days_ago_added=0):
     """
     Calculates a Role Match Score based on keywords, seniority, and location.
@@ -139,14 +159,13 @@ def calculate_role_match_score(job, days_ago_added=0):
     if pref > 0: reasons.append(seniority)
     
     # 3. Location
-    # We check the serialized location strings via loc_str
-    # Assuming caller passes clean data or we check dict
-    # Simple check:
-    locs = job.get("locations", [])
-    loc_text = str(locs).lower()
+    # Match preferences against parsed facets (city/state/metro) + the raw string,
+    # not the repr of the location dicts (which always contains "is_remote").
+    facets = location_facets(job.get("locations", []))
+    loc_text = " | ".join(sorted(facets))
     
     for loc_pref in USER_PROFILE["location_preference"]:
-        if loc_pref in loc_text:
+        if loc_pref in facets or loc_pref in loc_text:
             score += 5
             # reasons.append("Location Match")
             break
@@ -0,0 +1,47 @@
+import os
+import sys
+import copy
+import argparse
+
+# Ensure src module is in path
+sys.path.append(os.getcwd())
+
+from src.config import RETENTION_POLICY
+from src.news.models import init_db
+from src.storage.retention import apply_retention
+
+
+def main(policy, dry_run=False):
+    """
+    Rolls snapshots/diffs older than the hot window into per-company monthly
+    archives (data/{kind}/{ats}/{slug}/archive/YYYY-MM.zip).
+    """
+    init_db()
+    totals = apply_retention(policy, dry_run=dry_run)
+
+    verb = "Would archive" if dry_run else "Archived"
+    for kind, t in totals.items():
+        print(
+            f"{kind}: {verb} {t['archived']} files ({t['bytes'] / 1e6:.1f} MB), "
+            f"rewrote {t['rewritten']} deltas as full bases, refused {t['refused']}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply snapshot retention: archive old runs into monthly zips")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be archived")
+    parser.add_argument("--raw-days", type=int, help="Hot window for data/raw (days)")
+    parser.add_argument("--filtered-days", type=int, help="Hot window for data/filtered (days)")
+    parser.add_argument("--diff-days", type=int, help="Hot window for data/diffs (days)")
+    parser.add_argument("--keep-min", type=int, help="Newest runs per company that always stay hot")
+    args = parser.parse_args()
+
+    policy = copy.deepcopy(RETENTION_POLICY)
+    for kind, days in (("raw", args.raw_days), ("filtered", args.filtered_days), ("diff", args.diff_days)):
+        if days is not None:
+            policy[kind]["hot_days"] = days
+    if args.keep_min is not None:
+        for kind in policy:
+            policy[kind]["keep_min"] = args.keep_min
+
+    main(policy, dry_run=args.dry_run)
@@ -1,13 +1,15 @@
 import os
-import json
-import glob
-from datetime import datetime
+import argparse
+from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Tuple
 
 from src.news.models import init_db, get_connection
+from src.storage import history, snapshots
 from src.jobs.diff import _parse_discipline, _parse_seniority
-from src.analytics.lifespan import compute_company_lifespan_summary
-from src.analytics.signal_engine import compute_company_signal
+from src.jobs import dedupe, identity
+from src.analytics.lifespan import compute_company_lifespan_history, compute_company_lifespan_summary, sync_role_diffs
+from src.analytics.intervals import compute_repost_summary, sync_intervals
+from src.analytics.signal_engine import compute_company_signal, iter_signal_history, store_signals
 
 
 def _iter_snapshot_dirs(base_dir: str) -> List[Tuple[str, str]]:
@@ -29,7 +31,7 @@ def _iter_snapshot_dirs(base_dir: str) -> List[Tuple[str, str]]:
 
 
 def _job_key(job: Dict[str, Any]) -> Optional[str]:
-    return job.get("job_key") or job.get("id") or job.get("url")
+    return identity.job_key(job)
 
 
 def _run_date_from_ts(ts: str) -> str:
@@ -48,7 +50,7 @@ def backfill_from_snapshots(filtered_root: str = "data/filtered") -> None:
         print(f"Found {len(pairs)} company snapshot dirs under {filtered_root}")
 
         for company_slug, snapshot_dir in sorted(pairs, key=lambda x: x[0]):
-            files = sorted(glob.glob(os.path.join(snapshot_dir, "*.json")))
+            files = snapshots.sorted_paths(snapshot_dir)
             if not files:
                 continue
 
@@ -58,16 +60,13 @@ def backfill_from_snapshots(filtered_root: str = "data/filtered") -> None:
 
             print(f"Backfilling {company_slug}: {len(files)} snapshots")
 
-            for path in files:
-                ts = os.path.basename(path).replace(".json", "")
-                try:
-                    date_str = _run_date_from_ts(ts)
-                except Exception:
-                    continue
+            # Intervals are rebuilt from the full history (reopen gaps included)
+            cur.execute("DELETE FROM job_intervals WHERE company_slug=?", (company_slug,))
 
+            # Sequential replay: each delta snapshot is applied to the previous run in memory
+            for ts, path, jobs in history.iter_snapshots(snapshot_dir):
                 try:
-                    with open(path, "r", encoding="utf-8") as f:
-                        jobs = json.load(f)
+                    date_str = _run_date_from_ts(ts)
                 except Exception:
                     continue
 
@@ -79,6 +78,9 @@ def backfill_from_snapshots(filtered_root: str = "data/filtered") -> None:
                     latest_ts_by_date[date_str] = ts
                     latest_open_by_date[date_str] = len(jobs)
 
+                # Near-duplicate clusters (only jobs not clustered before are signed)
+                dedupe.assign_clusters(company_slug, jobs, conn=conn, as_of_date=date_str)
+
                 # Lifecycle updates
                 curr_cards = []
                 curr_keys: set[str] = set()
@@ -91,26 +93,39 @@ def backfill_from_snapshots(filtered_root: str = "data/filtered") -> None:
                     title = job.get("title") or ""
                     url = job.get("url")
                     curr_keys.add(str(key))
-                    curr_cards.append((company_slug, str(key), date_str, date_str, title, url, _parse_discipline(title), _parse_seniority(title)))
+                    curr_cards.append((
+                        company_slug, str(key), date_str, date_str, title, url,
+                        job.get("discipline") or _parse_discipline(title),
+                        job.get("seniority") or _parse_seniority(title),
+                        job.get("cluster_id"),
+                    ))
 
                 # Upsert all present jobs (open)
                 cur.executemany(
                     """
                     INSERT INTO job_lifecycle
-                        (company_slug, job_key, first_seen_date, last_seen_date, closed_date, title, url, discipline, seniority)
-                    VALUES (?, ?, ?, ?, NULL, ?, ?, ?, ?)
+                        (company_slug, job_key, first_seen_date, last_seen_date, closed_date, title, url, discipline, seniority, cluster_id)
+                    VALUES (?, ?, ?, ?, NULL, ?, ?, ?, ?, ?)
                     ON CONFLICT(company_slug, job_key) DO UPDATE SET
                         last_seen_date=excluded.last_seen_date,
                         closed_date=NULL,
                         title=excluded.title,
                         url=excluded.url,
                         discipline=excluded.discipline,
-                        seniority=excluded.seniority
+                        seniority=excluded.seniority,
+                        cluster_id=COALESCE(excluded.cluster_id, job_lifecycle.cluster_id)
                     """,
                     curr_cards,
                 )
 
                 # Detect closures between prev and current snapshot
+                sync_intervals(
+                    conn,
+                    company_slug,
+                    date_str,
+                    [(row[1], row[-1]) for row in curr_cards],
+                    prev_keys - curr_keys,
+                )
                 if prev_keys:
                     removed = prev_keys - curr_keys
                     if removed:
@@ -126,6 +141,9 @@ def backfill_from_snapshots(filtered_root: str = "data/filtered") -> None:
 
                 prev_keys = curr_keys
 
+            # Distinct-role adds/removes per day (needs job_diffs_daily from backfill_diffs)
+            sync_role_diffs(company_slug, conn=conn)
+
             # Upsert open-now daily rows for this company
             open_rows = [(company_slug, d, latest_ts_by_date[d], latest_open_by_date[d]) for d in latest_ts_by_date.keys()]
             cur.executemany(
@@ -156,7 +174,9 @@ def compute_latest_summaries(window_days: int = 180, lookback_days: int = 7) ->
         print(f"Computing lifespan + signals for {len(slugs)} companies as-of {latest_date}")
 
         for slug in slugs:
-            summary = compute_company_lifespan_summary(slug, latest_date, window_days=window_days)
+            summary = compute_company_lifespan_summary(slug, latest_date, window_days=window_days, conn=conn)
+            start = (datetime.strptime(latest_date, "%Y-%m-%d") - timedelta(days=window_days)).strftime("%Y-%m-%d")
+            reposts = compute_repost_summary(slug, start, latest_date, conn=conn)
             cur.execute(
                 """
                 INSERT OR REPLACE INTO company_lifespan_daily (
@@ -164,9 +184,10 @@ def compute_latest_summaries(window_days: int = 180, lookback_days: int = 7) ->
                     median_days, p25_days, p75_days,
                     median_open_age_days,
                     pct_close_within_7d, pct_open_gt_30d, pct_open_gt_60d,
-                    age_bucket_0_3, age_bucket_4_7, age_bucket_8_14, age_bucket_15_30, age_bucket_30_plus
+                    age_bucket_0_3, age_bucket_4_7, age_bucket_8_14, age_bucket_15_30, age_bucket_30_plus,
+                    repost_rate, median_time_to_fill_days
                 )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """,
                 (
                     slug,
@@ -185,51 +206,145 @@ def compute_latest_summaries(window_days: int = 180, lookback_days: int = 7) ->
                     int(summary.age_bucket_8_14),
                     int(summary.age_bucket_15_30),
                     int(summary.age_bucket_30_plus),
+                    reposts.repost_rate,
+                    reposts.median_time_to_fill_days,
                 ),
             )
 
-            sig = compute_company_signal(slug, latest_date, lookback_days=lookback_days)
-            cur.execute(
+            sig = compute_company_signal(slug, latest_date, lookback_days=lookback_days, conn=conn)
+            store_signals([sig], conn=conn)
+
+        conn.commit()
+        print("Computed lifespan summaries + signals (latest date)")
+    finally:
+        conn.close()
+
+
+def backfill_lifespan_history(
+    start_date: str,
+    end_date: Optional[str] = None,
+    window_days: Tuple[int, ...] = (180,),
+) -> None:
+    """
+    Fills company_lifespan_daily for every day in [start_date, end_date] (default:
+    latest job_diffs_daily date) and every window, one interval sweep per company.
+    Repost columns of existing rows are kept (compute_latest_summaries fills them).
+    """
+    init_db()
+    conn = get_connection()
+    try:
+        cur = conn.cursor()
+        if not end_date:
+            end_date = cur.execute("SELECT MAX(date) FROM job_diffs_daily").fetchone()[0]
+            if not end_date:
+                print("No job_diffs_daily data found; cannot compute summaries.")
+                return
+        first = datetime.strptime(start_date, "%Y-%m-%d")
+        days = (datetime.strptime(end_date, "%Y-%m-%d") - first).days + 1
+        dates = [(first + timedelta(days=n)).strftime("%Y-%m-%d") for n in range(days)]
+
+        slugs = [r[0] for r in cur.execute("SELECT DISTINCT company_slug FROM job_diffs_daily").fetchall()]
+        print(f"Computing lifespan history {start_date} -> {end_date} (windows {list(window_days)}) for {len(slugs)} companies")
+
+        rows = 0
+        for slug in slugs:
+            history_rows = [
+                (
+                    slug, as_of, int(w), int(summary.closed_roles_count),
+                    summary.median_days, summary.p25_days, summary.p75_days,
+                    summary.median_open_age_days,
+                    summary.pct_close_within_7d, summary.pct_open_gt_30d, summary.pct_open_gt_60d,
+                    int(summary.age_bucket_0_3), int(summary.age_bucket_4_7), int(summary.age_bucket_8_14),
+                    int(summary.age_bucket_15_30), int(summary.age_bucket_30_plus),
+                )
+                for (as_of, w), summary in compute_company_lifespan_history(slug, dates, window_days=window_days, conn=conn).items()
+            ]
+            cur.executemany(
                 """
-                INSERT OR REPLACE INTO company_signals_daily (
-                    company_slug, date, lookback_days,
-                    momentum_state, momentum_label, momentum_score,
-                    is_mover, mover_reason,
-                    timing_hint, timing_confidence,
-                    best_post_weekday, best_remove_weekday,
-                    headline_title, headline_url,
-                    created_at
+                INSERT INTO company_lifespan_daily (
+                    company_slug, date, window_days, closed_roles_count,
+                    median_days, p25_days, p75_days,
+                    median_open_age_days,
+                    pct_close_within_7d, pct_open_gt_30d, pct_open_gt_60d,
+                    age_bucket_0_3, age_bucket_4_7, age_bucket_8_14, age_bucket_15_30, age_bucket_30_plus
                 )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(company_slug, date, window_days) DO UPDATE SET
+                    closed_roles_count=excluded.closed_roles_count,
+                    median_days=excluded.median_days,
+                    p25_days=excluded.p25_days,
+                    p75_days=excluded.p75_days,
+                    median_open_age_days=excluded.median_open_age_days,
+                    pct_close_within_7d=excluded.pct_close_within_7d,
+                    pct_open_gt_30d=excluded.pct_open_gt_30d,
+                    pct_open_gt_60d=excluded.pct_open_gt_60d,
+                    age_bucket_0_3=excluded.age_bucket_0_3,
+                    age_bucket_4_7=excluded.age_bucket_4_7,
+                    age_bucket_8_14=excluded.age_bucket_8_14,
+                    age_bucket_15_30=excluded.age_bucket_15_30,
+                    age_bucket_30_plus=excluded.age_bucket_30_plus
                 """,
-                (
-                    sig.company_slug,
-                    sig.date,
-                    int(sig.lookback_days),
-                    sig.momentum_state,
-                    sig.momentum_label,
-                    float(sig.momentum_score),
-                    1 if sig.is_mover else 0,
-                    sig.mover_reason,
-                    sig.timing_hint,
-                    sig.timing_confidence,
-                    sig.best_post_weekday,
-                    sig.best_remove_weekday,
-                    sig.headline_title,
-                    sig.headline_url,
-                    datetime.utcnow().isoformat(),
-                ),
+                history_rows,
             )
+            rows += len(history_rows)
+        conn.commit()
+        print(f"Stored {rows} lifespan rows")
+    finally:
+        conn.close()
+
 
+def backfill_signal_history(
+    start_date: str,
+    end_date: Optional[str] = None,
+    lookback_days: int = 7,
+    workers: Optional[int] = None,
+) -> None:
+    """
+    Fills company_signals_daily for every day in [start_date, end_date] (default:
+    latest job_diffs_daily date). Each company's history is read once and rolled
+    forward day by day; companies are spread over `workers` processes.
+    """
+    init_db()
+    conn = get_connection()
+    try:
+        if not end_date:
+            end_date = conn.execute("SELECT MAX(date) FROM job_diffs_daily").fetchone()[0]
+            if not end_date:
+                print("No job_diffs_daily data found; cannot compute signals.")
+                return
+        workers = workers or os.cpu_count() or 1
+        print(f"Computing signals {start_date} -> {end_date} ({lookback_days}d lookback, {workers} workers)")
+
+        companies = rows = 0
+        for slug, sigs in iter_signal_history(start_date, end_date, lookback_days=lookback_days, workers=workers, conn=conn):
+            rows += store_signals(sigs, conn=conn)
+            companies += 1
         conn.commit()
-        print("Computed lifespan summaries + signals (latest date)")
+        print(f"Stored {rows} signals for {companies} companies")
     finally:
         conn.close()
 
 
 if __name__ == "__main__":
-    # 1) Reconstruct open-now + lifecycles from snapshot history (data/filtered)
-    backfill_from_snapshots()
-
-    # 2) Compute latest lifespan + signals (for dashboard usefulness immediately)
-    compute_latest_summaries(window_days=180, lookback_days=7)
+    parser = argparse.ArgumentParser(description="Backfill analytics tables from snapshot history")
+    parser.add_argument("--lifespan-from", help="Backfill lifespan history from this date (YYYY-MM-DD)")
+    parser.add_argument("--lifespan-windows", default="180", help="Comma-separated lifespan windows in days")
+    parser.add_argument("--signals-from", help="Backfill signal history from this date (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end_date", help="Last date of a history backfill (default: latest diff date)")
+    parser.add_argument("--lookback-days", type=int, default=7, help="Signal lookback window")
+    parser.add_argument("--workers", type=int, help="Processes for the signal backfill (default: CPU count)")
+    args = parser.parse_args()
+
+    if args.lifespan_from or args.signals_from:
+        # Lifespan first: signals read company_lifespan_daily for their timing hints
+        if args.lifespan_from:
+            windows = tuple(int(w) for w in args.lifespan_windows.split(",") if w.strip())
+            backfill_lifespan_history(args.lifespan_from, args.end_date, window_days=windows)
+        if args.signals_from:
+            backfill_signal_history(args.signals_from, args.end_date, lookback_days=args.lookback_days, workers=args.workers)
+    else:
+        # 1) Reconstruct open-now + lifecycles from snapshot history (data/filtered)
+        backfill_from_snapshots()
+
+        # 2) Compute latest lifespan + signals (for dashboard usefulness immediately)
+        compute_latest_summaries(window_days=180, lookback_days=args.lookback_days)
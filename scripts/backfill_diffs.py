@@ -1,11 +1,11 @@
 import os
-import json
 import sys
 
 # Ensure src module is in path
 sys.path.append(os.getcwd())
 
 from src.analytics.daily_sync import sync_job_diff
+from src.storage import snapshots
 
 DATA_DIFFS_DIR = "data/diffs"
 
@@ -31,19 +31,15 @@ def backfill_diffs():
             if not os.path.isdir(slug_dir):
                 continue
                 
-            # Iterate over diff files
-            for filename in os.listdir(slug_dir):
-                if not filename.endswith(".json"):
-                    continue
-                
-                filepath = os.path.join(slug_dir, filename)
+            # Iterate over diff files (including ones rolled into monthly archives)
+            for filepath in snapshots.sorted_paths(slug_dir, include_archived=True):
+                filename = os.path.basename(filepath)
                 
                 # Extract timestamp from filename
-                # Format: jobs_diff_{slug}_{timestamp}.json OR just {timestamp}.json
+                # Format: jobs_diff_{slug}_{timestamp}.<ext> OR just {timestamp}.<ext>
                 # We need the timestamp part.
                 try:
-                    parts = filename.replace(".json", "").split("_")
-                    run_timestamp = parts[-1]
+                    run_timestamp = snapshots.timestamp_from_path(filename)
                     
                     # Basic validation of timestamp format (optional but good)
                     # 2025-12-08T00-41-14Z is length 20
@@ -51,8 +47,7 @@ def backfill_diffs():
                          print(f"Skipping {filename}, could not parse timestamp.")
                          continue
 
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        diff_data = json.load(f)
+                    diff_data = snapshots.load(filepath)
                     
                     # Call the existing sync function
                     # It handles parsing the timestamp to date
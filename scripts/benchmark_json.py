@@ -0,0 +1,75 @@
+import os
+import sys
+import time
+import argparse
+
+# Ensure src module is in path
+sys.path.append(os.getcwd())
+
+from src.storage import serialization, snapshots
+
+DATA_DIRS = ["data/raw", "data/filtered", "data/diffs"]
+
+
+def _collect(roots, limit):
+    """Decompressed payloads of up to `limit` snapshot/diff files (legacy .json included)."""
+    payloads = []
+    for root in roots:
+        for dirpath, _, filenames in os.walk(root):
+            for filename in sorted(filenames):
+                if not snapshots.is_data_file(filename):
+                    continue
+                path = os.path.join(dirpath, filename)
+                payloads.append((path, snapshots.load(path)))
+                if len(payloads) >= limit:
+                    return payloads
+    return payloads
+
+
+def benchmark(roots=DATA_DIRS, limit=500, repeat=3):
+    """
+    Times dumps()/loads() of every backend over real snapshot/diff content.
+    Load is measured on each backend's own compact output.
+    """
+    payloads = _collect(roots, limit)
+    if not payloads:
+        print("No snapshot/diff files found.")
+        return
+    total_mb = sum(len(serialization._stdlib_dumps(d, False)) for _, d in payloads) / 1e6
+    print(f"{len(payloads)} files, {total_mb:.1f} MB of compact JSON")
+
+    original = serialization.BACKEND
+    results = {}
+    try:
+        for name in serialization.available_backends():
+            serialization.set_backend(name)
+            dump_s = load_s = float("inf")
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                encoded = [serialization.dumps(d) for _, d in payloads]
+                dump_s = min(dump_s, time.perf_counter() - t0)
+                # One document alive at a time, like the pipeline/dashboard readers
+                t0 = time.perf_counter()
+                for b in encoded:
+                    serialization.loads(b)
+                load_s = min(load_s, time.perf_counter() - t0)
+            if any(serialization.loads(b) != d for b, (_, d) in zip(encoded, payloads)):
+                print(f"{name}: round-trip mismatch!")
+            results[name] = (dump_s, load_s)
+    finally:
+        serialization.set_backend(original)
+
+    base_dump, base_load = results["json"]
+    for name, (dump_s, load_s) in results.items():
+        print(
+            f"{name:8s} dump {dump_s:6.2f}s ({base_dump / dump_s:4.1f}x)  "
+            f"load {load_s:6.2f}s ({base_load / load_s:4.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark JSON backends on the data/ tree")
+    parser.add_argument("--limit", type=int, default=500, help="Max files to sample")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions (best is reported)")
+    args = parser.parse_args()
+    benchmark(limit=args.limit, repeat=args.repeat)
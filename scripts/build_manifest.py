@@ -0,0 +1,76 @@
+import os
+import sys
+
+# Ensure src module is in path
+sys.path.append(os.getcwd())
+
+from src.news.models import init_db, get_connection
+from src.storage import manifest, snapshots
+
+DATA_DIRS = {
+    "raw": "data/raw",
+    "filtered": "data/filtered",
+    "diff": "data/diffs",
+}
+
+
+def _job_count(kind, data):
+    if kind == "diff":
+        summary = data.get("summary", {}) if isinstance(data, dict) else {}
+        return summary.get("added", 0) + summary.get("removed", 0) + summary.get("changed", 0)
+    if isinstance(data, dict) and "delta_of" in data:
+        return len(data.get("keys", []))
+    return len(data) if isinstance(data, list) else 0
+
+
+def build_manifest():
+    """
+    Indexes every snapshot/diff already on disk into snapshot_manifest.
+    Safe to re-run: rows are upserted by (company_slug, kind, run_timestamp).
+    """
+    init_db()
+    conn = get_connection()
+    count = 0
+    errors = 0
+    try:
+        for kind, root in DATA_DIRS.items():
+            if not os.path.isdir(root):
+                continue
+            for ats in os.listdir(root):
+                ats_dir = os.path.join(root, ats)
+                if not os.path.isdir(ats_dir):
+                    continue
+                for slug in os.listdir(ats_dir):
+                    slug_dir = os.path.join(ats_dir, slug)
+                    if not os.path.isdir(slug_dir):
+                        continue
+                    # Archived files too, so a clean pass leaves nothing only on disk
+                    for ts, path in snapshots.list_files(slug_dir, include_archived=True).items():
+                        if len(ts) < 15:
+                            continue
+                        try:
+                            payload = snapshots.read_bytes(path)
+                            data = snapshots.decode(payload, path)
+                            manifest.record(
+                                slug, ats, ts, kind, path,
+                                _job_count(kind, data), manifest.content_hash(payload),
+                                conn=conn,
+                            )
+                            count += 1
+                        except Exception as e:
+                            print(f"Failed to index {path}: {e}")
+                            errors += 1
+            conn.commit()
+            print(f"Indexed {kind} files under {root}")
+        # Only a clean pass makes the manifest authoritative for readers (see dashboard/data_access.py)
+        if not errors:
+            manifest.mark_complete(conn=conn)
+            conn.commit()
+    finally:
+        conn.close()
+
+    print(f"Manifest build complete. Indexed {count} files. Errors: {errors}")
+
+
+if __name__ == "__main__":
+    build_manifest()
@@ -0,0 +1,119 @@
+import os
+import sys
+import time
+import argparse
+
+# Ensure src module is in path
+sys.path.append(os.getcwd())
+
+from src.news.models import init_db, get_connection
+from src.storage import manifest, snapshots
+
+DATA_DIRS = {
+    "raw": "data/raw",
+    "filtered": "data/filtered",
+    "diff": "data/diffs",
+}
+
+
+def _iter_legacy_files(root):
+    """Yields (ats, slug, path) for every pretty-printed .json file under root."""
+    if not os.path.isdir(root):
+        return
+    for ats in sorted(os.listdir(root)):
+        ats_dir = os.path.join(root, ats)
+        if not os.path.isdir(ats_dir):
+            continue
+        for slug in sorted(os.listdir(ats_dir)):
+            slug_dir = os.path.join(ats_dir, slug)
+            if not os.path.isdir(slug_dir):
+                continue
+            for filename in sorted(os.listdir(slug_dir)):
+                if snapshots.split_ext(filename)[1] == ".json":
+                    yield ats, slug, os.path.join(slug_dir, filename)
+
+
+def _job_count(kind, data):
+    if kind == "diff":
+        summary = data.get("summary", {}) if isinstance(data, dict) else {}
+        return summary.get("added", 0) + summary.get("removed", 0) + summary.get("changed", 0)
+    return len(data) if isinstance(data, list) else 0
+
+
+def convert(dry_run=False, keep_originals=False):
+    """
+    One-shot conversion of legacy .json snapshots/diffs to the compressed encoding.
+    Each file is written under a temp name and verified by decoding it back before
+    it is renamed into place and the original removed; its manifest row is
+    repointed at the new file.
+    """
+    init_db()
+    conn = get_connection()
+
+    stats = {"files": 0, "errors": 0, "bytes_before": 0, "bytes_after": 0, "load_before": 0.0, "load_after": 0.0}
+    try:
+        for kind, root in DATA_DIRS.items():
+            for ats, slug, path in _iter_legacy_files(root):
+                ext = snapshots.DIFF_EXT if kind == "diff" else snapshots.SNAPSHOT_EXT
+                new_path = snapshots.split_ext(path)[0] + ext
+                try:
+                    t0 = time.perf_counter()
+                    data = snapshots.load(path)
+                    stats["load_before"] += time.perf_counter() - t0
+                    stats["bytes_before"] += os.path.getsize(path)
+
+                    payload = snapshots.encode(data, new_path)
+                    stats["bytes_after"] += len(payload)
+                    stats["files"] += 1
+                    if dry_run:
+                        continue
+
+                    # Verified under a temp name and renamed into place only if it
+                    # round-trips: list_files prefers the compressed encoding, so a
+                    # partial file at new_path would shadow the intact original.
+                    tmp_path = new_path + ".tmp"
+                    try:
+                        with open(tmp_path, "wb") as f:
+                            f.write(payload)
+
+                        t0 = time.perf_counter()
+                        with open(tmp_path, "rb") as f:
+                            check = snapshots.decode(f.read(), new_path)
+                        stats["load_after"] += time.perf_counter() - t0
+                        if check != data:
+                            raise ValueError("round-trip mismatch")
+                        os.replace(tmp_path, new_path)
+                    finally:
+                        if os.path.exists(tmp_path):
+                            os.remove(tmp_path)
+
+                    manifest.record(
+                        slug, ats, snapshots.timestamp_from_path(path), kind, new_path,
+                        _job_count(kind, data), manifest.content_hash(payload),
+                        conn=conn,
+                    )
+                    if not keep_originals:
+                        os.remove(path)
+                except Exception as e:
+                    print(f"Failed to convert {path}: {e}")
+                    stats["errors"] += 1
+            conn.commit()
+            print(f"Converted {kind} files under {root}")
+    finally:
+        conn.close()
+
+    before_mb = stats["bytes_before"] / 1e6
+    after_mb = stats["bytes_after"] / 1e6
+    ratio = (stats["bytes_before"] / stats["bytes_after"]) if stats["bytes_after"] else 0.0
+    print(f"Files: {stats['files']} (errors: {stats['errors']})")
+    print(f"Size: {before_mb:.1f} MB -> {after_mb:.1f} MB ({ratio:.1f}x smaller)")
+    if not dry_run:
+        print(f"Load time: {stats['load_before']:.2f}s (.json) -> {stats['load_after']:.2f}s (compressed)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert data/ snapshots + diffs to compressed NDJSON")
+    parser.add_argument("--dry-run", action="store_true", help="Only report size savings")
+    parser.add_argument("--keep-originals", action="store_true", help="Do not delete the legacy .json files")
+    args = parser.parse_args()
+    convert(dry_run=args.dry_run, keep_originals=args.keep_originals)
@@ -0,0 +1,53 @@
+import os
+import sys
+import argparse
+
+# Ensure src module is in path
+sys.path.append(os.getcwd())
+
+from src.storage import history
+from scripts.build_manifest import build_manifest
+
+DATA_DIRS = ["data/raw", "data/filtered"]
+
+
+def delta_encode(roots=DATA_DIRS):
+    """
+    One-shot migration: rewrites every company's snapshot history under data/raw
+    and data/filtered as periodic full bases + per-run deltas.
+    The manifest is rebuilt afterwards so its paths point at the new files.
+    """
+    total_before = 0
+    total_after = 0
+    for root in roots:
+        if not os.path.isdir(root):
+            continue
+        for ats in sorted(os.listdir(root)):
+            ats_dir = os.path.join(root, ats)
+            if not os.path.isdir(ats_dir):
+                continue
+            for slug in sorted(os.listdir(ats_dir)):
+                slug_dir = os.path.join(ats_dir, slug)
+                if not os.path.isdir(slug_dir):
+                    continue
+                try:
+                    before, after = history.rebase_directory(slug_dir)
+                except Exception as e:
+                    print(f"Failed to delta-encode {slug_dir}: {e}")
+                    continue
+                total_before += before
+                total_after += after
+                print(f"{slug_dir}: {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB")
+
+    ratio = (total_before / total_after) if total_after else 0.0
+    print(f"Total: {total_before / 1e6:.1f} MB -> {total_after / 1e6:.1f} MB ({ratio:.1f}x smaller)")
+
+    build_manifest()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Delta-encode snapshot history (full base every N runs + deltas)")
+    parser.add_argument("--interval", type=int, default=history.CHECKPOINT_INTERVAL, help="Runs between full bases")
+    args = parser.parse_args()
+    history.CHECKPOINT_INTERVAL = args.interval
+    delta_encode()
@@ -0,0 +1,55 @@
+import os
+import sys
+import json
+import argparse
+
+# Ensure src module is in path
+sys.path.append(os.getcwd())
+
+from src.news.models import init_db
+from src.analytics.range_diff import compute_range_diff
+
+
+def main(start_date, end_date, company_slug=None, as_json=False, limit=20):
+    """
+    Prints the net job changes between two dates, for one company or all of them.
+    Needs job_intervals/job_changes to be synced (run scripts/backfill_diffs.py once
+    to index field-level changes from existing diffs).
+    """
+    init_db()
+    result = compute_range_diff(start_date, end_date, company_slug)
+
+    if as_json:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+        return
+
+    scope = company_slug or "all companies"
+    s = result["summary"]
+    print(
+        f"{scope}, {start_date} -> {end_date}: +{s['added']} added ({s['senior_plus_added']} senior+), "
+        f"-{s['removed']} removed, ~{s['changed']} changed across {s['companies']} companies"
+    )
+    for label in ("added", "removed", "changed"):
+        items = result[label]
+        if not items:
+            continue
+        print(f"\n{label.capitalize()}:")
+        for job in items[:limit]:
+            extra = ""
+            if label == "changed":
+                extra = " [" + ", ".join(sorted(job["changes"])) + "]"
+            print(f"  {job['company_slug']}: {job.get('title') or job['job_key']}{extra}")
+        if len(items) > limit:
+            print(f"  ... {len(items) - limit} more")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Net job diff between two dates, from the analytics tables")
+    parser.add_argument("--start", required=True, help="Start date (YYYY-MM-DD, exclusive)")
+    parser.add_argument("--end", required=True, help="End date (YYYY-MM-DD, inclusive)")
+    parser.add_argument("--company", help="Company slug (default: all companies)")
+    parser.add_argument("--json", action="store_true", help="Print the full result as JSON")
+    parser.add_argument("--limit", type=int, default=20, help="Jobs listed per section")
+    args = parser.parse_args()
+
+    main(args.start, args.end, args.company, as_json=args.json, limit=args.limit)
@@ -0,0 +1,145 @@
+import os
+import sys
+import argparse
+from typing import Dict, List, Tuple
+
+# Ensure src module is in path
+sys.path.append(os.getcwd())
+
+from src.news.models import init_db, get_connection
+from src.jobs import identity
+from src.storage import history
+
+FILTERED_ROOT = "data/filtered"
+
+
+def _iter_company_dirs(base_dir: str) -> List[Tuple[str, str]]:
+    pairs: List[Tuple[str, str]] = []
+    if not os.path.isdir(base_dir):
+        return pairs
+    for ats in sorted(os.listdir(base_dir)):
+        ats_dir = os.path.join(base_dir, ats)
+        if not os.path.isdir(ats_dir):
+            continue
+        for slug in sorted(os.listdir(ats_dir)):
+            slug_dir = os.path.join(ats_dir, slug)
+            if os.path.isdir(slug_dir):
+                pairs.append((slug, slug_dir))
+    return pairs
+
+
+def key_mapping(snapshot_dir: str) -> Dict[str, str]:
+    """Legacy key -> stable key for every job ever seen in a company's filtered history."""
+    mapping: Dict[str, str] = {}
+    for _, _, jobs in history.iter_snapshots(snapshot_dir):
+        if not isinstance(jobs, list):
+            continue
+        for job in jobs:
+            if not isinstance(job, dict):
+                continue
+            old, new = identity.legacy_job_key(job), identity.job_key(job)
+            if old and new and old != new:
+                mapping[old] = new
+    return mapping
+
+
+def _rekey_lifecycle(cur, company_slug: str, mapping: Dict[str, str]) -> int:
+    """Moves lifecycle rows to their stable key, merging rows that now share one."""
+    moved = 0
+    for old, new in mapping.items():
+        row = cur.execute(
+            "SELECT first_seen_date, last_seen_date, closed_date FROM job_lifecycle WHERE company_slug=? AND job_key=?",
+            (company_slug, old),
+        ).fetchone()
+        if not row:
+            continue
+        first_seen, last_seen, closed = row
+        existing = cur.execute(
+            "SELECT first_seen_date, last_seen_date, closed_date FROM job_lifecycle WHERE company_slug=? AND job_key=?",
+            (company_slug, new),
+        ).fetchone()
+        if existing:
+            # Same posting under two keys: earliest sighting, state of the latest one
+            if (existing[1] or "") >= (last_seen or ""):
+                last_seen, closed = existing[1], existing[2]
+            first_seen = min([d for d in (first_seen, existing[0]) if d], default=None)
+            cur.execute("DELETE FROM job_lifecycle WHERE company_slug=? AND job_key=?", (company_slug, new))
+        cur.execute(
+            """
+            UPDATE job_lifecycle
+            SET job_key=?, first_seen_date=?, last_seen_date=?, closed_date=?
+            WHERE company_slug=? AND job_key=?
+            """,
+            (new, first_seen, last_seen, closed, company_slug, old),
+        )
+        moved += 1
+    return moved
+
+
+def rekey_company(conn, company_slug: str, mapping: Dict[str, str]) -> Dict[str, int]:
+    cur = conn.cursor()
+    stats = {"keys": len(mapping), "lifecycle": _rekey_lifecycle(cur, company_slug, mapping)}
+    pairs = [(new, company_slug, old) for old, new in mapping.items()]
+
+    cur.executemany("UPDATE OR REPLACE job_changes SET job_key=? WHERE company_slug=? AND job_key=?", pairs)
+    stats["changes"] = cur.rowcount if cur.rowcount >= 0 else 0
+
+    # Clusters first, so the role-key reset below compares against re-keyed cluster ids
+    cur.executemany("UPDATE OR REPLACE job_clusters SET job_key=? WHERE company_slug=? AND job_key=?", pairs)
+    cur.executemany("UPDATE job_clusters SET cluster_id=? WHERE company_slug=? AND cluster_id=?", pairs)
+    cur.executemany("UPDATE job_lifecycle SET cluster_id=? WHERE company_slug=? AND cluster_id=?", pairs)
+
+    # An interval already stored under the new key for the same open date is dropped
+    # with a plain DELETE (REPLACE would skip the rtree/histogram delete triggers)
+    cur.executemany(
+        """
+        DELETE FROM job_intervals WHERE company_slug=? AND job_key=? AND open_date IN
+            (SELECT open_date FROM job_intervals WHERE company_slug=? AND job_key=?)
+        """,
+        [(company_slug, new, company_slug, old) for old, new in mapping.items()],
+    )
+    cur.executemany("UPDATE job_intervals SET job_key=? WHERE company_slug=? AND job_key=?", pairs)
+    cur.executemany("UPDATE job_intervals SET role_key=? WHERE company_slug=? AND role_key=?", pairs)
+    cur.execute(
+        "UPDATE job_intervals SET role_key=job_key WHERE company_slug=? AND role_key NOT IN "
+        "(SELECT cluster_id FROM job_clusters WHERE company_slug=?)",
+        (company_slug, company_slug),
+    )
+
+    # Cached cards are keyed the old way; drop them so the next diff rebuilds from the snapshot file
+    cur.execute("DELETE FROM job_card_cache WHERE company_slug=?", (company_slug,))
+    cur.execute("DELETE FROM job_card_cache_state WHERE company_slug=?", (company_slug,))
+    return stats
+
+
+def main(dry_run: bool = False, filtered_root: str = FILTERED_ROOT):
+    """
+    Re-keys existing analytics history to the stable job identity (src/jobs/identity.py).
+    Snapshot files are not rewritten: keys are derived from the records on read.
+    """
+    init_db()
+    conn = get_connection()
+    try:
+        for company_slug, snapshot_dir in _iter_company_dirs(filtered_root):
+            mapping = key_mapping(snapshot_dir)
+            if not mapping:
+                continue
+            if dry_run:
+                print(f"{company_slug}: would re-key {len(mapping)} jobs")
+                continue
+            stats = rekey_company(conn, company_slug, mapping)
+            conn.commit()
+            print(
+                f"{company_slug}: re-keyed {stats['keys']} jobs "
+                f"({stats['lifecycle']} lifecycle rows, {stats['changes']} change rows)"
+            )
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-key job history to stable job identities")
+    parser.add_argument("--dry-run", action="store_true", help="Only report how many jobs would be re-keyed")
+    args = parser.parse_args()
+
+    main(dry_run=args.dry_run)
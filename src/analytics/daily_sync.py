@@ -3,6 +3,9 @@ import json
 import logging
 from datetime import datetime
 from src.news.models import get_connection
+from src.config import SENIOR_PLUS_LEVELS
+from src.jobs import identity
+from src.utils import match_seniority
 
 
 def _run_date(run_timestamp: str) -> str:
@@ -10,10 +13,12 @@ def _run_date(run_timestamp: str) -> str:
     return ts_obj.strftime("%Y-%m-%d")
 
 
-def sync_job_diff(diff_data, company_slug, run_timestamp):
+def sync_job_diff(diff_data, company_slug, run_timestamp, *, conn=None):
     """
     Syncs a job diff record into the job_diffs_daily table.
+    With `conn` the writes join the caller's transaction and errors propagate.
     """
+    close_conn = conn is None
     try:
         # Parse timestamp to date
         date_str = _run_date(run_timestamp)  # UTC date
@@ -33,15 +38,22 @@ def sync_job_diff(diff_data, company_slug, run_timestamp):
         removed_jobs = diff_data.get("removed", [])
         if not removed_jobs:
             removed_jobs = diff_data.get("details", {}).get("removed", [])
+
+        changed_jobs = diff_data.get("changed", [])
+        if not changed_jobs:
+            changed_jobs = diff_data.get("details", {}).get("changed", [])
             
-        keywords = ["senior", "staff", "principal", "lead", "director", "head", "vp", "architect"]
-        senior_plus_added_count = 0
-        for job in added_jobs:
-            title = job.get("title", "").lower()
-            if any(k in title for k in keywords):
-                senior_plus_added_count += 1
+        # Senior+ = seniority tag in SENIOR_PLUS_LEVELS (SENIORITY_LEVELS order, so
+        # "Senior Associate" is Junior); legacy diffs without the tag are classified
+        # from the title the same way. Rows synced before the tag existed used a
+        # title keyword scan: re-run scripts/backfill_diffs.py to recompute them.
+        senior_plus_added_count = sum(
+            1 for job in added_jobs
+            if (job.get("seniority") or match_seniority((job.get("title") or "").lower())) in SENIOR_PLUS_LEVELS
+        )
 
-        conn = get_connection()
+        if close_conn:
+            conn = get_connection()
         c = conn.cursor()
         
         c.execute("""
@@ -71,71 +83,170 @@ def sync_job_diff(diff_data, company_slug, run_timestamp):
                 (company_slug, date_str, disc, int(disc_added.get(disc, 0)), int(disc_removed.get(disc, 0))),
             )
         
-        conn.commit()
-        conn.close()
+        # Field-level changes (indexed for date-range diffs)
+        change_rows = []
+        for job in changed_jobs:
+            key = identity.job_key(job)
+            changes = job.get("changes") or {}
+            if not key or not changes:
+                continue
+            change_rows.append((
+                company_slug, str(key), date_str, run_timestamp,
+                ",".join(sorted(changes.keys())), json.dumps(changes, ensure_ascii=False),
+            ))
+        c.executemany(
+            """
+            INSERT OR REPLACE INTO job_changes
+                (company_slug, job_key, date, run_timestamp, fields, changes)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            change_rows,
+        )
+        
+        if close_conn:
+            conn.commit()
         logging.info(f"Synced job stats for {company_slug} on {date_str}")
         
     except Exception as e:
+        if not close_conn:
+            raise
         logging.error(f"Failed to sync job diff for {company_slug}: {e}")
+    finally:
+        if close_conn and conn is not None:
+            conn.close()
 
 
-def agg_daily_news(days_back=30):
-    """
-    Aggregates news into company_news_daily for the last N days.
-    """
-    conn = get_connection()
-    c = conn.cursor()
-    
-    # Simple strategy: clear recent days and re-aggregate to avoid complex updates
-    # Actually, REPLACE works fine if we compute everything.
-    
-    # Get range
-    # In SQLite, we can use date() on the ISO string
-    
-    # Fix: Don't use alias in WHERE clause
-    query = """
-    SELECT 
+# Per company-day news aggregate: totals + top headline from one grouped scan,
+# category counts from news_labels (every label of an article, so an article can
+# count toward several categories); rows map to company_news_daily via _news_daily_row
+_NEWS_DAY_COLUMNS = """
         company_slug, 
         date(published_at) as day_date,
         COUNT(*) as total,
-        SUM(CASE WHEN news_category='funding' THEN 1 ELSE 0 END) as funding,
-        SUM(CASE WHEN news_category='earnings' THEN 1 ELSE 0 END) as earnings,
-        SUM(CASE WHEN news_category='product' THEN 1 ELSE 0 END) as product,
-        SUM(CASE WHEN news_category='ai_announcement' THEN 1 ELSE 0 END) as ai,
-        SUM(CASE WHEN news_category='layoff' THEN 1 ELSE 0 END) as layoff,
-        SUM(CASE WHEN news_category='hiring' THEN 1 ELSE 0 END) as hiring,
-        SUM(CASE WHEN news_category='regulatory' THEN 1 ELSE 0 END) as regulatory
-    FROM normalized_news
-    WHERE date(published_at) >= date('now', ?)
-    GROUP BY company_slug, day_date
+        MAX(published_at) as latest,
+        title,
+        source_url
+"""
+
+# Articles without label rows predate news_labels and count by their primary category
+_NEWS_LABEL_COLUMNS = """
+        n.company_slug,
+        date(n.published_at) as day_date,
+        COALESCE(l.category, n.news_category) as label,
+        COUNT(*)
+"""
+_NEWS_LABEL_FROM = "normalized_news n LEFT JOIN news_labels l ON l.news_id = n.id"
+
+
+def _news_daily_row(r, labels):
+    slug, day_date, total, _, top_title, top_url = r
+    fund, earn, prod, ai, lay, hire, reg = (
+        labels.get(cat, 0) for cat in ("funding", "earnings", "product", "ai_announcement", "layoff", "hiring", "regulatory")
+    )
+
+    # Major event logic
+    has_major = (fund + lay + earn) > 0
+    major_types = []
+    if fund > 0: major_types.append("funding")
+    if lay > 0: major_types.append("layoff")
+    if earn > 0: major_types.append("earnings")
+    major_types_str = ",".join(major_types)
+
+    return (slug, day_date, total, fund, earn, prod, ai, lay, hire, reg, int(has_major), major_types_str, top_title, top_url)
+
+
+def agg_daily_news(days_back=30, keys=None, verify=False):
+    """
+    Aggregates news into company_news_daily for the last N days: totals, top
+    headline and per-label counts from grouped scans of the date(published_at)
+    index, then one bulk upsert. Stored company-days that no longer have any
+    articles are deleted.
+    With `keys` ((company_slug, day) pairs, e.g. NewsProcessor.touched) only those
+    days are recomputed. Otherwise the whole window is rebuilt; `verify` also logs
+    how many stored rows differed from the rebuild. Returns the rows written.
     """
-    
+    conn = get_connection()
+    c = conn.cursor()
     days_arg = f"-{days_back} days"
-    rows = c.execute(query, (days_arg,)).fetchall()
-    
-    for r in rows:
-        slug, day_date, total, fund, earn, prod, ai, lay, hire, reg = r
-        
-        # Major event logic
-        has_major = (fund + lay + earn) > 0
-        major_types = []
-        if fund > 0: major_types.append("funding")
-        if lay > 0: major_types.append("layoff")
-        if earn > 0: major_types.append("earnings")
-        major_types_str = ",".join(major_types)
-        
-        # Top headline (simplistic: get max title)
-        # Ideally, we'd get the one with highest "importance" or just most recent
-        top_art = c.execute("SELECT title, source_url FROM normalized_news WHERE company_slug=? AND date(published_at)=? ORDER BY published_at DESC LIMIT 1", (slug, day_date)).fetchone()
-        top_title = top_art[0] if top_art else None
-        top_url = top_art[1] if top_art else None
 
+    # With a single MAX() the bare title/source_url come from the row holding it,
+    # i.e. the latest headline
+    if keys is not None:
+        # A few index probes per touched day, so cost follows new articles, not the window
+        since = c.execute("SELECT date('now', ?)", (days_arg,)).fetchone()[0]
+        out, stale = [], []
+        for slug, day_date in sorted(set(keys)):
+            if not day_date or day_date < since:
+                continue
+            r = c.execute(f"""
+                SELECT {_NEWS_DAY_COLUMNS}
+                FROM normalized_news
+                WHERE date(published_at) = ? AND company_slug = ?
+                GROUP BY day_date, company_slug
+            """, (day_date, slug)).fetchone()
+            if r:
+                labels = dict(row[2:] for row in c.execute(f"""
+                    SELECT {_NEWS_LABEL_COLUMNS}
+                    FROM {_NEWS_LABEL_FROM}
+                    WHERE date(n.published_at) = ? AND n.company_slug = ?
+                    GROUP BY day_date, n.company_slug, label
+                """, (day_date, slug)))
+                out.append(_news_daily_row(r, labels))
+            else:
+                stale.append((slug, day_date))
+    else:
+        labels = {}
+        for slug, day_date, label, n in c.execute(f"""
+            SELECT {_NEWS_LABEL_COLUMNS}
+            FROM {_NEWS_LABEL_FROM}
+            WHERE date(n.published_at) >= date('now', ?)
+            GROUP BY day_date, n.company_slug, label
+        """, (days_arg,)):
+            labels.setdefault((slug, day_date), {})[label] = n
+
+        # One pass in (day, company) index order, no sort
+        out = [_news_daily_row(r, labels.get((r[0], r[1]), {})) for r in c.execute(f"""
+            SELECT {_NEWS_DAY_COLUMNS}
+            FROM normalized_news
+            WHERE date(published_at) >= date('now', ?)
+            GROUP BY day_date, company_slug
+        """, (days_arg,))]
+
+        if verify:
+            stored = {
+                (r[0], r[1]): tuple(r)
+                for r in c.execute("""
+                    SELECT company_slug, date, article_count, funding_count, earnings_count, product_count, ai_announcement_count, layoff_count, hiring_count, regulatory_count, has_major_event, major_event_types, top_headline_title, top_headline_url
+                    FROM company_news_daily WHERE date >= date('now', ?)
+                """, (days_arg,))
+            }
+            drift = sum(1 for row in out if stored.get((row[0], row[1])) != row)
+            drift += len(stored.keys() - {(row[0], row[1]) for row in out})
+            if drift:
+                logging.warning(f"News aggregate drift: {drift} of {len(out)} company-days differed from the full rebuild")
+            else:
+                logging.info(f"News aggregates verified ({len(out)} company-days)")
+
+    c.executemany("""
+        INSERT OR REPLACE INTO company_news_daily
+        (company_slug, date, article_count, funding_count, earnings_count, product_count, ai_announcement_count, layoff_count, hiring_count, regulatory_count, has_major_event, major_event_types, top_headline_title, top_headline_url)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, out)
+    if keys is not None:
+        c.executemany("DELETE FROM company_news_daily WHERE company_slug = ? AND date = ?", stale)
+    else:
         c.execute("""
-            INSERT OR REPLACE INTO company_news_daily
-            (company_slug, date, article_count, funding_count, earnings_count, product_count, ai_announcement_count, layoff_count, hiring_count, regulatory_count, has_major_event, major_event_types, top_headline_title, top_headline_url)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (slug, day_date, total, fund, earn, prod, ai, lay, hire, reg, has_major, major_types_str, top_title, top_url))
-        
+            DELETE FROM company_news_daily
+            WHERE date >= date('now', ?) AND NOT EXISTS (
+                SELECT 1 FROM normalized_news n
+                WHERE date(n.published_at) = company_news_daily.date AND n.company_slug = company_news_daily.company_slug
+            )
+        """, (days_arg,))
+
     conn.commit()
     conn.close()
-    logging.info(f"Aggregated news for last {days_back} days.")
+    if keys is not None:
+        logging.info(f"Aggregated news for {len(out)} touched company-days.")
+    else:
+        logging.info(f"Aggregated news for last {days_back} days.")
+    return len(out)
@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.news.models import get_connection
+
+# ---------------------------------------------------------------------------
+# Lifecycle intervals
+# ---------------------------------------------------------------------------
+# job_lifecycle keeps one row per job, so a job that closes and comes back just
+# has its closed_date reset. job_intervals keeps every open stretch instead:
+#   - a job absent from the open set that shows up in a run opens an interval
+#   - a removal closes the job's open interval
+# An interval is a repost when its role (cluster_id, else job_key; see
+# src/jobs/dedupe.py) had no open posting and closed at most
+# REPOST_WINDOW_DAYS earlier, under the same key or a new one. The gap is kept in gap_days.
+# Per-company repost rate and true time-to-fill (first posting of a role
+# episode -> its final close, bridging reposts) are answered from the
+# (company_slug, close_date) / (company_slug, role_key) indexes. All-company
+# as-of questions go through the job_intervals_rtree interval index when present.
+# Triggers also keep lifespan_closed_hist / lifespan_open_hist (see models.py)
+# in step with every interval write, for O(buckets) lifespan summaries.
+
+REPOST_WINDOW_DAYS = 60
+
+
+def _days_between(d1: str, d2: str) -> int:
+    return (datetime.strptime(d2, "%Y-%m-%d") - datetime.strptime(d1, "%Y-%m-%d")).days
+
+
+def _percentile(sorted_vals: List[float], p: float) -> Optional[float]:
+    if not sorted_vals:
+        return None
+    k = (len(sorted_vals) - 1) * (p / 100.0)
+    f = int(k)
+    c = min(f + 1, len(sorted_vals) - 1)
+    return float(sorted_vals[f] + (sorted_vals[c] - sorted_vals[f]) * (k - f))
+
+
+def has_rtree(conn) -> bool:
+    return bool(conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name='job_intervals_rtree'"
+    ).fetchone())
+
+
+def sync_intervals(
+    conn,
+    company_slug: str,
+    date_str: str,
+    present: Iterable[Tuple[str, Optional[str]]],
+    removed: Iterable[str] = (),
+) -> Dict[str, int]:
+    """
+    Applies one run: `present` is (job_key, cluster_id) for every job in the
+    snapshot, `removed` the job_keys the diff reported gone. Only jobs without an
+    open interval are looked up, so a steady-state run costs one query plus its
+    changes. Does not commit.
+    """
+    open_rows = conn.execute(
+        "SELECT job_key, role_key FROM job_intervals WHERE company_slug=? AND close_date IS NULL",
+        (company_slug,),
+    ).fetchall()
+    open_keys = {k for k, _ in open_rows}
+    removed = {str(k) for k in removed if k}
+
+    # Unary + keeps the planner on the (company_slug, job_key) index; through the
+    # close_date index each removal would scan every open interval of the company
+    conn.executemany(
+        "UPDATE job_intervals SET close_date=? WHERE company_slug=? AND job_key=? AND +close_date IS NULL",
+        [(date_str, company_slug, k) for k in removed if k in open_keys],
+    )
+    open_roles = {r for k, r in open_rows if k not in removed}
+
+    stats = {"opened": 0, "reposts": 0, "closed": len(removed & open_keys)}
+    for key, cluster_id in present:
+        key = str(key)
+        if key in open_keys and key not in removed:
+            continue
+        role = cluster_id or key
+        is_repost, gap_days = 0, None
+        if role not in open_roles:
+            prev = conn.execute(
+                """
+                SELECT MAX(close_date) FROM job_intervals
+                WHERE company_slug=? AND role_key=? AND close_date IS NOT NULL AND close_date <= ?
+                """,
+                (company_slug, role, date_str),
+            ).fetchone()[0]
+            if prev:
+                gap = _days_between(prev, date_str)
+                if gap <= REPOST_WINDOW_DAYS:
+                    is_repost, gap_days = 1, gap
+        conn.execute(
+            """
+            INSERT OR IGNORE INTO job_intervals
+                (company_slug, job_key, role_key, open_date, close_date, is_repost, gap_days)
+            VALUES (?, ?, ?, ?, NULL, ?, ?)
+            """,
+            (company_slug, key, role, date_str, is_repost, gap_days),
+        )
+        open_roles.add(role)
+        stats["opened"] += 1
+        stats["reposts"] += is_repost
+    return stats
+
+
+def rebuild_lifespan_hist(conn, company_slug: str) -> None:
+    """
+    Recomputes one company's lifespan histograms from job_intervals. Triggers keep
+    them current; this is for bulk rewrites that bypass delete triggers (REPLACE).
+    Does not commit.
+    """
+    conn.execute("DELETE FROM lifespan_open_hist WHERE company_slug=?", (company_slug,))
+    conn.execute("DELETE FROM lifespan_closed_hist WHERE company_slug=?", (company_slug,))
+    conn.execute(
+        """
+        INSERT INTO lifespan_open_hist (company_slug, open_date, count)
+        SELECT company_slug, open_date, COUNT(*) FROM job_intervals
+        WHERE company_slug=? AND close_date IS NULL GROUP BY open_date
+        """,
+        (company_slug,),
+    )
+    conn.execute(
+        """
+        INSERT INTO lifespan_closed_hist (company_slug, close_date, days_open, count)
+        SELECT company_slug, close_date, CAST(julianday(close_date) - julianday(open_date) AS INTEGER) + 1 AS d, COUNT(*)
+        FROM job_intervals
+        WHERE company_slug=? AND close_date IS NOT NULL AND d > 0
+        GROUP BY close_date, d
+        """,
+        (company_slug,),
+    )
+
+
+def open_as_of(as_of_date: str, company_slug: Optional[str] = None, *, conn=None) -> List[Dict[str, Any]]:
+    """Intervals open at the end of `as_of_date` (optionally for one company)."""
+    close_conn = False
+    if conn is None:
+        conn = get_connection()
+        close_conn = True
+    try:
+        cols = "i.company_slug, i.job_key, i.role_key, i.open_date, i.is_repost"
+        company_filter = " AND i.company_slug = ?" if company_slug else ""
+        params: List[Any] = [as_of_date, as_of_date] + ([company_slug] if company_slug else [])
+        # The R*Tree spans all companies; one company is cheaper through its B-tree prefix
+        if not company_slug and has_rtree(conn):
+            sql = f"""
+                SELECT {cols} FROM job_intervals_rtree r JOIN job_intervals i ON i.id = r.id
+                WHERE r.open_day <= CAST(julianday(?) AS INTEGER)
+                  AND r.close_day > CAST(julianday(?) AS INTEGER){company_filter}
+            """
+        else:
+            sql = f"""
+                SELECT {cols} FROM job_intervals i
+                WHERE i.open_date <= ? AND (i.close_date IS NULL OR i.close_date > ?){company_filter}
+            """
+        keys = ["company_slug", "job_key", "role_key", "open_date", "is_repost"]
+        return [dict(zip(keys, row)) for row in conn.execute(sql, params).fetchall()]
+    finally:
+        if close_conn:
+            conn.close()
+
+
+@dataclass(frozen=True)
+class RepostSummary:
+    intervals_opened: int
+    reposts: int
+    repost_rate: Optional[float]
+    filled_roles: int
+    median_time_to_fill_days: Optional[float]
+    p25_time_to_fill_days: Optional[float]
+    p75_time_to_fill_days: Optional[float]
+
+
+def _episode_start(intervals: List[Tuple[str, Optional[str]]]) -> str:
+    """Open date of the last episode: walks back while gaps stay within REPOST_WINDOW_DAYS."""
+    start, reach = intervals[-1][0], intervals[-1][0]
+    for open_date, close_date in reversed(intervals[:-1]):
+        if close_date is None or _days_between(close_date, reach) <= REPOST_WINDOW_DAYS:
+            start = min(start, open_date)
+            reach = min(reach, open_date)
+        else:
+            break
+    return start
+
+
+def compute_repost_summary(
+    company_slug: str,
+    start_date: str,
+    end_date: str,
+    *,
+    conn=None,
+) -> RepostSummary:
+    """
+    Repost rate of intervals opened in (start_date, end_date], and time-to-fill of
+    roles whose last posting closed in that window (no posting open as of end_date).
+    """
+    close_conn = False
+    if conn is None:
+        conn = get_connection()
+        close_conn = True
+    try:
+        opened, reposts = conn.execute(
+            """
+            SELECT COUNT(*), COALESCE(SUM(is_repost), 0) FROM job_intervals
+            WHERE company_slug=? AND open_date > ? AND open_date <= ?
+            """,
+            (company_slug, start_date, end_date),
+        ).fetchone()
+
+        # Roles with a close in the window, then only their own intervals (role index)
+        roles = [r[0] for r in conn.execute(
+            """
+            SELECT DISTINCT role_key FROM job_intervals
+            WHERE company_slug=? AND close_date > ? AND close_date <= ?
+            """,
+            (company_slug, start_date, end_date),
+        ).fetchall()]
+
+        fill_days: List[float] = []
+        for role in roles:
+            intervals = conn.execute(
+                """
+                SELECT open_date, close_date FROM job_intervals
+                WHERE company_slug=? AND role_key=? AND open_date <= ?
+                ORDER BY open_date
+                """,
+                (company_slug, role, end_date),
+            ).fetchall()
+            closes = [c for _, c in intervals]
+            if not intervals or any(c is None or c > end_date for c in closes):
+                continue  # still open (or reopened) as of end_date
+            filled = max(closes)
+            if not (start_date < filled <= end_date):
+                continue
+            # Merge overlapping postings of the role, then bridge repost gaps
+            merged: List[Tuple[str, Optional[str]]] = []
+            for open_date, close_date in intervals:
+                if merged and merged[-1][1] is not None and open_date <= merged[-1][1]:
+                    merged[-1] = (merged[-1][0], max(merged[-1][1], close_date))
+                else:
+                    merged.append((open_date, close_date))
+            fill_days.append(float(_days_between(_episode_start(merged), filled) + 1))
+
+        fill_days.sort()
+        return RepostSummary(
+            intervals_opened=int(opened),
+            reposts=int(reposts),
+            repost_rate=(reposts / opened) if opened else None,
+            filled_roles=len(fill_days),
+            median_time_to_fill_days=_percentile(fill_days, 50),
+            p25_time_to_fill_days=_percentile(fill_days, 25),
+            p75_time_to_fill_days=_percentile(fill_days, 75),
+        )
+    finally:
+        if close_conn:
+            conn.close()
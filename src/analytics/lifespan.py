@@ -2,11 +2,13 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import datetime, timedelta, date
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 import logging
 
-from src.news.models import get_connection
+from src.news.models import ROLE_EPISODES_SQL, get_connection
 from src.jobs.diff import _parse_discipline, _parse_seniority
+from src.jobs import identity
+from src.analytics.intervals import compute_repost_summary, sync_intervals
 
 
 def _run_date(run_timestamp: str) -> str:
@@ -15,24 +17,7 @@ def _run_date(run_timestamp: str) -> str:
 
 
 def _job_key(job: Dict[str, Any]) -> Optional[str]:
-    return job.get("job_key") or job.get("id") or job.get("url")
-
-
-def _percentile(sorted_vals: List[float], p: float) -> Optional[float]:
-    if not sorted_vals:
-        return None
-    if p <= 0:
-        return float(sorted_vals[0])
-    if p >= 100:
-        return float(sorted_vals[-1])
-    k = (len(sorted_vals) - 1) * (p / 100.0)
-    f = int(k)
-    c = min(f + 1, len(sorted_vals) - 1)
-    if f == c:
-        return float(sorted_vals[f])
-    d0 = sorted_vals[f] * (c - k)
-    d1 = sorted_vals[c] * (k - f)
-    return float(d0 + d1)
+    return identity.job_key(job)
 
 
 @dataclass(frozen=True)
@@ -52,9 +37,12 @@ class LifespanSummary:
     age_bucket_30_plus: int
 
 
-def sync_open_now(company_slug: str, run_timestamp: str, open_now_count: int) -> None:
+def sync_open_now(company_slug: str, run_timestamp: str, open_now_count: int, *, conn=None) -> None:
     date_str = _run_date(run_timestamp)
-    conn = get_connection()
+    close_conn = False
+    if conn is None:
+        conn = get_connection()
+        close_conn = True
     try:
         c = conn.cursor()
         c.execute(
@@ -64,9 +52,11 @@ def sync_open_now(company_slug: str, run_timestamp: str, open_now_count: int) ->
             """,
             (company_slug, date_str, run_timestamp, int(open_now_count)),
         )
-        conn.commit()
+        if close_conn:
+            conn.commit()
     finally:
-        conn.close()
+        if close_conn:
+            conn.close()
 
 
 def sync_job_lifecycle(
@@ -76,70 +66,133 @@ def sync_job_lifecycle(
     diff_data: Optional[Dict[str, Any]],
     *,
     window_days: int = 180,
+    conn=None,
 ) -> None:
+    """
+    Upserts lifecycles/intervals for one run and precomputes the lifespan summary.
+    With `conn` the writes join the caller's transaction and errors propagate.
+    """
     date_str = _run_date(run_timestamp)
 
-    conn = get_connection()
+    close_conn = False
+    if conn is None:
+        conn = get_connection()
+        close_conn = True
     try:
         c = conn.cursor()
 
-        # 1) Upsert current open roles (present in snapshot)
+        # 1) Current open roles (present in snapshot). Rows already open with the
+        #    same attributes only move last_seen_date, which one UPDATE does for the
+        #    whole company; new, reopened or edited jobs are upserted in one batch.
+        open_attrs = {
+            row[0]: row[1:]
+            for row in c.execute(
+                """
+                SELECT job_key, title, url, discipline, seniority, cluster_id
+                FROM job_lifecycle WHERE company_slug=? AND closed_date IS NULL
+                """,
+                (company_slug,),
+            )
+        }
+        present_keys = set()
+        unchanged_keys = []
+        open_rows = []
         for job in current_snapshot_jobs:
             key = _job_key(job)
             if not key:
                 continue
+            key = str(key)
             title = job.get("title") or ""
             url = job.get("url")
-            discipline = _parse_discipline(title)
-            seniority = _parse_seniority(title)
-
-            c.execute(
-                """
-                INSERT INTO job_lifecycle
-                    (company_slug, job_key, first_seen_date, last_seen_date, closed_date, title, url, discipline, seniority)
-                VALUES (?, ?, ?, ?, NULL, ?, ?, ?, ?)
-                ON CONFLICT(company_slug, job_key) DO UPDATE SET
-                    last_seen_date=excluded.last_seen_date,
-                    closed_date=NULL,
-                    title=excluded.title,
-                    url=excluded.url,
-                    discipline=excluded.discipline,
-                    seniority=excluded.seniority
-                """,
-                (company_slug, str(key), date_str, date_str, title, url, discipline, seniority),
-            )
+            discipline = job.get("discipline") or _parse_discipline(title)
+            seniority = job.get("seniority") or _parse_seniority(title)
+            cluster_id = job.get("cluster_id")
+            present_keys.add(key)
+
+            prev = open_attrs.get(key)
+            if prev is not None and prev == (title, url, discipline, seniority, cluster_id or prev[4]):
+                unchanged_keys.append(key)
+            else:
+                open_rows.append((company_slug, key, date_str, date_str, title, url, discipline, seniority, cluster_id))
 
-        # 2) Mark removals as closed on this date
+        removed_cards = []
         if diff_data:
-            removed = diff_data.get("removed", []) or diff_data.get("details", {}).get("removed", [])
-            for card in removed:
-                key = card.get("job_key") or card.get("id") or card.get("url")
-                if not key:
-                    continue
-                title = card.get("title") or ""
-                url = card.get("url")
-                discipline = card.get("discipline") or _parse_discipline(title)
-                seniority = card.get("seniority") or _parse_seniority(title)
-
-                # Ensure record exists, then close it
+            removed_cards = diff_data.get("removed", []) or diff_data.get("details", {}).get("removed", [])
+        removed_keys = [_job_key(card) for card in removed_cards]
+
+        if unchanged_keys:
+            # Open rows missing from the snapshot are normally the removals below
+            # (which set last_seen_date themselves); otherwise touch only the unchanged keys
+            if open_attrs.keys() - present_keys <= {str(k) for k in removed_keys if k}:
                 c.execute(
-                    """
-                    INSERT INTO job_lifecycle
-                        (company_slug, job_key, first_seen_date, last_seen_date, closed_date, title, url, discipline, seniority)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ON CONFLICT(company_slug, job_key) DO UPDATE SET
-                        last_seen_date=excluded.last_seen_date,
-                        closed_date=excluded.closed_date,
-                        title=excluded.title,
-                        url=excluded.url,
-                        discipline=excluded.discipline,
-                        seniority=excluded.seniority
-                    """,
-                    (company_slug, str(key), date_str, date_str, date_str, title, url, discipline, seniority),
+                    "UPDATE job_lifecycle SET last_seen_date=? WHERE company_slug=? AND closed_date IS NULL",
+                    (date_str, company_slug),
                 )
+            else:
+                c.executemany(
+                    "UPDATE job_lifecycle SET last_seen_date=? WHERE company_slug=? AND job_key=?",
+                    [(date_str, company_slug, k) for k in unchanged_keys],
+                )
+        c.executemany(
+            """
+            INSERT INTO job_lifecycle
+                (company_slug, job_key, first_seen_date, last_seen_date, closed_date, title, url, discipline, seniority, cluster_id)
+            VALUES (?, ?, ?, ?, NULL, ?, ?, ?, ?, ?)
+            ON CONFLICT(company_slug, job_key) DO UPDATE SET
+                last_seen_date=excluded.last_seen_date,
+                closed_date=NULL,
+                title=excluded.title,
+                url=excluded.url,
+                discipline=excluded.discipline,
+                seniority=excluded.seniority,
+                cluster_id=COALESCE(excluded.cluster_id, job_lifecycle.cluster_id)
+            """,
+            open_rows,
+        )
+
+        # 2) Mark removals as closed on this date (ensure the record exists, then close it)
+        close_rows = []
+        for card, key in zip(removed_cards, removed_keys):
+            if not key:
+                continue
+            title = card.get("title") or ""
+            url = card.get("url")
+            discipline = card.get("discipline") or _parse_discipline(title)
+            seniority = card.get("seniority") or _parse_seniority(title)
+            close_rows.append((company_slug, str(key), date_str, date_str, date_str, title, url, discipline, seniority, card.get("cluster_id")))
+        c.executemany(
+            """
+            INSERT INTO job_lifecycle
+                (company_slug, job_key, first_seen_date, last_seen_date, closed_date, title, url, discipline, seniority, cluster_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(company_slug, job_key) DO UPDATE SET
+                last_seen_date=excluded.last_seen_date,
+                closed_date=excluded.closed_date,
+                title=excluded.title,
+                url=excluded.url,
+                discipline=excluded.discipline,
+                seniority=excluded.seniority,
+                cluster_id=COALESCE(excluded.cluster_id, job_lifecycle.cluster_id)
+            """,
+            close_rows,
+        )
+
+        # Open/close intervals (reopens start a new interval instead of erasing the gap)
+        sync_intervals(
+            conn,
+            company_slug,
+            date_str,
+            [(str(k), job.get("cluster_id")) for job in current_snapshot_jobs if (k := _job_key(job))],
+            removed_keys,
+        )
+
+        # Distinct-role adds/removes for this date (job_diffs_daily row written by sync_job_diff)
+        sync_role_diffs(company_slug, date_str, conn=conn)
 
         # 3) Precompute lifespan summary for dashboard speed
         summary = compute_company_lifespan_summary(company_slug, date_str, window_days=window_days, conn=conn)
+        start = (datetime.strptime(date_str, "%Y-%m-%d").date() - timedelta(days=window_days)).strftime("%Y-%m-%d")
+        reposts = compute_repost_summary(company_slug, start, date_str, conn=conn)
         c.execute(
             """
             INSERT OR REPLACE INTO company_lifespan_daily (
@@ -147,9 +200,10 @@ def sync_job_lifecycle(
                 median_days, p25_days, p75_days,
                 median_open_age_days,
                 pct_close_within_7d, pct_open_gt_30d, pct_open_gt_60d,
-                age_bucket_0_3, age_bucket_4_7, age_bucket_8_14, age_bucket_15_30, age_bucket_30_plus
+                age_bucket_0_3, age_bucket_4_7, age_bucket_8_14, age_bucket_15_30, age_bucket_30_plus,
+                repost_rate, median_time_to_fill_days
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
             (
                 company_slug,
@@ -168,15 +222,102 @@ def sync_job_lifecycle(
                 int(summary.age_bucket_8_14),
                 int(summary.age_bucket_15_30),
                 int(summary.age_bucket_30_plus),
+                reposts.repost_rate,
+                reposts.median_time_to_fill_days,
             ),
         )
 
-        conn.commit()
+        if close_conn:
+            conn.commit()
     except Exception as e:
+        if not close_conn:
+            raise
         logging.error(f"Lifespan sync failed for {company_slug}: {e}")
         conn.rollback()
     finally:
-        conn.close()
+        if close_conn:
+            conn.close()
+
+
+_INTERVALS_AS_LIFECYCLE = (
+    "(SELECT company_slug, open_date AS first_seen_date, close_date AS closed_date FROM job_intervals)"
+)
+# One company's role episodes (role_lifecycle rows); binds the company as its first parameter
+_ROLE_EPISODES = "(" + ROLE_EPISODES_SQL.format(where="WHERE i.company_slug = ?") + ")"
+
+
+def _lifecycle_source(company_slug: str, by_role: bool) -> Tuple[str, List[Any]]:
+    """FROM source of (company_slug, first_seen_date, closed_date) spans, and the parameters it binds."""
+    if by_role:
+        return _ROLE_EPISODES, [company_slug]
+    return _INTERVALS_AS_LIFECYCLE, []
+
+
+def sync_role_diffs(company_slug: str, date_str: Optional[str] = None, *, conn) -> None:
+    """
+    Fills job_diffs_daily.roles_added_count / roles_removed_count from the
+    company's role episodes for one date (or every date when `date_str` is None).
+    An extra location or overlapping repost of an open role moves neither count;
+    a role back after a stretch with nothing open starts a new episode.
+    """
+    date_filter = " AND {col} = ?" if date_str else ""
+    params = [company_slug, company_slug] + ([date_str] if date_str else [])
+    added = dict(conn.execute(
+        f"SELECT first_seen_date, COUNT(*) FROM {_ROLE_EPISODES} WHERE company_slug=?"
+        + date_filter.format(col="first_seen_date") + " GROUP BY first_seen_date",
+        params,
+    ).fetchall())
+    removed = dict(conn.execute(
+        f"SELECT closed_date, COUNT(*) FROM {_ROLE_EPISODES} WHERE company_slug=? AND closed_date IS NOT NULL"
+        + date_filter.format(col="closed_date") + " GROUP BY closed_date",
+        params,
+    ).fetchall())
+    dates = [date_str] if date_str else [r[0] for r in conn.execute(
+        "SELECT date FROM job_diffs_daily WHERE company_slug=?", (company_slug,)
+    ).fetchall()]
+    conn.executemany(
+        "UPDATE job_diffs_daily SET roles_added_count=?, roles_removed_count=? WHERE company_slug=? AND date=?",
+        [(added.get(d, 0), removed.get(d, 0), company_slug, d) for d in dates],
+    )
+
+
+def _hist_value_at(hist: List[Tuple[int, int]], rank: int) -> int:
+    seen = 0
+    for value, count in hist:
+        seen += count
+        if rank < seen:
+            return value
+    return hist[-1][0]
+
+
+def _interpolated_percentile(n: int, value_at: Callable[[int], int], p: float) -> Optional[float]:
+    """Linear-interpolated percentile of n sorted values, value_at(rank) giving each one."""
+    if n == 0:
+        return None
+    k = (n - 1) * (min(max(p, 0.0), 100.0) / 100.0)
+    f = int(k)
+    c = min(f + 1, n - 1)
+    vf = value_at(f)
+    if f == c:
+        return float(vf)
+    return float(vf * (c - k) + value_at(c) * (k - f))
+
+
+def _hist_percentile(hist: List[Tuple[int, int]], p: float) -> Optional[float]:
+    """Linear-interpolated percentile of the values a (value, count) histogram (sorted by value) stands for."""
+    return _interpolated_percentile(sum(count for _, count in hist), lambda rank: _hist_value_at(hist, rank), p)
+
+
+def _open_hist_is_current(conn, company_slug: str, as_of_date: str) -> bool:
+    """lifespan_open_hist holds the open set as of any date on/after the company's last interval event."""
+    last_open, last_close = conn.execute(
+        """
+        SELECT (SELECT MAX(open_date) FROM job_intervals WHERE company_slug=?),
+               (SELECT MAX(close_date) FROM job_intervals WHERE company_slug=?)
+        """,
+        (company_slug, company_slug),
+    ).fetchone()
+    return (last_open or "") <= as_of_date and (last_close or "") <= as_of_date
 
 
 def compute_company_lifespan_summary(
@@ -184,8 +325,17 @@ def compute_company_lifespan_summary(
     as_of_date: str,
     *,
     window_days: int = 180,
+    by_role: bool = False,
     conn=None,
 ) -> LifespanSummary:
+    """
+    Lifespan stats per open interval of a posting (a reopened job counts once per
+    interval, gaps excluded), or per role episode (near-duplicate cluster, gaps
+    with nothing open excluded; see ROLE_EPISODES_SQL) with `by_role`.
+    Per-interval stats are read from the lifespan histograms (O(buckets)); the
+    open side falls back to scanning intervals for an as-of date in the past.
+    """
+    table, table_params = _lifecycle_source(company_slug, by_role)
     close_conn = False
     if conn is None:
         conn = get_connection()
@@ -196,86 +346,68 @@ def compute_company_lifespan_summary(
         as_of = datetime.strptime(as_of_date, "%Y-%m-%d").date()
         start = (as_of - timedelta(days=window_days - 1)).strftime("%Y-%m-%d")
 
-        rows = c.execute(
-            """
-            SELECT first_seen_date, closed_date
-            FROM job_lifecycle
-            WHERE company_slug=?
-              AND closed_date IS NOT NULL
-              AND closed_date >= ?
-              AND closed_date <= ?
-            """,
-            (company_slug, start, as_of_date),
-        ).fetchall()
-
-        durations: List[float] = []
-        close_within_7 = 0
-        for first_seen, closed_date in rows:
-            try:
-                fs = datetime.strptime(first_seen, "%Y-%m-%d").date()
-                cd = datetime.strptime(closed_date, "%Y-%m-%d").date()
-            except Exception:
-                continue
-            days_open = float((cd - fs).days + 1)
-            if days_open <= 0:
-                continue
-            durations.append(days_open)
-            if days_open <= 7:
-                close_within_7 += 1
-
-        durations.sort()
-        closed_roles_count = len(durations)
-        median_days = _percentile(durations, 50) if durations else None
-        p25_days = _percentile(durations, 25) if durations else None
-        p75_days = _percentile(durations, 75) if durations else None
+        # Closed durations (days open, inclusive) -> count, for closes inside the window
+        if by_role:
+            closed_hist = c.execute(
+                f"""
+                SELECT CAST(julianday(closed_date) - julianday(first_seen_date) AS INTEGER) + 1 AS days_open, COUNT(*)
+                FROM {table}
+                WHERE company_slug=?
+                  AND closed_date IS NOT NULL
+                  AND closed_date >= ?
+                  AND closed_date <= ?
+                GROUP BY days_open HAVING days_open > 0 ORDER BY days_open
+                """,
+                table_params + [company_slug, start, as_of_date],
+            ).fetchall()
+        else:
+            closed_hist = c.execute(
+                """
+                SELECT days_open, SUM(count) FROM lifespan_closed_hist
+                WHERE company_slug=? AND close_date >= ? AND close_date <= ?
+                GROUP BY days_open ORDER BY days_open
+                """,
+                (company_slug, start, as_of_date),
+            ).fetchall()
+
+        closed_roles_count = sum(n for _, n in closed_hist)
+        close_within_7 = sum(n for d, n in closed_hist if d <= 7)
+        median_days = _hist_percentile(closed_hist, 50)
+        p25_days = _hist_percentile(closed_hist, 25)
+        p75_days = _hist_percentile(closed_hist, 75)
         pct_close_within_7d = (close_within_7 / closed_roles_count) if closed_roles_count > 0 else None
 
-        # Open-role age buckets as-of date
-        open_rows = c.execute(
-            """
-            SELECT first_seen_date
-            FROM job_lifecycle
-            WHERE company_slug=?
-              AND (closed_date IS NULL OR closed_date > ?)
-            """,
-            (company_slug, as_of_date),
-        ).fetchall()
-
-        age_bucket_0_3 = age_bucket_4_7 = age_bucket_8_14 = age_bucket_15_30 = age_bucket_30_plus = 0
-        open_gt_30 = 0
-        open_gt_60 = 0
-        open_count = 0
-        open_ages: List[float] = []
-        for (first_seen,) in open_rows:
-            try:
-                fs = datetime.strptime(first_seen, "%Y-%m-%d").date()
-            except Exception:
-                continue
-            age = (as_of - fs).days + 1
-            if age <= 0:
-                continue
-            open_count += 1
-            open_ages.append(float(age))
-            if age <= 3:
-                age_bucket_0_3 += 1
-            elif age <= 7:
-                age_bucket_4_7 += 1
-            elif age <= 14:
-                age_bucket_8_14 += 1
-            elif age <= 30:
-                age_bucket_15_30 += 1
-            else:
-                age_bucket_30_plus += 1
+        # Open-role ages as-of date -> count (the open histogram shifted to as_of_date)
+        if not by_role and _open_hist_is_current(conn, company_slug, as_of_date):
+            open_hist = c.execute(
+                """
+                SELECT CAST(julianday(?) - julianday(open_date) AS INTEGER) + 1 AS age, SUM(count)
+                FROM lifespan_open_hist WHERE company_slug=?
+                GROUP BY age HAVING age > 0 ORDER BY age
+                """,
+                (as_of_date, company_slug),
+            ).fetchall()
+        else:
+            open_hist = c.execute(
+                f"""
+                SELECT CAST(julianday(?) - julianday(first_seen_date) AS INTEGER) + 1 AS age, COUNT(*)
+                FROM {table}
+                WHERE company_slug=?
+                  AND (closed_date IS NULL OR closed_date > ?)
+                GROUP BY age HAVING age > 0 ORDER BY age
+                """,
+                [as_of_date] + table_params + [company_slug, as_of_date],
+            ).fetchall()
 
-            if age > 30:
-                open_gt_30 += 1
-            if age > 60:
-                open_gt_60 += 1
+        def _ages(lo: int, hi: Optional[int] = None) -> int:
+            return sum(n for age, n in open_hist if age >= lo and (hi is None or age <= hi))
 
+        open_count = _ages(1)
+        open_gt_30 = _ages(31)
+        open_gt_60 = _ages(61)
         pct_open_gt_30d = (open_gt_30 / open_count) if open_count > 0 else None
         pct_open_gt_60d = (open_gt_60 / open_count) if open_count > 0 else None
-        open_ages.sort()
-        median_open_age_days = _percentile(open_ages, 50) if open_ages else None
+        median_open_age_days = _hist_percentile(open_hist, 50)
 
         return LifespanSummary(
             closed_roles_count=closed_roles_count,
@@ -286,12 +418,160 @@ def compute_company_lifespan_summary(
             pct_close_within_7d=pct_close_within_7d,
             pct_open_gt_30d=pct_open_gt_30d,
             pct_open_gt_60d=pct_open_gt_60d,
-            age_bucket_0_3=age_bucket_0_3,
-            age_bucket_4_7=age_bucket_4_7,
-            age_bucket_8_14=age_bucket_8_14,
-            age_bucket_15_30=age_bucket_15_30,
-            age_bucket_30_plus=age_bucket_30_plus,
+            age_bucket_0_3=_ages(1, 3),
+            age_bucket_4_7=_ages(4, 7),
+            age_bucket_8_14=_ages(8, 14),
+            age_bucket_15_30=_ages(15, 30),
+            age_bucket_30_plus=open_gt_30,
         )
     finally:
         if close_conn:
             conn.close()
+
+
+class _Fenwick:
+    """Counts over values 0..size-1: point add, prefix count and rank lookup in O(log size)."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.total = 0
+        self._tree = [0] * (size + 1)
+        self._top = 1 << max(size.bit_length() - 1, 0)
+
+    def add(self, value: int, n: int = 1) -> None:
+        self.total += n
+        i = value + 1
+        while i <= self.size:
+            self._tree[i] += n
+            i += i & -i
+
+    def count_below(self, value: int) -> int:
+        """Number of values < value."""
+        i, n = min(max(value, 0), self.size), 0
+        while i > 0:
+            n += self._tree[i]
+            i -= i & -i
+        return n
+
+    def value_at(self, rank: int) -> int:
+        """The rank-th smallest value (0-based)."""
+        pos, step = 0, self._top
+        while step:
+            nxt = pos + step
+            if nxt <= self.size and self._tree[nxt] <= rank:
+                pos = nxt
+                rank -= self._tree[nxt]
+            step >>= 1
+        return pos
+
+
+def compute_company_lifespan_history(
+    company_slug: str,
+    dates: Sequence[str],
+    *,
+    window_days: Sequence[int] = (180,),
+    by_role: bool = False,
+    conn=None,
+) -> Dict[Tuple[str, int], LifespanSummary]:
+    """
+    compute_company_lifespan_summary() for every date in `dates` and every window,
+    keyed (date, window_days), from one read of the company's intervals. A sweep
+    walks the sorted open/close events once, keeping the open set (by open day)
+    and each window's closed durations in Fenwick trees, so every summary is a
+    few O(log n) rank/range lookups instead of a rescan.
+    """
+    table, table_params = _lifecycle_source(company_slug, by_role)
+    close_conn = False
+    if conn is None:
+        conn = get_connection()
+        close_conn = True
+    try:
+        rows = conn.execute(
+            f"SELECT first_seen_date, closed_date FROM {table} WHERE company_slug=? AND first_seen_date IS NOT NULL",
+            table_params + [company_slug],
+        ).fetchall()
+    finally:
+        if close_conn:
+            conn.close()
+
+    def _day(d: str) -> int:
+        return date.fromisoformat(d).toordinal()
+
+    spans = [(_day(o), _day(c) if c else None) for o, c in rows]
+    targets = sorted({_day(d) for d in dates})
+    if not targets:
+        return {}
+    base = min([o for o, _ in spans] + targets)
+    top = max([o for o, _ in spans] + targets) - base + 1
+
+    # Open set: +1 at the open day, -1 at the close day (an interval closed on its
+    # open day is never open at the end of a day). Closed: one event per close.
+    opens = sorted(o for o, c in spans if c is None or c > o)
+    open_ends = sorted((c, o) for o, c in spans if c is not None and c > o)
+    closes = sorted((c, c - o + 1) for o, c in spans if c is not None and c >= o)
+    max_dur = max([d for _, d in closes], default=0) + 1
+
+    open_tree = _Fenwick(top)
+    windows = sorted(set(int(w) for w in window_days))
+    closed_trees = {w: _Fenwick(max_dur) for w in windows}
+    within_7 = {w: 0 for w in windows}
+    close_in = {w: 0 for w in windows}  # next close to enter each window
+    close_out = {w: 0 for w in windows}  # next close to leave it
+    oi = ei = 0
+
+    out: Dict[Tuple[str, int], LifespanSummary] = {}
+    for day in targets:
+        while oi < len(opens) and opens[oi] <= day:
+            open_tree.add(opens[oi] - base)
+            oi += 1
+        while ei < len(open_ends) and open_ends[ei][0] <= day:
+            open_tree.add(open_ends[ei][1] - base, -1)  # opened before its close, so already added
+            ei += 1
+
+        for w in windows:
+            tree = closed_trees[w]
+            while close_in[w] < len(closes) and closes[close_in[w]][0] <= day:
+                dur = closes[close_in[w]][1]
+                tree.add(dur)
+                within_7[w] += dur <= 7
+                close_in[w] += 1
+            while close_out[w] < len(closes) and closes[close_out[w]][0] <= day - w:
+                dur = closes[close_out[w]][1]
+                tree.add(dur, -1)
+                within_7[w] -= dur <= 7
+                close_out[w] += 1
+
+        # Open ages: age = today - open day + 1, so ascending ages are descending open days
+        today, n_open = day - base, open_tree.total
+
+        def _ages(lo: int, hi: Optional[int] = None) -> int:
+            below = 0 if hi is None else open_tree.count_below(today - hi + 1)
+            return open_tree.count_below(today - lo + 2) - below
+
+        open_gt_30 = _ages(31)
+        open_summary = dict(
+            median_open_age_days=_interpolated_percentile(
+                n_open, lambda rank: today - open_tree.value_at(n_open - 1 - rank) + 1, 50
+            ),
+            pct_open_gt_30d=(open_gt_30 / n_open) if n_open > 0 else None,
+            pct_open_gt_60d=(_ages(61) / n_open) if n_open > 0 else None,
+            age_bucket_0_3=_ages(1, 3),
+            age_bucket_4_7=_ages(4, 7),
+            age_bucket_8_14=_ages(8, 14),
+            age_bucket_15_30=_ages(15, 30),
+            age_bucket_30_plus=open_gt_30,
+        )
+        as_of = date.fromordinal(day).strftime("%Y-%m-%d")
+        for w in windows:
+            tree = closed_trees[w]
+            n = tree.total
+            out[(as_of, w)] = LifespanSummary(
+                closed_roles_count=n,
+                median_days=_interpolated_percentile(n, tree.value_at, 50),
+                p25_days=_interpolated_percentile(n, tree.value_at, 25),
+                p75_days=_interpolated_percentile(n, tree.value_at, 75),
+                pct_close_within_7d=(within_7[w] / n) if n > 0 else None,
+                **open_summary,
+            )
+    return out
+
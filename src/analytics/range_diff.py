@@ -0,0 +1,165 @@
+import json
+from typing import Any, Dict, List, Optional
+
+from src.news.models import get_connection
+from src.config import SENIOR_PLUS_LEVELS
+from src.analytics.intervals import has_rtree
+
+# ---------------------------------------------------------------------------
+# Date-range diffs
+# ---------------------------------------------------------------------------
+# Net change between the end of `start_date` and the end of `end_date`, for one
+# company or all of them, answered from indexed tables instead of chaining
+# per-run diff files:
+#   - job_intervals (one row per open stretch [open_date, close_date) of a job)
+#     give which jobs were open at each end -> added / removed
+#   - job_changes (one row per changed job per run) -> changed, collapsed to the
+#     net before/after per field; fields that changed back are dropped
+# A job is open at the end of day D if one of its intervals has
+# open_date <= D < close_date (or is still open), so a job that closed and came
+# back is not counted as open during the gap. Title/url/tags come from
+# job_lifecycle. All-company queries go through the job_intervals_rtree interval
+# index when present; one company uses its B-tree indexes.
+
+_LIFECYCLE_COLUMNS = ["company_slug", "job_key", "title", "url", "discipline", "seniority", "first_seen_date", "closed_date"]
+
+_SELECT = """
+    SELECT i.company_slug, i.job_key, jl.title, jl.url, jl.discipline, jl.seniority, i.open_date, i.close_date
+    FROM {source}
+    LEFT JOIN job_lifecycle jl ON jl.company_slug = i.company_slug AND jl.job_key = i.job_key
+"""
+
+# Some interval of job (company_slug, job_key) of the outer row `i` is open at the end of a date
+_OPEN_AT = """EXISTS (
+    SELECT 1 FROM job_intervals o
+    WHERE o.company_slug = {alias}.company_slug AND o.job_key = {alias}.job_key
+      AND o.open_date <= ? AND (o.close_date IS NULL OR o.close_date > ?)
+)"""
+
+
+def _company_filter(company_slug: Optional[str], alias: str = ""):
+    if not company_slug:
+        return "", []
+    return f" AND {alias}company_slug = ?", [company_slug]
+
+
+def _rows(cur) -> List[Dict[str, Any]]:
+    return [dict(zip(_LIFECYCLE_COLUMNS, r)) for r in cur.fetchall()]
+
+
+def _interval_query(company_slug: Optional[str], use_rtree: bool, opened_in_range: bool):
+    """
+    Intervals open at one end of the range only: opened inside it and open at its
+    end (`opened_in_range`), else open at its start and closed inside it.
+    Parameters are start_date, end_date (+ company).
+    """
+    where_company, company_params = _company_filter(company_slug, "i.")
+    if use_rtree and not company_slug:
+        source = "job_intervals_rtree r JOIN job_intervals i ON i.id = r.id"
+        day = "CAST(julianday(?) AS INTEGER)"
+        if opened_in_range:
+            where = f"r.open_day > {day} AND r.open_day <= {day} AND r.close_day > {day}"
+        else:
+            where = f"r.open_day <= {day} AND r.close_day > {day} AND r.close_day <= {day}"
+    else:
+        source = "job_intervals i"
+        if opened_in_range:
+            where = "i.open_date > ? AND i.open_date <= ? AND (i.close_date IS NULL OR i.close_date > ?)"
+        else:
+            where = "i.open_date <= ? AND i.close_date > ? AND i.close_date <= ?"
+    return _SELECT.format(source=source) + f" WHERE {where}{where_company}", company_params
+
+
+def compute_range_diff(
+    start_date: str,
+    end_date: str,
+    company_slug: Optional[str] = None,
+    *,
+    conn=None,
+) -> Dict[str, Any]:
+    """
+    Net added / removed / changed jobs between two dates (YYYY-MM-DD, start < end).
+    Returns the same shape as a per-run diff (summary + added/removed/changed),
+    with company_slug on every record. first_seen_date / closed_date are those of
+    the interval open at the end (added) or start (removed) of the range.
+    """
+    if start_date >= end_date:
+        raise ValueError(f"start_date ({start_date}) must be before end_date ({end_date})")
+
+    close_conn = False
+    if conn is None:
+        conn = get_connection()
+        close_conn = True
+    try:
+        c = conn.cursor()
+        use_rtree = has_rtree(conn)
+        _, company_params = _company_filter(company_slug)
+
+        # Open at end, not open at start (the interval open at the end began inside the range;
+        # an earlier interval of the same job may still have been open at the start)
+        sql, params = _interval_query(company_slug, use_rtree, opened_in_range=True)
+        added = _rows(c.execute(
+            sql + " AND NOT " + _OPEN_AT.format(alias="i") + " ORDER BY i.company_slug, i.open_date",
+            [start_date, end_date, end_date] + params + [start_date, start_date],
+        ))
+
+        # Open at start, not open at end (closed inside the range and not reopened by its end)
+        sql, params = _interval_query(company_slug, use_rtree, opened_in_range=False)
+        removed = _rows(c.execute(
+            sql + " AND NOT " + _OPEN_AT.format(alias="i") + " ORDER BY i.company_slug, i.close_date",
+            [start_date, start_date, end_date] + params + [end_date, end_date],
+        ))
+
+        # Open at both ends with at least one field-level change in between
+        where_company_ch, _ = _company_filter(company_slug, "ch.")
+        change_rows = c.execute(
+            f"""
+            SELECT ch.company_slug, ch.job_key, ch.run_timestamp, ch.changes,
+                   jl.title, jl.url, jl.discipline, jl.seniority
+            FROM job_changes ch
+            LEFT JOIN job_lifecycle jl
+              ON jl.company_slug = ch.company_slug AND jl.job_key = ch.job_key
+            WHERE ch.date > ? AND ch.date <= ?{where_company_ch}
+              AND {_OPEN_AT.format(alias="ch")}
+              AND {_OPEN_AT.format(alias="ch")}
+            ORDER BY ch.company_slug, ch.job_key, ch.run_timestamp
+            """,
+            [start_date, end_date] + company_params + [start_date, start_date, end_date, end_date],
+        ).fetchall()
+    finally:
+        if close_conn:
+            conn.close()
+
+    changed: List[Dict[str, Any]] = []
+    current = None
+    for slug, key, _, changes_json, title, url, discipline, seniority in change_rows:
+        if current is None or (current["company_slug"], current["job_key"]) != (slug, key):
+            current = {
+                "company_slug": slug, "job_key": key, "title": title, "url": url,
+                "discipline": discipline, "seniority": seniority, "changes": {},
+            }
+            changed.append(current)
+        for field, vals in json.loads(changes_json).items():
+            net = current["changes"].setdefault(field, {"before": vals.get("before")})
+            net["after"] = vals.get("after")
+
+    # Net: drop fields that ended where they started, then jobs with nothing left
+    for item in changed:
+        item["changes"] = {f: v for f, v in item["changes"].items() if v["before"] != v["after"]}
+    changed = [item for item in changed if item["changes"]]
+
+    return {
+        "company_slug": company_slug,
+        "start_date": start_date,
+        "end_date": end_date,
+        "summary": {
+            "added": len(added),
+            "removed": len(removed),
+            "changed": len(changed),
+            "senior_plus_added": sum(1 for j in added if j.get("seniority") in SENIOR_PLUS_LEVELS),
+            "companies": len({j["company_slug"] for j in added + removed + changed}),
+        },
+        "added": added,
+        "removed": removed,
+        "changed": changed,
+    }
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 import logging
 import math
 import statistics
@@ -76,325 +78,651 @@ def _timing_hint(median_days: Optional[float], pct_close_7d: Optional[float], pc
     return ("Apply within 7 days", "low")
 
 
-def compute_company_signal(company_slug: str, run_date: str, *, lookback_days: int = 7) -> CompanySignal:
-    conn = get_connection()
-    try:
-        c = conn.cursor()
-
-        # Open-now: latest value on/before run_date
-        row = c.execute(
-            """
-            SELECT open_now_count
-            FROM company_open_now_daily
-            WHERE company_slug=? AND date <= ?
-            ORDER BY date DESC
-            LIMIT 1
-            """,
-            (company_slug, run_date),
-        ).fetchone()
-        open_now = int(row[0]) if row else 0
-
-        end = datetime.strptime(run_date, "%Y-%m-%d").date()
-        start = (end - timedelta(days=lookback_days - 1)).strftime("%Y-%m-%d")
-        prev_start = (end - timedelta(days=2 * lookback_days - 1)).strftime("%Y-%m-%d")
-        prev_end = (end - timedelta(days=lookback_days)).strftime("%Y-%m-%d")
-
-        sums = c.execute(
-            """
-            SELECT
-                COALESCE(SUM(added_count), 0),
-                COALESCE(SUM(removed_count), 0)
-            FROM job_diffs_daily
-            WHERE company_slug=? AND date >= ? AND date <= ?
-            """,
-            (company_slug, start, run_date),
-        ).fetchone()
-        added_7d = int(sums[0] or 0)
-        removed_7d = int(sums[1] or 0)
-        net_7d = added_7d - removed_7d
-
-        prev = c.execute(
-            """
-            SELECT
-                COALESCE(SUM(added_count), 0),
-                COALESCE(SUM(removed_count), 0)
-            FROM job_diffs_daily
-            WHERE company_slug=? AND date >= ? AND date <= ?
-            """,
-            (company_slug, prev_start, prev_end),
-        ).fetchone()
-        prev_added = int(prev[0] or 0)
-        prev_removed = int(prev[1] or 0)
-        prev_net = prev_added - prev_removed
-
-        # Volatility: std dev of daily net over lookback window
-        daily = c.execute(
-            """
-            SELECT date, added_count, removed_count
-            FROM job_diffs_daily
-            WHERE company_slug=? AND date >= ? AND date <= ?
-            ORDER BY date ASC
-            """,
-            (company_slug, start, run_date),
-        ).fetchall()
-        daily_net = [(int(a) - int(r)) for _, a, r in daily]
-        volatility = statistics.pstdev(daily_net) if len(daily_net) >= 2 else 0.0
-
-        # Open-now direction (lookback vs previous window)
-        open_rows = c.execute(
-            """
-            SELECT date, open_now_count
-            FROM company_open_now_daily
-            WHERE company_slug=? AND date >= ? AND date <= ?
-            ORDER BY date ASC
-            """,
-            (company_slug, prev_start, run_date),
-        ).fetchall()
-        open_by_date = {d: int(v) for d, v in open_rows}
-        open_start = open_by_date.get(start)
-        open_end = open_by_date.get(run_date)
-        open_delta = (open_end - open_start) if (open_start is not None and open_end is not None) else None
-
-        # Discipline mix shift (simple): last window vs prev window
-        disc_rows = c.execute(
-            """
-            SELECT date, discipline, added_count
-            FROM job_diffs_discipline_daily
-            WHERE company_slug=? AND date >= ? AND date <= ?
-            """,
-            (company_slug, prev_start, run_date),
-        ).fetchall()
-        disc_last: Dict[str, int] = {}
-        disc_prev: Dict[str, int] = {}
-        for d, disc, cnt in disc_rows:
-            disc = disc or "Other"
-            if start <= d <= run_date:
-                disc_last[disc] = disc_last.get(disc, 0) + int(cnt or 0)
-            elif prev_start <= d <= prev_end:
-                disc_prev[disc] = disc_prev.get(disc, 0) + int(cnt or 0)
-
-        def _top_share(dmap: Dict[str, int]) -> Tuple[Optional[str], float, int]:
-            total = sum(dmap.values())
-            if total <= 0:
-                return (None, 0.0, 0)
-            top_disc, top_cnt = max(dmap.items(), key=lambda x: x[1])
-            return (top_disc, top_cnt / total, total)
-
-        top_last, share_last, tot_last = _top_share(disc_last)
-        top_prev, share_prev, tot_prev = _top_share(disc_prev)
-        mix_shift = False
-        mix_shift_reason = None
-        if top_last and tot_last >= 6 and tot_prev >= 6:
-            if (top_last != top_prev) or (share_last - share_prev >= 0.25):
-                mix_shift = True
-                mix_shift_reason = f"New mix focus: {top_last} ({share_last:.0%} of adds)"
-
-        # Baseline add/remove rate over last 28d
-        baseline_start = (end - timedelta(days=27)).strftime("%Y-%m-%d")
-        baseline = c.execute(
-            """
-            SELECT
-                AVG(added_count),
-                AVG(removed_count)
-            FROM job_diffs_daily
-            WHERE company_slug=? AND date >= ? AND date <= ?
-            """,
-            (company_slug, baseline_start, run_date),
-        ).fetchone()
-        base_add = float(baseline[0] or 0.0)
-        base_rem = float(baseline[1] or 0.0)
-
-        # Lifespan stats (precomputed)
-        life = c.execute(
-            """
-            SELECT median_days, pct_close_within_7d, pct_open_gt_30d
-            FROM company_lifespan_daily
-            WHERE company_slug=? AND date=? AND window_days=180
-            """,
-            (company_slug, run_date),
-        ).fetchone()
-        median_days = float(life[0]) if life and life[0] is not None else None
-        pct_close_7d = float(life[1]) if life and life[1] is not None else None
-        pct_open_gt_30d = float(life[2]) if life and life[2] is not None else None
-
-        timing_hint, timing_conf = _timing_hint(median_days, pct_close_7d, pct_open_gt_30d)
-
-        # Best weekdays from last 12 weeks
-        weekday_start = (end - timedelta(days=83)).strftime("%Y-%m-%d")
-        wk_rows = c.execute(
-            """
-            SELECT strftime('%w', date) as wd, AVG(added_count) as a_mean, AVG(removed_count) as r_mean
-            FROM job_diffs_daily
-            WHERE company_slug=? AND date >= ? AND date <= ?
-            GROUP BY wd
-            """,
-            (company_slug, weekday_start, run_date),
-        ).fetchall()
-        add_mean = {_weekday_int_from_sqlite_w(wd): float(a or 0.0) for wd, a, _ in wk_rows}
-        rem_mean = {_weekday_int_from_sqlite_w(wd): float(r or 0.0) for wd, _, r in wk_rows}
-        best_post = _best_weekday(add_mean)
-        best_remove = _best_weekday(rem_mean)
-
-        # Headline: latest major news within lookback window, else latest headline
-        news = c.execute(
-            """
-            SELECT top_headline_title, top_headline_url
-            FROM company_news_daily
-            WHERE company_slug=?
-              AND date >= ? AND date <= ?
-              AND (has_major_event=1 OR article_count > 0)
-            ORDER BY (has_major_event=1) DESC, date DESC
-            LIMIT 1
-            """,
-            (company_slug, start, run_date),
-        ).fetchone()
-        headline_title = news[0] if news else None
-        headline_url = news[1] if news else None
-
-        # State + label
-        slope = net_7d - prev_net
-        churn = added_7d + removed_7d
-        open_norm = max(open_now, 1)
-        net_ratio = net_7d / open_norm
-
-        # Volatility threshold scales with company size; 2-3 changes can be huge for a small company.
-        min_vol = max(2.0, 0.10 * float(open_norm))
-        vol_threshold = max(min_vol, (0.25 * abs(net_7d)) + 2.0)
-
+@dataclass
+class _SignalInputs:
+    """One company's aggregates, as loaded by _load_inputs."""
+    open_now: Optional[int] = None  # latest on/before run date (None: not loaded yet)
+    added: int = 0  # lookback window
+    removed: int = 0
+    prev_added: int = 0  # previous window
+    prev_removed: int = 0
+    base_add: Optional[float] = None  # AVG over the last 28d
+    base_rem: Optional[float] = None
+    daily: List[Tuple[int, int]] = field(default_factory=list)  # (added, removed) per day in the lookback window
+    open_by_date: Dict[str, int] = field(default_factory=dict)
+    disc_last: Dict[str, int] = field(default_factory=dict)  # discipline -> adds, in first-seen order
+    disc_prev: Dict[str, int] = field(default_factory=dict)
+    weekdays: List[Tuple[str, Optional[float], Optional[float]]] = field(default_factory=list)  # %w, AVG added, AVG removed
+    lifespan: Optional[Tuple[Optional[float], Optional[float], Optional[float]]] = None
+    headline: Optional[Tuple[Optional[str], Optional[str]]] = None
+
+
+def _windows(run_date: str, lookback_days: int) -> Dict[str, str]:
+    end = datetime.strptime(run_date, "%Y-%m-%d").date()
+    return {
+        "start": (end - timedelta(days=lookback_days - 1)).strftime("%Y-%m-%d"),
+        "prev_start": (end - timedelta(days=2 * lookback_days - 1)).strftime("%Y-%m-%d"),
+        "prev_end": (end - timedelta(days=lookback_days)).strftime("%Y-%m-%d"),
+        "baseline_start": (end - timedelta(days=27)).strftime("%Y-%m-%d"),  # last 28d
+        "weekday_start": (end - timedelta(days=83)).strftime("%Y-%m-%d"),  # last 12 weeks
+    }
+
+
+def _load_inputs(conn, run_date: str, w: Dict[str, str], company_slug: Optional[str] = None) -> Dict[str, _SignalInputs]:
+    """
+    Every input the signal needs, for all companies (every one in
+    job_diffs_daily plus any other with input) or one, in a handful of
+    date-window queries (GROUP BY company where the value is an aggregate).
+    Sums and means stay in SQL, so they are computed exactly as the per-company
+    queries computed them.
+    """
+    company_filter = " AND company_slug = :company_slug" if company_slug else ""
+    params = dict(w, run_date=run_date, company_slug=company_slug)
+    params["lo"] = min(w["prev_start"], w["baseline_start"])
+    inputs: Dict[str, _SignalInputs] = {}
+
+    def _get(slug: str) -> _SignalInputs:
+        inp = inputs.get(slug)
+        if inp is None:
+            inp = inputs[slug] = _SignalInputs()
+        return inp
+
+    # Open-now over the comparison window; the last row per company is its latest value
+    for slug, d, v in conn.execute(
+        f"""
+        SELECT company_slug, date, open_now_count FROM company_open_now_daily
+        WHERE date >= :prev_start AND date <= :run_date{company_filter}
+        ORDER BY company_slug, date
+        """,
+        params,
+    ):
+        inp = _get(slug)
+        inp.open_by_date[d] = int(v)
+        inp.open_now = int(v)
+
+    for slug, added, removed, prev_added, prev_removed, base_add, base_rem in conn.execute(
+        f"""
+        SELECT
+            company_slug,
+            COALESCE(SUM(CASE WHEN date >= :start THEN added_count END), 0),
+            COALESCE(SUM(CASE WHEN date >= :start THEN removed_count END), 0),
+            COALESCE(SUM(CASE WHEN date >= :prev_start AND date <= :prev_end THEN added_count END), 0),
+            COALESCE(SUM(CASE WHEN date >= :prev_start AND date <= :prev_end THEN removed_count END), 0),
+            AVG(CASE WHEN date >= :baseline_start THEN added_count END),
+            AVG(CASE WHEN date >= :baseline_start THEN removed_count END)
+        FROM job_diffs_daily
+        WHERE date >= :lo AND date <= :run_date{company_filter}
+        GROUP BY company_slug
+        """,
+        params,
+    ):
+        inp = _get(slug)
+        inp.added, inp.removed = int(added or 0), int(removed or 0)
+        inp.prev_added, inp.prev_removed = int(prev_added or 0), int(prev_removed or 0)
+        inp.base_add, inp.base_rem = base_add, base_rem
+
+    for slug, added, removed in conn.execute(
+        f"""
+        SELECT company_slug, added_count, removed_count
+        FROM job_diffs_daily
+        WHERE date >= :start AND date <= :run_date{company_filter}
+        ORDER BY company_slug, date
+        """,
+        params,
+    ):
+        _get(slug).daily.append((added, removed))
+
+    for slug, wd, a_mean, r_mean in conn.execute(
+        f"""
+        SELECT company_slug, strftime('%w', date) as wd, AVG(added_count), AVG(removed_count)
+        FROM job_diffs_daily
+        WHERE date >= :weekday_start AND date <= :run_date{company_filter}
+        GROUP BY company_slug, wd
+        ORDER BY company_slug, wd
+        """,
+        params,
+    ):
+        _get(slug).weekdays.append((wd, a_mean, r_mean))
+
+    # Primary-key order, so ties for the top discipline resolve as in a per-company scan
+    for slug, d, disc, cnt in conn.execute(
+        f"""
+        SELECT company_slug, date, discipline, added_count
+        FROM job_diffs_discipline_daily
+        WHERE date >= :prev_start AND date <= :run_date{company_filter}
+        ORDER BY company_slug, date, discipline
+        """,
+        params,
+    ):
+        inp = _get(slug)
+        disc = disc or "Other"
+        if d >= w["start"]:
+            inp.disc_last[disc] = inp.disc_last.get(disc, 0) + int(cnt or 0)
+        elif d <= w["prev_end"]:
+            inp.disc_prev[disc] = inp.disc_prev.get(disc, 0) + int(cnt or 0)
+
+    for slug, median_days, pct_close_7d, pct_open_gt_30d in conn.execute(
+        f"""
+        SELECT company_slug, median_days, pct_close_within_7d, pct_open_gt_30d
+        FROM company_lifespan_daily
+        WHERE date = :run_date AND window_days=180{company_filter}
+        """,
+        params,
+    ):
+        _get(slug).lifespan = (median_days, pct_close_7d, pct_open_gt_30d)
+
+    # Headline: latest major news within lookback window, else latest headline
+    for slug, title, url in conn.execute(
+        f"""
+        SELECT company_slug, top_headline_title, top_headline_url
+        FROM company_news_daily
+        WHERE date >= :start AND date <= :run_date{company_filter}
+          AND (has_major_event=1 OR article_count > 0)
+        ORDER BY company_slug, (has_major_event=1) DESC, date DESC
+        """,
+        params,
+    ):
+        inp = _get(slug)
+        if inp.headline is None:
+            inp.headline = (title, url)
+
+    # Known companies with nothing in the windows still get (empty) inputs
+    if company_slug:
+        _get(company_slug)
+    else:
+        for (slug,) in conn.execute("SELECT DISTINCT company_slug FROM job_diffs_daily"):
+            _get(slug)
+
+    # Open-now for companies with no value in the window: latest one before it
+    for slug, inp in inputs.items():
+        if inp.open_now is None:
+            row = conn.execute(
+                """
+                SELECT open_now_count FROM company_open_now_daily
+                WHERE company_slug=? AND date <= ?
+                ORDER BY date DESC LIMIT 1
+                """,
+                (slug, run_date),
+            ).fetchone()
+            inp.open_now = int(row[0]) if row else 0
+
+    return inputs
+
+
+def _signal_from_inputs(
+    company_slug: str, run_date: str, lookback_days: int, w: Dict[str, str], inp: _SignalInputs
+) -> CompanySignal:
+    start, prev_start, prev_end = w["start"], w["prev_start"], w["prev_end"]
+    open_now = inp.open_now
+
+    added_7d = inp.added
+    removed_7d = inp.removed
+    net_7d = added_7d - removed_7d
+    prev_net = inp.prev_added - inp.prev_removed
+
+    # Volatility: std dev of daily net over lookback window
+    daily_net = [(int(a) - int(r)) for a, r in inp.daily]
+    volatility = statistics.pstdev(daily_net) if len(daily_net) >= 2 else 0.0
+
+    # Open-now direction (lookback vs previous window)
+    open_start = inp.open_by_date.get(start)
+    open_end = inp.open_by_date.get(run_date)
+    open_delta = (open_end - open_start) if (open_start is not None and open_end is not None) else None
+
+    # Discipline mix shift (simple): last window vs prev window
+    disc_last = inp.disc_last
+    disc_prev = inp.disc_prev
+
+    def _top_share(dmap: Dict[str, int]) -> Tuple[Optional[str], float, int]:
+        total = sum(dmap.values())
+        if total <= 0:
+            return (None, 0.0, 0)
+        top_disc, top_cnt = max(dmap.items(), key=lambda x: x[1])
+        return (top_disc, top_cnt / total, total)
+
+    top_last, share_last, tot_last = _top_share(disc_last)
+    top_prev, share_prev, tot_prev = _top_share(disc_prev)
+    mix_shift = False
+    mix_shift_reason = None
+    if top_last and tot_last >= 6 and tot_prev >= 6:
+        if (top_last != top_prev) or (share_last - share_prev >= 0.25):
+            mix_shift = True
+            mix_shift_reason = f"New mix focus: {top_last} ({share_last:.0%} of adds)"
+
+    # Baseline add/remove rate over last 28d
+    base_add = float(inp.base_add or 0.0)
+    base_rem = float(inp.base_rem or 0.0)
+
+    # Lifespan stats (precomputed)
+    life = inp.lifespan
+    median_days = float(life[0]) if life and life[0] is not None else None
+    pct_close_7d = float(life[1]) if life and life[1] is not None else None
+    pct_open_gt_30d = float(life[2]) if life and life[2] is not None else None
+
+    timing_hint, timing_conf = _timing_hint(median_days, pct_close_7d, pct_open_gt_30d)
+
+    # Best weekdays from last 12 weeks
+    add_mean = {_weekday_int_from_sqlite_w(wd): float(a or 0.0) for wd, a, _ in inp.weekdays}
+    rem_mean = {_weekday_int_from_sqlite_w(wd): float(r or 0.0) for wd, _, r in inp.weekdays}
+    best_post = _best_weekday(add_mean)
+    best_remove = _best_weekday(rem_mean)
+
+    headline_title = inp.headline[0] if inp.headline else None
+    headline_url = inp.headline[1] if inp.headline else None
+
+    # State + label
+    slope = net_7d - prev_net
+    churn = added_7d + removed_7d
+    open_norm = max(open_now, 1)
+    net_ratio = net_7d / open_norm
+
+    # Volatility threshold scales with company size; 2-3 changes can be huge for a small company.
+    min_vol = max(2.0, 0.10 * float(open_norm))
+    vol_threshold = max(min_vol, (0.25 * abs(net_7d)) + 2.0)
+
+    state = "Stable"
+    if net_7d <= -max(5, int(0.15 * open_norm)) or (removed_7d >= added_7d + 10 and net_7d < 0):
+        state = "Freezing"
+    elif volatility >= vol_threshold or churn >= max(10, int(0.6 * open_norm)):
+        state = "Volatile"
+    elif net_7d >= max(5, int(0.15 * open_norm)) and slope >= max(3, int(0.05 * open_norm)):
+        state = "Accelerating"
+    elif net_7d > 0 and slope <= -max(3, int(0.05 * open_norm)):
+        state = "Slowing"
+    elif abs(net_7d) <= 2 and churn <= max(4, int(0.2 * open_norm)):
         state = "Stable"
-        if net_7d <= -max(5, int(0.15 * open_norm)) or (removed_7d >= added_7d + 10 and net_7d < 0):
-            state = "Freezing"
-        elif volatility >= vol_threshold or churn >= max(10, int(0.6 * open_norm)):
-            state = "Volatile"
-        elif net_7d >= max(5, int(0.15 * open_norm)) and slope >= max(3, int(0.05 * open_norm)):
-            state = "Accelerating"
-        elif net_7d > 0 and slope <= -max(3, int(0.05 * open_norm)):
-            state = "Slowing"
-        elif abs(net_7d) <= 2 and churn <= max(4, int(0.2 * open_norm)):
-            state = "Stable"
-        else:
-            state = "Steady"
-
-        # Label is the user-facing "board bucket". Allow "Booming" even with flat acceleration
-        # when growth is extremely high relative to current open roles.
-        label = "Quiet"
-        extreme_growth = (net_ratio >= 0.25) and (net_7d >= max(10, int(0.20 * open_norm)))
-        if state == "Freezing":
-            label = "Freezing"
-        elif state == "Volatile":
-            label = "Volatile"
-        elif state == "Accelerating" or extreme_growth:
-            label = "Booming"
-        elif state in ("Steady", "Stable"):
-            label = "Stable"
-        else:
-            label = "Stable"
-
-        # "Mover" gating
-        triggers: List[str] = []
-        abs_net_trigger = abs(net_7d) >= max(10, int(0.2 * open_norm))
-        if abs_net_trigger:
-            triggers.append(f"Net {lookback_days}d = {net_7d:+d}")
-        if added_7d >= int(max(10.0, base_add * lookback_days * 1.8)):
-            triggers.append(f"Adds spike ({added_7d} vs baseline ~{base_add:.1f}/day)")
-        if removed_7d >= int(max(10.0, base_rem * lookback_days * 1.8)):
-            triggers.append(f"Removals spike ({removed_7d} vs baseline ~{base_rem:.1f}/day)")
-        if state == "Volatile":
-            triggers.append(f"High churn ({churn} changes)")
-        if open_delta is not None and abs(open_delta) >= max(5, int(0.15 * open_norm)):
-            triggers.append(f"Open roles shift ({open_delta:+d} in {lookback_days}d)")
-        if mix_shift and mix_shift_reason:
-            triggers.append(mix_shift_reason)
-
-        is_mover = len(triggers) > 0
-        mover_reason = "; ".join(triggers) if triggers else "Low signal this week"
-
-        # Add networking context to the timing hint (keeps UX compact)
-        if mix_shift:
-            timing_hint = f"Network now (new focus); {timing_hint}"
-            timing_conf = "med" if timing_conf == "low" else timing_conf
-        if state in ("Accelerating", "Volatile") and "Apply" in timing_hint:
-            timing_hint = f"{timing_hint}; network now"
-        if state == "Freezing":
-            timing_hint = "Network now; apply strategically (freeze risk)"
-            timing_conf = "med"
-
-        # Momentum score (0-100, simple + explainable)
-        score = 50.0
-        score += 60.0 * math.tanh(net_ratio * 3.0)  # net vs open_now
-        score += 10.0 * math.tanh((added_7d / max(lookback_days, 1)) / 10.0)
-        score -= 10.0 * math.tanh((removed_7d / max(lookback_days, 1)) / 10.0)
-        score -= 10.0 * math.tanh(volatility / 10.0)
-        score = _clamp(score, 0.0, 100.0)
-
-        return CompanySignal(
-            company_slug=company_slug,
-            date=run_date,
-            lookback_days=lookback_days,
-            momentum_state=state,
-            momentum_label=label,
-            momentum_score=score,
-            is_mover=is_mover,
-            mover_reason=mover_reason,
-            timing_hint=timing_hint,
-            timing_confidence=timing_conf,
-            best_post_weekday=best_post,
-            best_remove_weekday=best_remove,
-            headline_title=headline_title,
-            headline_url=headline_url,
-        )
+    else:
+        state = "Steady"
+
+    # Label is the user-facing "board bucket". Allow "Booming" even with flat acceleration
+    # when growth is extremely high relative to current open roles.
+    label = "Quiet"
+    extreme_growth = (net_ratio >= 0.25) and (net_7d >= max(10, int(0.20 * open_norm)))
+    if state == "Freezing":
+        label = "Freezing"
+    elif state == "Volatile":
+        label = "Volatile"
+    elif state == "Accelerating" or extreme_growth:
+        label = "Booming"
+    elif state in ("Steady", "Stable"):
+        label = "Stable"
+    else:
+        label = "Stable"
+
+    # "Mover" gating
+    triggers: List[str] = []
+    abs_net_trigger = abs(net_7d) >= max(10, int(0.2 * open_norm))
+    if abs_net_trigger:
+        triggers.append(f"Net {lookback_days}d = {net_7d:+d}")
+    if added_7d >= int(max(10.0, base_add * lookback_days * 1.8)):
+        triggers.append(f"Adds spike ({added_7d} vs baseline ~{base_add:.1f}/day)")
+    if removed_7d >= int(max(10.0, base_rem * lookback_days * 1.8)):
+        triggers.append(f"Removals spike ({removed_7d} vs baseline ~{base_rem:.1f}/day)")
+    if state == "Volatile":
+        triggers.append(f"High churn ({churn} changes)")
+    if open_delta is not None and abs(open_delta) >= max(5, int(0.15 * open_norm)):
+        triggers.append(f"Open roles shift ({open_delta:+d} in {lookback_days}d)")
+    if mix_shift and mix_shift_reason:
+        triggers.append(mix_shift_reason)
+
+    is_mover = len(triggers) > 0
+    mover_reason = "; ".join(triggers) if triggers else "Low signal this week"
+
+    # Add networking context to the timing hint (keeps UX compact)
+    if mix_shift:
+        timing_hint = f"Network now (new focus); {timing_hint}"
+        timing_conf = "med" if timing_conf == "low" else timing_conf
+    if state in ("Accelerating", "Volatile") and "Apply" in timing_hint:
+        timing_hint = f"{timing_hint}; network now"
+    if state == "Freezing":
+        timing_hint = "Network now; apply strategically (freeze risk)"
+        timing_conf = "med"
+
+    # Momentum score (0-100, simple + explainable)
+    score = 50.0
+    score += 60.0 * math.tanh(net_ratio * 3.0)  # net vs open_now
+    score += 10.0 * math.tanh((added_7d / max(lookback_days, 1)) / 10.0)
+    score -= 10.0 * math.tanh((removed_7d / max(lookback_days, 1)) / 10.0)
+    score -= 10.0 * math.tanh(volatility / 10.0)
+    score = _clamp(score, 0.0, 100.0)
+
+    return CompanySignal(
+        company_slug=company_slug,
+        date=run_date,
+        lookback_days=lookback_days,
+        momentum_state=state,
+        momentum_label=label,
+        momentum_score=score,
+        is_mover=is_mover,
+        mover_reason=mover_reason,
+        timing_hint=timing_hint,
+        timing_confidence=timing_conf,
+        best_post_weekday=best_post,
+        best_remove_weekday=best_remove,
+        headline_title=headline_title,
+        headline_url=headline_url,
+    )
+
+
+def compute_signals(
+    run_date: str,
+    *,
+    lookback_days: int = 7,
+    company_slug: Optional[str] = None,
+    conn=None,
+) -> Dict[str, CompanySignal]:
+    """
+    Dict of company_slug -> CompanySignal (equal to what a per-company
+    computation gives), from one bulk read per table instead of a round of
+    queries per company. Covers every company in job_diffs_daily, companies
+    with nothing in the windows getting the signal of empty inputs, plus any
+    other company with signal input; or just `company_slug`.
+    """
+    close_conn = False
+    if conn is None:
+        conn = get_connection()
+        close_conn = True
+    w = _windows(run_date, lookback_days)
+    try:
+        inputs = _load_inputs(conn, run_date, w, company_slug)
     finally:
-        conn.close()
-
-
-def compute_and_store_signals(run_timestamp: str, *, lookback_days: int = 7) -> None:
+        if close_conn:
+            conn.close()
+    return {slug: _signal_from_inputs(slug, run_date, lookback_days, w, inp) for slug, inp in inputs.items()}
+
+
+def compute_company_signal(company_slug: str, run_date: str, *, lookback_days: int = 7, conn=None) -> CompanySignal:
+    return compute_signals(run_date, lookback_days=lookback_days, company_slug=company_slug, conn=conn)[company_slug]
+
+
+@dataclass
+class _SignalHistory:
+    """One company's daily series over a backfill range, as loaded by _load_history."""
+    first_date: str  # first job_diffs_daily row, any date
+    diff_dates: List[str] = field(default_factory=list)
+    added: List[int] = field(default_factory=list)
+    removed: List[int] = field(default_factory=list)
+    open_dates: List[str] = field(default_factory=list)  # every open-now row up to the range end
+    open_counts: List[int] = field(default_factory=list)
+    disc_dates: List[str] = field(default_factory=list)  # (date, discipline) order
+    disc_rows: List[Tuple[str, int]] = field(default_factory=list)  # (discipline, adds)
+    lifespan: Dict[str, Tuple[Optional[float], Optional[float], Optional[float]]] = field(default_factory=dict)
+    news_dates: List[str] = field(default_factory=list)  # rows with a headline candidate
+    news_rows: List[Tuple[int, Optional[str], Optional[str]]] = field(default_factory=list)  # (major, title, url)
+
+
+def _load_history(conn, lo: str, start_date: str, end_date: str, company_slug: Optional[str] = None) -> Dict[str, _SignalHistory]:
+    """One ordered read per table covering every window of the range (earliest day `lo`)."""
+    company_filter = " AND company_slug = :company_slug" if company_slug else ""
+    params = {"lo": lo, "start_date": start_date, "end_date": end_date, "company_slug": company_slug}
+    hist: Dict[str, _SignalHistory] = {}
+
+    for slug, first_date in conn.execute(
+        f"""
+        SELECT company_slug, MIN(date) FROM job_diffs_daily
+        WHERE date <= :end_date{company_filter}
+        GROUP BY company_slug
+        """,
+        params,
+    ):
+        hist[slug] = _SignalHistory(first_date=first_date)
+
+    for slug, d, a, r in conn.execute(
+        f"""
+        SELECT company_slug, date, added_count, removed_count FROM job_diffs_daily
+        WHERE date >= :lo AND date <= :end_date{company_filter}
+        ORDER BY company_slug, date
+        """,
+        params,
+    ):
+        h = hist[slug]
+        h.diff_dates.append(d)
+        h.added.append(int(a))
+        h.removed.append(int(r))
+
+    for slug, d, v in conn.execute(
+        f"""
+        SELECT company_slug, date, open_now_count FROM company_open_now_daily
+        WHERE date <= :end_date{company_filter}
+        ORDER BY company_slug, date
+        """,
+        params,
+    ):
+        h = hist.get(slug)
+        if h is not None:
+            h.open_dates.append(d)
+            h.open_counts.append(int(v))
+
+    for slug, d, disc, cnt in conn.execute(
+        f"""
+        SELECT company_slug, date, discipline, added_count FROM job_diffs_discipline_daily
+        WHERE date >= :lo AND date <= :end_date{company_filter}
+        ORDER BY company_slug, date, discipline
+        """,
+        params,
+    ):
+        h = hist.get(slug)
+        if h is not None:
+            h.disc_dates.append(d)
+            h.disc_rows.append((disc or "Other", int(cnt or 0)))
+
+    for slug, d, median_days, pct_close_7d, pct_open_gt_30d in conn.execute(
+        f"""
+        SELECT company_slug, date, median_days, pct_close_within_7d, pct_open_gt_30d
+        FROM company_lifespan_daily
+        WHERE date >= :start_date AND date <= :end_date AND window_days=180{company_filter}
+        """,
+        params,
+    ):
+        h = hist.get(slug)
+        if h is not None:
+            h.lifespan[d] = (median_days, pct_close_7d, pct_open_gt_30d)
+
+    for slug, d, major, title, url in conn.execute(
+        f"""
+        SELECT company_slug, date, has_major_event=1, top_headline_title, top_headline_url
+        FROM company_news_daily
+        WHERE date >= :lo AND date <= :end_date{company_filter}
+          AND (has_major_event=1 OR article_count > 0)
+        ORDER BY company_slug, date
+        """,
+        params,
+    ):
+        h = hist.get(slug)
+        if h is not None:
+            h.news_dates.append(d)
+            h.news_rows.append((int(major), title, url))
+
+    return hist
+
+
+def _prefix(values: Iterable[int]) -> List[int]:
+    out = [0]
+    for v in values:
+        out.append(out[-1] + v)
+    return out
+
+
+def _company_signal_history(
+    company_slug: str, h: _SignalHistory, dates: List[Tuple[str, Dict[str, str]]], lookback_days: int
+) -> List[CompanySignal]:
+    """
+    Signals for each (run_date, windows) in `dates`, from rolling windows over the
+    company's series: window sums and means are prefix-sum differences, so each
+    date costs a few bisects rather than a round of queries. Integer sums and the
+    sum/count means match what SQLite's SUM/AVG return, so every signal equals
+    compute_signals() for that date.
+    """
+    cum_a, cum_r = _prefix(h.added), _prefix(h.removed)
+    # Per-weekday prefix sums and row counts (SQLite %w numbering: 0=Sunday)
+    wd_of = [datetime.strptime(d, "%Y-%m-%d").isoweekday() % 7 for d in h.diff_dates]
+    wd_a = [_prefix(a if wd == k else 0 for a, wd in zip(h.added, wd_of)) for k in range(7)]
+    wd_r = [_prefix(r if wd == k else 0 for r, wd in zip(h.removed, wd_of)) for k in range(7)]
+    wd_n = [_prefix(1 if wd == k else 0 for wd in wd_of) for k in range(7)]
+
+    out: List[CompanySignal] = []
+    for run_date, w in dates:
+        if run_date < h.first_date:
+            continue  # before the company's history starts
+        inp = _SignalInputs()
+        dd = h.diff_dates
+        end = bisect_right(dd, run_date)
+        i = bisect_left(dd, w["start"])
+        inp.added, inp.removed = cum_a[end] - cum_a[i], cum_r[end] - cum_r[i]
+        inp.daily = list(zip(h.added[i:end], h.removed[i:end]))
+        p0, p1 = bisect_left(dd, w["prev_start"]), bisect_right(dd, w["prev_end"])
+        inp.prev_added, inp.prev_removed = cum_a[p1] - cum_a[p0], cum_r[p1] - cum_r[p0]
+        b = bisect_left(dd, w["baseline_start"])
+        if end > b:
+            inp.base_add = (cum_a[end] - cum_a[b]) / (end - b)
+            inp.base_rem = (cum_r[end] - cum_r[b]) / (end - b)
+        k0 = bisect_left(dd, w["weekday_start"])
+        for k in range(7):
+            n = wd_n[k][end] - wd_n[k][k0]
+            if n:
+                inp.weekdays.append((str(k), (wd_a[k][end] - wd_a[k][k0]) / n, (wd_r[k][end] - wd_r[k][k0]) / n))
+
+        o = bisect_right(h.open_dates, run_date)
+        inp.open_now = h.open_counts[o - 1] if o else 0
+        for d in (w["start"], run_date):
+            j = bisect_left(h.open_dates, d)
+            if j < len(h.open_dates) and h.open_dates[j] == d:
+                inp.open_by_date[d] = h.open_counts[j]
+
+        for j in range(bisect_left(h.disc_dates, w["prev_start"]), bisect_right(h.disc_dates, run_date)):
+            disc, cnt = h.disc_rows[j]
+            if h.disc_dates[j] >= w["start"]:
+                inp.disc_last[disc] = inp.disc_last.get(disc, 0) + cnt
+            elif h.disc_dates[j] <= w["prev_end"]:
+                inp.disc_prev[disc] = inp.disc_prev.get(disc, 0) + cnt
+
+        inp.lifespan = h.lifespan.get(run_date)
+        best = None
+        for j in range(bisect_left(h.news_dates, w["start"]), bisect_right(h.news_dates, run_date)):
+            if best is None or h.news_rows[j][0] >= h.news_rows[best][0]:
+                best = j  # latest major headline, else latest headline
+        if best is not None:
+            inp.headline = h.news_rows[best][1:]
+
+        out.append(_signal_from_inputs(company_slug, run_date, lookback_days, w, inp))
+    return out
+
+
+def _company_signal_history_task(args: Tuple[str, _SignalHistory, List[Tuple[str, Dict[str, str]]], int]) -> Tuple[str, List[CompanySignal]]:
+    return args[0], _company_signal_history(*args)
+
+
+def iter_signal_history(
+    start_date: str,
+    end_date: str,
+    *,
+    lookback_days: int = 7,
+    company_slug: Optional[str] = None,
+    workers: int = 1,
+    conn=None,
+) -> Iterator[Tuple[str, List[CompanySignal]]]:
+    """
+    Yields (company_slug, signals) with one CompanySignal per day in
+    [start_date, end_date], for every company in job_diffs_daily (days before a
+    company's first diff are skipped). History is read once up front; with
+    workers > 1 companies are computed in a process pool.
+    """
+    first = datetime.strptime(start_date, "%Y-%m-%d").date()
+    last = datetime.strptime(end_date, "%Y-%m-%d").date()
+    dates = []
+    for n in range((last - first).days + 1):
+        run_date = (first + timedelta(days=n)).strftime("%Y-%m-%d")
+        dates.append((run_date, _windows(run_date, lookback_days)))
+    if not dates:
+        return
+    lo = min(dates[0][1]["prev_start"], dates[0][1]["weekday_start"])
+
+    close_conn = False
+    if conn is None:
+        conn = get_connection()
+        close_conn = True
+    try:
+        hist = _load_history(conn, lo, start_date, end_date, company_slug)
+    finally:
+        if close_conn:
+            conn.close()
+
+    tasks = [(slug, h, dates, lookback_days) for slug, h in hist.items()]
+    if workers <= 1 or len(tasks) <= 1:
+        yield from map(_company_signal_history_task, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(_company_signal_history_task, tasks, chunksize=max(1, len(tasks) // (workers * 4)))
+
+
+def store_signals(signals: Iterable[CompanySignal], *, conn) -> int:
+    """Upserts rows into company_signals_daily. Does not commit."""
+    now_iso = datetime.utcnow().isoformat()
+    rows = [
+        (
+            sig.company_slug,
+            sig.date,
+            int(sig.lookback_days),
+            sig.momentum_state,
+            sig.momentum_label,
+            float(sig.momentum_score),
+            1 if sig.is_mover else 0,
+            sig.mover_reason,
+            sig.timing_hint,
+            sig.timing_confidence,
+            sig.best_post_weekday,
+            sig.best_remove_weekday,
+            sig.headline_title,
+            sig.headline_url,
+            now_iso,
+        )
+        for sig in signals
+    ]
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO company_signals_daily (
+            company_slug, date, lookback_days,
+            momentum_state, momentum_label, momentum_score,
+            is_mover, mover_reason,
+            timing_hint, timing_confidence,
+            best_post_weekday, best_remove_weekday,
+            headline_title, headline_url,
+            created_at
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        rows,
+    )
+    return len(rows)
+
+
+def compute_and_store_signals(run_timestamp: str, *, lookback_days: int = 7, conn=None) -> None:
+    """
+    Computes and stores every company's signal on one connection.
+    With `conn` the writes join the caller's transaction and errors propagate.
+    """
     run_date = _date_from_run_timestamp(run_timestamp)
-    conn = get_connection()
+    close_conn = False
+    if conn is None:
+        conn = get_connection()
+        close_conn = True
     try:
         c = conn.cursor()
         # Use config-backed universe when available; fall back to DB.
         companies = c.execute("SELECT DISTINCT company_slug FROM job_diffs_daily").fetchall()
         slugs = [r[0] for r in companies] if companies else []
 
-        now_iso = datetime.utcnow().isoformat()
-        for slug in slugs:
-            sig = compute_company_signal(slug, run_date, lookback_days=lookback_days)
-            c.execute(
-                """
-                INSERT OR REPLACE INTO company_signals_daily (
-                    company_slug, date, lookback_days,
-                    momentum_state, momentum_label, momentum_score,
-                    is_mover, mover_reason,
-                    timing_hint, timing_confidence,
-                    best_post_weekday, best_remove_weekday,
-                    headline_title, headline_url,
-                    created_at
-                )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    sig.company_slug,
-                    sig.date,
-                    int(sig.lookback_days),
-                    sig.momentum_state,
-                    sig.momentum_label,
-                    float(sig.momentum_score),
-                    1 if sig.is_mover else 0,
-                    sig.mover_reason,
-                    sig.timing_hint,
-                    sig.timing_confidence,
-                    sig.best_post_weekday,
-                    sig.best_remove_weekday,
-                    sig.headline_title,
-                    sig.headline_url,
-                    now_iso,
-                ),
-            )
-
-        conn.commit()
+        signals = compute_signals(run_date, lookback_days=lookback_days, conn=conn)
+        store_signals((signals[slug] for slug in slugs), conn=conn)
+
+        if close_conn:
+            conn.commit()
         logging.info(f"Computed signals for {len(slugs)} companies on {run_date}")
     except Exception as e:
+        if not close_conn:
+            raise
         logging.error(f"Signal engine failed: {e}")
         conn.rollback()
     finally:
-        conn.close()
+        if close_conn:
+            conn.close()
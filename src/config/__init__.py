@@ -68,3 +68,34 @@ ROLE_FAMILIES = {
         "strong_phrases": ["site reliability engineer", "devops engineer", "infrastructure engineer", "platform engineer"]
     }
 }
+
+# Discipline keywords (simple heuristic base), matched as substrings of the lowercased title
+DISCIPLINES = {
+    "ML": ["machine learning", " ml", "ai ", "artificial intelligence", "deep learning", "nlp", "computer vision", "llm"],
+    "Data": ["data scientist", "data engineer", "data analyst", "analytics", "bi engineer"],
+    "Platform": ["platform", "infrastructure", "devops", "sre", "reliability", "cloud"],
+    "Infra": ["infrastructure", "systems", "distributed systems", "embedded"],
+    # Fallback to "Other"
+}
+
+# Seniority levels, checked in order (first match wins)
+SENIORITY_LEVELS = [
+    ("Intern", ["intern", "university", "grad", "student"]),
+    ("Junior", ["junior", "entry", "associate", " jr"]),
+    ("Staff+", ["staff", "principal", "distinguished", "fellow", "architect", "director", "vp", "head of", "lead"]),
+    ("Senior", ["senior", " sr", "lead"]), # Check Senior after Staff+ to avoid "Senior Staff" colliding purely on Senior
+    ("Mid", []), # Fallback
+]
+
+SENIOR_PLUS_LEVELS = {"Senior", "Staff+"}
+
+# Snapshot retention (see src/storage/retention.py)
+# Per data kind:
+# - hot_days: runs newer than this stay as individual files under data/{kind}/{ats}/{slug}
+# - keep_min: the newest N runs always stay hot, regardless of age
+# Older runs are rolled into per-company monthly archives (data/.../{slug}/archive/YYYY-MM.zip).
+RETENTION_POLICY = {
+    "raw": {"hot_days": 30, "keep_min": 7},
+    "filtered": {"hot_days": 90, "keep_min": 7},
+    "diff": {"hot_days": 90, "keep_min": 7},
+}
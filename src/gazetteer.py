@@ -0,0 +1,131 @@
+import json
+import os
+import re
+from functools import lru_cache
+
+# ---------------------------------------------------------------------------
+# Offline US gazetteer (states, metros, major cities)
+# ---------------------------------------------------------------------------
+# Data lives in src/config/us_gazetteer.json. It is loaded once and turned into a
+# hash index keyed by normalized phrase ("san francisco", "bay area", "ca", ...),
+# so resolving a location string is a single left-to-right scan over its word
+# n-grams with dict lookups (no regex per city, no substring search).
+
+GAZETTEER_PATH = os.path.join(os.path.dirname(__file__), "config", "us_gazetteer.json")
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_CODE_RE = re.compile(r"[A-Za-z]+")
+
+_index = None
+
+
+def _phrase_key(text):
+    return " ".join(_WORD_RE.findall(text.lower()))
+
+
+class _Index:
+    def __init__(self, data):
+        self.state_codes = {code for code, _ in data["states"]}
+        state_names = {_phrase_key(name): code for code, name in data["states"]}
+
+        # phrase -> {"cities": [(city, state, metro), ...], "state": code, "metro": name}
+        self.phrases = {}
+
+        def _entry(key):
+            return self.phrases.setdefault(key, {"cities": [], "state": None, "metro": None})
+
+        for key, code in state_names.items():
+            _entry(key)["state"] = code
+
+        cities_by_name = {}
+        for city, state, metro in data["cities"]:
+            key = _phrase_key(city)
+            cities_by_name[(city, state)] = (city, state, metro)
+            # A bare state name only resolves to a city inside that state
+            # ("New York" -> NYC, but "Washington" stays the state, not DC).
+            if key in state_names and state_names[key] != state:
+                continue
+            _entry(key)["cities"].append((city, state, metro))
+
+        for alias, (city, state) in data.get("city_aliases", {}).items():
+            rec = cities_by_name.get((city, state), (city, state, None))
+            _entry(_phrase_key(alias))["cities"].insert(0, rec)
+
+        for metro, aliases in data.get("metros", {}).items():
+            for alias in [metro] + list(aliases):
+                _entry(_phrase_key(alias))["metro"] = metro
+
+        self.max_ngram = max(len(k.split()) for k in self.phrases)
+
+
+def _get_index():
+    global _index
+    if _index is None:
+        with open(GAZETTEER_PATH, "r", encoding="utf-8") as f:
+            _index = _Index(json.load(f))
+    return _index
+
+
+@lru_cache(maxsize=65536)
+def resolve(location_name):
+    """
+    Resolves a free-text location string to (city, state, metro).
+    Any element may be None. Assumes the caller already decided the string is US.
+    - State codes only count when written uppercase ("Austin, TX"), so words like
+      "in" / "or" / "me" are never read as states.
+    - Ambiguous city names ("Portland") use the state hint when present, else the
+      largest city with that name.
+    - In a multi-location string the first city wins, unless the state hint only
+      fits a later one ("Denver; Austin, TX" is Austin).
+    """
+    if not location_name:
+        return (None, None, None)
+
+    idx = _get_index()
+
+    state_hint = None
+    for tok in _CODE_RE.findall(location_name):
+        if len(tok) == 2 and tok.isupper() and tok in idx.state_codes:
+            state_hint = tok
+            break
+
+    tokens = _WORD_RE.findall(location_name.lower())
+    city_candidates = None
+    later_cities = []
+    metro = None
+    i = 0
+    n = len(tokens)
+    while i < n:
+        matched = False
+        for size in range(min(idx.max_ngram, n - i), 0, -1):
+            key = " ".join(tokens[i:i + size])
+            entry = idx.phrases.get(key)
+            if entry is None:
+                continue
+            if entry["cities"] and city_candidates is None:
+                city_candidates = entry["cities"]
+            else:
+                if entry["cities"]:
+                    later_cities.append(entry["cities"])
+                if entry["state"] and state_hint is None:
+                    state_hint = entry["state"]
+            if entry["metro"] and metro is None:
+                metro = entry["metro"]
+            i += size
+            matched = True
+            break
+        if not matched:
+            i += 1
+
+    city = state = None
+    if city_candidates:
+        chosen = city_candidates[0]
+        if state_hint:
+            chosen = next((c for cands in [city_candidates] + later_cities for c in cands if c[1] == state_hint), None)
+        if chosen:
+            city, state, city_metro = chosen
+            metro = city_metro or metro
+    if state is None:
+        state = state_hint
+
+    return (city, state, metro)
@@ -0,0 +1,119 @@
+import logging
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from src.jobs import identity
+from src.news.models import get_connection
+from src.storage import serialization
+
+# ---------------------------------------------------------------------------
+# Previous-snapshot card cache
+# ---------------------------------------------------------------------------
+# After each diff, the cards of the current snapshot are kept in
+# `job_card_cache` (one row per job: fingerprint + compact JSON card) and
+# `job_card_cache_state` records which run they describe. The next run's diff
+# reads fingerprints from here instead of re-parsing the previous snapshot and
+# rebuilding every card; only the cards of removed/changed jobs are decoded.
+# The cache is updated incrementally (removed rows deleted, rows whose card
+# differs from the stored one upserted: any card field can change without
+# touching the fingerprint), so cached cards always equal the ones the JSON
+# fallback would build. It is ignored whenever its run does not match the
+# previous snapshot on disk, or its keys were derived with another job_key
+# scheme (src.jobs.identity.KEY_SCHEME), in which case the diff falls back to
+# the JSON file, whose records are re-keyed on read.
+
+
+class CachedCards:
+    """Fingerprints of a cached snapshot, with cards decoded on demand."""
+
+    def __init__(self, rows: Iterable[Tuple[str, str, bytes]]):
+        self._rows = {key: (fp, blob) for key, fp, blob in rows}
+        self.fingerprints: Dict[str, str] = {key: fp for key, (fp, _) in self._rows.items()}
+        self.blobs: Dict[str, bytes] = {key: blob for key, (_, blob) in self._rows.items()}
+
+    def card(self, key: str) -> Dict[str, Any]:
+        return serialization.loads(self._rows[key][1])
+
+
+def load(company_slug: str, run_timestamp: str) -> Optional[CachedCards]:
+    """Cached cards for `company_slug` if they describe `run_timestamp`, else None."""
+    conn = get_connection()
+    try:
+        if not is_current(company_slug, run_timestamp, conn):
+            return None
+        rows = conn.execute(
+            "SELECT job_key, fingerprint, card FROM job_card_cache WHERE company_slug=?",
+            (company_slug,),
+        ).fetchall()
+    except Exception as e:
+        logging.warning(f"Card cache lookup failed for {company_slug}: {e}")
+        return None
+    finally:
+        conn.close()
+    return CachedCards(rows)
+
+
+def is_current(company_slug: str, run_timestamp: str, conn) -> bool:
+    row = conn.execute(
+        "SELECT run_timestamp, key_scheme FROM job_card_cache_state WHERE company_slug=?",
+        (company_slug,),
+    ).fetchone()
+    return bool(row) and row[0] == run_timestamp and row[1] == identity.KEY_SCHEME
+
+
+def iter_sorted(company_slug: str, conn) -> Iterator[Tuple[str, str, bytes]]:
+    """Streams (job_key, fingerprint, card blob) in job_key order (primary-key order, no sort)."""
+    return conn.execute(
+        "SELECT job_key, fingerprint, card FROM job_card_cache WHERE company_slug=? ORDER BY job_key",
+        (company_slug,),
+    )
+
+
+def _card_rows(
+    company_slug: str,
+    cards: Iterable[Tuple[str, Dict[str, Any]]],
+    stored: Optional[Dict[str, bytes]] = None,
+) -> Iterator[Tuple[str, str, str, bytes]]:
+    for key, card in cards:
+        blob = serialization.dumps(card)
+        if stored is None or stored.get(key) != blob:
+            yield company_slug, key, card.get("fingerprint"), blob
+
+
+def update(
+    company_slug: str,
+    run_timestamp: str,
+    upserts: Iterable[Tuple[str, Dict[str, Any]]],
+    removed: Iterable[str] = (),
+    *,
+    replace: bool = False,
+    stored: Optional[Dict[str, bytes]] = None,
+) -> None:
+    """
+    Moves the cache to `run_timestamp`: deletes `removed` keys and upserts
+    `upserts` ((key, card) pairs; may be a generator), skipping cards whose
+    encoding equals `stored[key]` (the cached blobs). With `replace`, the
+    company's rows are rebuilt from `upserts`.
+    """
+    conn = get_connection()
+    try:
+        if replace:
+            conn.execute("DELETE FROM job_card_cache WHERE company_slug=?", (company_slug,))
+        else:
+            conn.executemany(
+                "DELETE FROM job_card_cache WHERE company_slug=? AND job_key=?",
+                ((company_slug, key) for key in removed),
+            )
+        conn.executemany(
+            "INSERT OR REPLACE INTO job_card_cache (company_slug, job_key, fingerprint, card) VALUES (?, ?, ?, ?)",
+            _card_rows(company_slug, upserts, None if replace else stored),
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO job_card_cache_state (company_slug, run_timestamp, key_scheme) VALUES (?, ?, ?)",
+            (company_slug, run_timestamp, identity.KEY_SCHEME),
+        )
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        logging.warning(f"Card cache update failed for {company_slug}: {e}")
+    finally:
+        conn.close()
@@ -0,0 +1,227 @@
+import hashlib
+import logging
+import operator
+import random
+from array import array
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from src.news.models import get_connection
+from src.utils import normalize_title
+from src.jobs import identity
+from src.analytics.intervals import REPOST_WINDOW_DAYS
+
+# ---------------------------------------------------------------------------
+# Near-duplicate posting clusters
+# ---------------------------------------------------------------------------
+# The same role is often reposted under a new id, or posted as several copies
+# with slightly different titles. Each filtered job gets a `cluster_id` naming
+# its distinct role:
+#   - shingles: normalized title tokens + token bigrams, each scoped to a place
+#     of the posting (metro, else city, else remote, within its country) and to
+#     its department when the source has one. Same-title requisitions in
+#     different cities or teams share no shingle, so they stay distinct roles;
+#     a multi-location posting only matches postings sharing most of its places
+#   - MinHash signature of NUM_PERM permutations, banded into LSH buckets
+#     (BANDS x ROWS); candidates share a bucket, and join a cluster only if
+#     their estimated Jaccard similarity is >= SIMILARITY_THRESHOLD
+# Clusters are per company and persisted in `job_clusters` (key -> cluster +
+# signature). A job keeps its cluster for life, and only jobs not seen before are
+# signed and looked up, so a run costs O(new jobs) bucket probes rather than
+# pairwise comparisons. A new cluster is named after its first job's key. New
+# jobs only match live clusters: a member open, or closed within
+# REPOST_WINDOW_DAYS (so a repost under a new id rejoins its role), or not yet
+# synced to job_intervals. A title hired for again a year later is a new role.
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SIMILARITY_THRESHOLD = 0.8
+MAX_VERIFY = 8  # candidate clusters (most shared buckets first) checked against full signatures
+MAX_REPRESENTATIVES = 4  # distinct signatures indexed per cluster
+
+_PRIME = (1 << 61) - 1
+_MASK = (1 << 32) - 1
+_rng = random.Random(20250101)  # fixed: signatures must be comparable across runs
+_PERMS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+
+def shingles(job: Dict[str, Any], _title_cache: Optional[Dict[str, List[str]]] = None) -> Set[str]:
+    title = job.get("title") or ""
+    if _title_cache is None:
+        tokens = normalize_title(title)
+    else:
+        tokens = _title_cache.get(title)
+        if tokens is None:
+            tokens = _title_cache[title] = normalize_title(title)
+    title_shingles = [f"t:{t}" for t in tokens]
+    title_shingles.extend(f"b:{a} {b}" for a, b in zip(tokens, tokens[1:]))
+    department = " ".join(str(job.get("department") or "").lower().split())
+    return {f"{department}@{place}|{s}" for place in _places(job) for s in title_shingles}
+
+
+def _places(job: Dict[str, Any]) -> Set[str]:
+    """Where a posting is: country:metro (else city, else "remote") per location."""
+    out = set()
+    for loc in job.get("locations") or []:
+        if isinstance(loc, dict):
+            country = str(loc.get("country_code") or "").strip().lower()
+            place = loc.get("metro") or loc.get("city") or ("remote" if loc.get("is_remote") else loc.get("raw"))
+            out.add(f"{country}:{' '.join(str(place or '').lower().split())}")
+        elif loc:
+            out.add(":" + " ".join(str(loc).lower().split()))
+    return out or {":"}
+
+
+def _base_hash(shingle: str) -> int:
+    return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def signature(shingle_set: Iterable[str]) -> Tuple[int, ...]:
+    hashes = [_base_hash(s) for s in shingle_set] or [0]
+    return tuple(min(((a * h + b) % _PRIME) & _MASK for h in hashes) for a, b in _PERMS)
+
+
+def similarity(sig1: Tuple[int, ...], sig2: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    return sum(map(operator.eq, sig1, sig2)) / NUM_PERM
+
+
+def _bands(sig: Tuple[int, ...]) -> List[Tuple[int, Tuple[int, ...]]]:
+    return [(i, sig[i * ROWS:(i + 1) * ROWS]) for i in range(BANDS)]
+
+
+def _pack(sig: Tuple[int, ...]) -> bytes:
+    return array("I", sig).tobytes()
+
+
+def _unpack(blob: bytes) -> Tuple[int, ...]:
+    return tuple(array("I", blob))
+
+
+class ClusterIndex:
+    """
+    In-memory LSH index over one company's clusters. Buckets hold cluster ids,
+    each cluster contributing up to MAX_REPRESENTATIVES distinct signatures, so
+    bucket sizes track the number of roles rather than the number of postings.
+    """
+
+    def __init__(self):
+        self.clusters: Dict[str, str] = {}  # job_key -> cluster_id
+        self._reps: Dict[str, List[Tuple[int, ...]]] = {}  # cluster_id -> signatures
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], Set[str]] = {}
+        self._exact: Dict[Tuple[int, ...], str] = {}  # signature -> cluster (identical copies)
+
+    def add(self, key: str, cluster_id: str, sig: Tuple[int, ...], matchable: bool = True) -> None:
+        self.clusters[key] = cluster_id
+        if not matchable:
+            return
+        self._exact.setdefault(sig, cluster_id)
+        reps = self._reps.setdefault(cluster_id, [])
+        if len(reps) >= MAX_REPRESENTATIVES or sig in reps:
+            return
+        reps.append(sig)
+        for band in _bands(sig):
+            self._buckets.setdefault(band, set()).add(cluster_id)
+
+    def match(self, sig: Tuple[int, ...]) -> Optional[str]:
+        """Most similar cluster above the threshold, if any."""
+        if sig in self._exact:
+            return self._exact[sig]
+        hits = Counter(c for band in _bands(sig) for c in self._buckets.get(band, ()))
+        # Shared buckets track similarity, so only the top few need a full comparison
+        ranked = sorted(hits.items(), key=lambda kv: (-kv[1], kv[0]))[:MAX_VERIFY]
+        best, best_sim = None, SIMILARITY_THRESHOLD
+        for cluster_id, _ in ranked:
+            sim = max(similarity(sig, rep) for rep in self._reps[cluster_id])
+            if sim >= best_sim and (best is None or sim > best_sim):
+                best, best_sim = cluster_id, sim
+        return best
+
+
+def _expired_clusters(company_slug: str, as_of_date: str, conn) -> Set[str]:
+    """Roles with intervals, none open or closed within REPOST_WINDOW_DAYS of `as_of_date`."""
+    cutoff = (datetime.strptime(as_of_date, "%Y-%m-%d") - timedelta(days=REPOST_WINDOW_DAYS)).strftime("%Y-%m-%d")
+    known = {r[0] for r in conn.execute(
+        "SELECT DISTINCT role_key FROM job_intervals WHERE company_slug=?", (company_slug,)
+    )}
+    live = {r[0] for r in conn.execute(
+        "SELECT DISTINCT role_key FROM job_intervals WHERE company_slug=? AND (close_date IS NULL OR close_date >= ?)",
+        (company_slug, cutoff),
+    )}
+    return known - live
+
+
+def load_index(company_slug: str, conn, as_of_date: Optional[str] = None) -> ClusterIndex:
+    """Every indexed job's cluster; only live clusters as of `as_of_date` (default: today) can be matched."""
+    expired = _expired_clusters(company_slug, as_of_date or datetime.utcnow().strftime("%Y-%m-%d"), conn)
+    index = ClusterIndex()
+    for key, cluster_id, blob in conn.execute(
+        "SELECT job_key, cluster_id, signature FROM job_clusters WHERE company_slug=?",
+        (company_slug,),
+    ):
+        index.add(key, cluster_id, _unpack(blob), matchable=cluster_id not in expired)
+    return index
+
+
+def cluster_jobs(
+    company_slug: str,
+    jobs: List[Dict[str, Any]],
+    *,
+    conn,
+    as_of_date: Optional[str] = None,
+) -> List[Tuple[str, str, str, bytes]]:
+    """
+    Stamps job["cluster_id"] on every keyed job (in place). Read-only: returns the
+    job_clusters rows for newly indexed jobs, to be written with save_clusters().
+    `as_of_date` (YYYY-MM-DD, default today) is the run date clusters must be live on.
+    """
+    index = load_index(company_slug, conn, as_of_date)
+    new_rows = []
+    # Copies of a role share titles/shingles; sign each distinct set once per call
+    title_cache: Dict[str, List[str]] = {}
+    sig_cache: Dict[frozenset, Tuple[int, ...]] = {}
+    keyed = [(identity.job_key(job), job) for job in jobs if isinstance(job, dict)]
+    for key, job in sorted((kj for kj in keyed if kj[0]), key=lambda kj: kj[0]):
+        cluster_id = index.clusters.get(key)
+        if cluster_id is None:
+            shingle_set = frozenset(shingles(job, title_cache))
+            sig = sig_cache.get(shingle_set)
+            if sig is None:
+                sig = sig_cache[shingle_set] = signature(shingle_set)
+            cluster_id = index.match(sig) or key
+            index.add(key, cluster_id, sig)
+            new_rows.append((company_slug, key, cluster_id, _pack(sig)))
+        job["cluster_id"] = cluster_id
+    return new_rows
+
+
+def save_clusters(rows: List[Tuple[str, str, str, bytes]], *, conn) -> None:
+    """Writes rows from cluster_jobs(). Does not commit."""
+    conn.executemany(
+        "INSERT OR REPLACE INTO job_clusters (company_slug, job_key, cluster_id, signature) VALUES (?, ?, ?, ?)",
+        rows,
+    )
+
+
+def assign_clusters(company_slug: str, jobs: List[Dict[str, Any]], *, conn=None, as_of_date: Optional[str] = None) -> int:
+    """
+    cluster_jobs() + save_clusters(), committed. Returns the number of distinct
+    clusters among `jobs`.
+    """
+    close_conn = False
+    if conn is None:
+        conn = get_connection()
+        close_conn = True
+    try:
+        save_clusters(cluster_jobs(company_slug, jobs, conn=conn, as_of_date=as_of_date), conn=conn)
+        conn.commit()
+        return len({job["cluster_id"] for job in jobs if isinstance(job, dict) and "cluster_id" in job})
+    except Exception as e:
+        logging.warning(f"Clustering failed for {company_slug}: {e}")
+        conn.rollback()
+        return 0
+    finally:
+        if close_conn:
+            conn.close()
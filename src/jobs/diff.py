@@ -1,45 +1,24 @@
-import json
+import hashlib
 import os
-import glob
+import tempfile
 from datetime import datetime
-from typing import Dict, List, Optional, Set, Any, Tuple
-
-# We'll use the user's definitions for disciplines and seniority mapping
-# Discipline keywords (simple heuristic base)
-DISCIPLINES = {
-    "ML": ["machine learning", " ml", "ai ", "artificial intelligence", "deep learning", "nlp", "computer vision", "llm"],
-    "Data": ["data scientist", "data engineer", "data analyst", "analytics", "bi engineer"],
-    "Platform": ["platform", "infrastructure", "devops", "sre", "reliability", "cloud"],
-    "Infra": ["infrastructure", "systems", "distributed systems", "embedded"],
-    # Fallback to "Other"
-}
-
-SENIORITY_LEVELS = [
-    ("Intern", ["intern", "university", "grad", "student"]),
-    ("Junior", ["junior", "entry", "associate", " jr"]),
-    ("Staff+", ["staff", "principal", "distinguished", "fellow", "architect", "director", "vp", "head of", "lead"]),
-    ("Senior", ["senior", " sr", "lead"]), # Check Senior after Staff+ to avoid "Senior Staff" colliding purely on Senior
-    ("Mid", []), # Fallback
-]
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Any, Tuple
+
+from src.config import SENIOR_PLUS_LEVELS
+from src.utils import match_seniority, match_discipline
+from src.jobs import card_cache, identity
+from src.news.models import get_connection
+from src.storage import manifest, serialization, snapshots
+
+# Seniority / discipline tags are normally computed once at normalization time
+# (see src.utils.classify_title) and stored on the job record. These helpers are
+# the fallback for older snapshots that predate the stored tags.
 
 def _parse_seniority(title: str) -> str:
-    title_lower = title.lower()
-    for level, keywords in SENIORITY_LEVELS:
-        for kw in keywords:
-            if kw in title_lower:
-                return level
-    # If no match but not explicit mid, default to specific logic or just Mid?
-    # User said: Intern / Junior / Mid / Senior / Staff+
-    # If it doesn't match others, it's likely Mid (or just standard Engineer)
-    return "Mid"
+    return match_seniority(title.lower())
 
 def _parse_discipline(title: str) -> str:
-    title_lower = title.lower()
-    for disc, keywords in DISCIPLINES.items():
-        for kw in keywords:
-            if kw in title_lower:
-                return disc
-    return "Other"
+    return match_discipline(title.lower())
 
 def _get_is_us_remote(job: Dict[str, Any]) -> bool:
     """
@@ -75,14 +54,15 @@ def _get_is_us(job: Dict[str, Any]) -> bool:
             return True
     return False
 
+def _job_key(job: Dict[str, Any]):
+    # job_key > per-fetcher id > canonical URL > content hash (src.jobs.identity)
+    return identity.job_key(job)
+
 def _create_job_card(job: Dict[str, Any]) -> Dict[str, Any]:
     """Transform a raw/normalized job into the analytic 'Card' shape."""
     title = job.get("title", "Unknown")
     posted_at = job.get("posted_at")
-    
-    # Fix: read canonical key (job_key > id)
-    # If not present, fallback to URL (brittle but allowed fallback)
-    job_key = job.get("job_key") or job.get("id") or job.get("url")
+    job_key = _job_key(job)
     
     card = {
         "job_key": job_key,
@@ -92,12 +72,14 @@ def _create_job_card(job: Dict[str, Any]) -> Dict[str, Any]:
         "locations": job.get("locations", []),
         "is_us": _get_is_us(job),
         "is_us_remote": _get_is_us_remote(job),
-        "seniority": _parse_seniority(title),
-        "discipline": _parse_discipline(title),
+        "seniority": job.get("seniority") or _parse_seniority(title),
+        "discipline": job.get("discipline") or _parse_discipline(title),
         "posted_at": posted_at,
         "first_seen_at": job.get("first_seen_at", posted_at),
         "last_seen_at": job.get("last_seen_at"), 
         "status": job.get("status", "open"),
+        "fingerprint": job.get("fingerprint") or job_fingerprint(job),
+        "cluster_id": job.get("cluster_id"),
     }
     
     # location_display fallback
@@ -117,27 +99,69 @@ def _create_job_card(job: Dict[str, Any]) -> Dict[str, Any]:
 def _normalize_title(t: str) -> str:
     return " ".join(t.lower().split())
 
+def _loc_sig(l):
+    # Create a signature for the location
+    # Fix: use country_code
+    if isinstance(l, str): return l.strip().lower()
+    if isinstance(l, dict) and l.get("raw"):
+         # city/state/metro are derived from raw; comparing raw keeps diffs stable
+         # when the location parser/gazetteer improves between runs.
+         return (
+             l["raw"].strip().lower(),
+             l.get("is_remote", False),
+             l.get("is_us", False)
+         )
+    if isinstance(l, dict):
+         return (
+             (l.get("city") or "").strip().lower(),
+             (l.get("state") or "").strip().lower(),
+             (l.get("country_code") or "").strip().lower(),
+             l.get("is_remote", False),
+             l.get("is_us", False)
+         )
+    return str(l)
+
 def _compare_locations(locs1: List[Any], locs2: List[Any]) -> bool:
     """Return True if locations fit different semantic set."""
-    
-    def _loc_sig(l):
-        # Create a signature for the location
-        # Fix: use country_code
-        if isinstance(l, str): return l.strip().lower()
-        if isinstance(l, dict):
-             return (
-                 (l.get("city") or "").strip().lower(),
-                 (l.get("state") or "").strip().lower(),
-                 (l.get("country_code") or "").strip().lower(),
-                 l.get("is_remote", False),
-                 l.get("is_us", False)
-             )
-        return str(l)
-        
     s1 = set(_loc_sig(l) for l in locs1)
     s2 = set(_loc_sig(l) for l in locs2)
     return s1 != s2
 
+# Bump when the fields/normalization below change so stored fingerprints never match new ones
+FINGERPRINT_VERSION = "1"
+
+def job_fingerprint(job: Dict[str, Any]) -> str:
+    """
+    Stable hash of exactly what _detect_changes looks at (normalized title,
+    location signature set, is_us_remote, status, whether posted_at is set).
+    Equal fingerprints guarantee _detect_changes would find nothing. Stored on
+    the filtered job record at ingest, so each job is fingerprinted once.
+    """
+    locs = sorted(repr(sig) for sig in set(_loc_sig(l) for l in job.get("locations", [])))
+    parts = (
+        FINGERPRINT_VERSION,
+        _normalize_title(job.get("title", "Unknown")),
+        locs,
+        _get_is_us_remote(job),
+        job.get("status", "open"),
+        job.get("posted_at") is not None,
+    )
+    return hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=8).hexdigest()
+
+def _fingerprint_index(jobs: List[Dict[str, Any]]) -> Dict[str, Tuple[str, Dict[str, Any]]]:
+    """
+    str(key) -> (fingerprint, job). Stored fingerprints are reused; legacy records are hashed here.
+    Keys are strings so they match the card cache (src.jobs.card_cache).
+    """
+    out = {}
+    for job in jobs:
+        if not isinstance(job, dict):
+            continue
+        key = _job_key(job)
+        if key:
+            out[str(key)] = (job.get("fingerprint") or job_fingerprint(job), job)
+    return out
+
 def _detect_changes(prev: Dict[str, Any], curr: Dict[str, Any]) -> Optional[Dict[str, Dict[str, Any]]]:
     """
     Compare two cards (from prev and curr) and return changes dict if meaningful change detected.
@@ -174,90 +198,106 @@ def _detect_changes(prev: Dict[str, Any], curr: Dict[str, Any]) -> Optional[Dict
         
     return changes
 
-def get_previous_snapshot_path(snapshot_dir: str, current_ts: str) -> Optional[str]:
-    """Find the most recent snapshot in snapshot_dir before current_ts."""
-    # Pattern: {timestamp}.json (standard ISO format or similar)
-    pattern = os.path.join(snapshot_dir, "*.json")
-    files = glob.glob(pattern)
-    
-    valid_files = []
-    for f in files:
-        fname = os.path.basename(f)
-        # Assuming filename IS the timestamp.json
-        ts_str = fname.replace(".json", "")
-        
-        # Skip if it is the current one (if it exists)
-        if ts_str == current_ts:
-            continue
-            
-        try:
-            if ts_str < current_ts:
-                valid_files.append((ts_str, f))
-        except:
-            continue
-            
-    if not valid_files:
-        return None
-        
-    # Sort by TS descending
-    valid_files.sort(key=lambda x: x[0], reverse=True)
-    return valid_files[0][1]
+def get_previous_snapshot_path(snapshot_dir: str, current_ts: str, company_slug: Optional[str] = None) -> Optional[str]:
+    """
+    Find the most recent snapshot in snapshot_dir before current_ts.
+    The manifest answers only when its entry is at least as new as the newest
+    hot file: a run whose manifest row was never written (crash after the
+    write, failed manifest step) or history predating the manifest must not
+    make the diff skip back to an older snapshot.
+    """
+    # Pattern: {timestamp}.<ext> (legacy .json or compressed .ndjson.gz)
+    files = snapshots.list_files(snapshot_dir)
+    older = [ts_str for ts_str in files if ts_str < current_ts]
+    newest = max(older) if older else None
 
-def generate_diff(company_slug: str, current_ts: str, current_snapshot_data: List[Dict], snapshot_dir: str, diff_dir: str):
+    if company_slug:
+        entry = manifest.get_previous(company_slug, "filtered", current_ts)
+        if entry and (newest is None or entry["run_timestamp"] >= newest) and os.path.exists(entry["path"]) and \
+                os.path.normpath(os.path.dirname(entry["path"])) == os.path.normpath(snapshot_dir):
+            return entry["path"]
+
+    return files[newest] if newest else None
+
+def diff_path_for(diff_dir: str, company_slug: str, current_ts: str) -> str:
+    return os.path.join(diff_dir, f"jobs_diff_{company_slug}_{current_ts}{snapshots.DIFF_EXT}")
+
+def build_diff(
+    company_slug: str,
+    current_ts: str,
+    current_snapshot_data: List[Dict],
+    snapshot_dir: str,
+    use_card_cache: bool = False,
+) -> Dict[str, Any]:
     """
-    Main entry point to generate differences.
+    Computes the diff of the in-memory current snapshot against the previous
+    snapshot. With `use_card_cache`, the previous side is read from the card
+    cache when it matches the previous snapshot (JSON file otherwise), and the
+    cache is moved forward to this run. Snapshot/diff files are not written.
     """
-    card_map_curr = {}
-    for job in current_snapshot_data:
-        card = _create_job_card(job)
-        key = card["job_key"]
-        if key:
-            card_map_curr[key] = card
+    # Jobs are indexed by key + fingerprint; full cards are only built for
+    # added/removed jobs and for common jobs whose fingerprint changed.
+    fp_curr = _fingerprint_index(current_snapshot_data)
 
     # Find previous
-    prev_path = get_previous_snapshot_path(snapshot_dir, current_ts)
-    card_map_prev = {}
+    prev_path = get_previous_snapshot_path(snapshot_dir, current_ts, company_slug)
+    prev_fps: Dict[str, str] = {}
+    prev_card = None
     prev_ts = None
-    
+    cached = None
+
     if prev_path and os.path.exists(prev_path):
-        try:
-            with open(prev_path, 'r', encoding='utf-8') as f:
-                prev_data = json.load(f)
+        # Extract ts from filename
+        prev_ts = snapshots.timestamp_from_path(prev_path)
+        if use_card_cache:
+            cached = card_cache.load(company_slug, prev_ts)
+        if cached is not None:
+            prev_fps = cached.fingerprints
+            prev_card = cached.card
+        else:
+            try:
+                prev_data = snapshots.load(prev_path)
                 # prev_data should be a list of jobs
-                for job in prev_data:
-                    card = _create_job_card(job)
-                    key = card["job_key"]
-                    if key:
-                        card_map_prev[key] = card
-            
-            # Extract ts from filename
-            fname = os.path.basename(prev_path)
-            prev_ts = fname.replace(".json", "")
-        except Exception as e:
-            print(f"Error loading previous snapshot {prev_path}: {e}")
+                fp_prev = _fingerprint_index(prev_data)
+                prev_fps = {k: fp for k, (fp, _) in fp_prev.items()}
+                prev_card = lambda k: _create_job_card(fp_prev[k][1])
+            except Exception as e:
+                print(f"Error loading previous snapshot {prev_path}: {e}")
+                prev_ts = None
 
     # Compute Diff
-    curr_keys = set(card_map_curr.keys())
-    prev_keys = set(card_map_prev.keys())
+    curr_keys = set(fp_curr.keys())
+    prev_keys = set(prev_fps.keys())
     
     added_keys = curr_keys - prev_keys
     removed_keys = prev_keys - curr_keys
     common_keys = curr_keys & prev_keys
     
-    added_cards = [card_map_curr[k] for k in added_keys]
-    removed_cards = [card_map_prev[k] for k in removed_keys]
+    curr_cards = {k: _create_job_card(fp_curr[k][1]) for k in added_keys}
+    added_cards = list(curr_cards.values())
+    removed_cards = [prev_card(k) for k in removed_keys]
     
     changed_cards = []
     
     for k in common_keys:
-        prev_card = card_map_prev[k]
-        curr_card = card_map_curr[k]
+        if prev_fps[k] == fp_curr[k][0]:
+            continue
+        curr_card = curr_cards[k] = _create_job_card(fp_curr[k][1])
         
-        changes = _detect_changes(prev_card, curr_card)
+        changes = _detect_changes(prev_card(k), curr_card)
         if changes:
             c_copy = curr_card.copy()
             c_copy["changes"] = changes
             changed_cards.append(c_copy)
+
+    if use_card_cache:
+        all_cards = ((k, curr_cards.get(k) or _create_job_card(job)) for k, (_, job) in fp_curr.items())
+        if cached is not None:
+            # Incremental: removed rows go, and any card that differs from its cached copy
+            # (url, tags, timestamps... change without touching the fingerprint) is rewritten
+            card_cache.update(company_slug, current_ts, all_cards, removed_keys, stored=cached.blobs)
+        else:
+            card_cache.update(company_slug, current_ts, all_cards, replace=True)
             
     # Analytics
     summary = {
@@ -266,10 +306,10 @@ def generate_diff(company_slug: str, current_ts: str, current_snapshot_data: Lis
         "changed": len(changed_cards),
         "us_added": sum(1 for c in added_cards if c["is_us"]),
         "us_remote_added": sum(1 for c in added_cards if c["is_us_remote"]),
-        "senior_plus_added": sum(1 for c in added_cards if c["seniority"] in ["Senior", "Staff+"]),
+        "senior_plus_added": sum(1 for c in added_cards if c["seniority"] in SENIOR_PLUS_LEVELS),
     }
     
-    diff_output = {
+    return {
         "company_slug": company_slug,
         "current_snapshot_ts": current_ts,
         "previous_snapshot_ts": prev_ts,
@@ -278,14 +318,228 @@ def generate_diff(company_slug: str, current_ts: str, current_snapshot_data: Lis
         "removed": removed_cards,
         "changed": changed_cards
     }
+
+# Boards at least this large are diffed with stream_diff (bounded memory)
+STREAMING_DIFF_MIN_JOBS = 20000
+
+def _dedupe_sorted(rows: Iterator[Tuple[str, Any, Any]]) -> Iterator[Tuple[str, Any, Any]]:
+    """Drops all but the last row of each key run (matches dict 'last wins' semantics)."""
+    pending = None
+    for row in rows:
+        if pending is not None and pending[0] != row[0]:
+            yield pending
+        pending = row
+    if pending is not None:
+        yield pending
+
+def _keyed_jobs(jobs: List[Dict[str, Any]]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    for job in jobs:
+        if isinstance(job, dict):
+            key = _job_key(job)
+            if key:
+                yield str(key), job
+
+def sort_key(job: Dict[str, Any]) -> str:
+    """Order in which snapshots are written (see stream_diff)."""
+    return str(_job_key(job) or "")
+
+def _iter_sorted_jobs(jobs: List[Dict[str, Any]]) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+    """
+    (str key, fingerprint, job) in key order. Snapshots written by the pipeline
+    are already sorted and are streamed as-is; anything else is sorted first.
+    """
+    prev_key = None
+    for key, _ in _keyed_jobs(jobs):
+        if prev_key is not None and key < prev_key:
+            keyed = sorted(_keyed_jobs(jobs), key=lambda kj: kj[0])
+            break
+        prev_key = key
+    else:
+        keyed = _keyed_jobs(jobs)
+    for key, job in keyed:
+        yield key, job.get("fingerprint") or job_fingerprint(job), job
+
+def _merge_join(prev_rows, curr_rows) -> Iterator[Tuple[Any, Any]]:
+    """Sort-merge join of two key-ordered streams: yields (prev_row | None, curr_row | None)."""
+    prev_rows = _dedupe_sorted(prev_rows)
+    curr_rows = _dedupe_sorted(curr_rows)
+    p = next(prev_rows, None)
+    c = next(curr_rows, None)
+    while p is not None or c is not None:
+        if c is None or (p is not None and p[0] < c[0]):
+            yield p, None
+            p = next(prev_rows, None)
+        elif p is None or c[0] < p[0]:
+            yield None, c
+            c = next(curr_rows, None)
+        else:
+            yield p, c
+            p = next(prev_rows, None)
+            c = next(curr_rows, None)
+
+def _write_json_array(out, spool) -> None:
+    spool.seek(0)
+    out.write(b"[")
+    first = True
+    for line in spool:
+        if not first:
+            out.write(b",")
+        out.write(line.rstrip(b"\n"))
+        first = False
+    out.write(b"]")
+
+class _OutOfOrder(Exception):
+    """A streamed previous snapshot was not written in key order."""
+
+def _stream_jobs(records: Iterable[Any]) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+    """
+    (str key, fingerprint, job) for a snapshot read record by record. Snapshots
+    written by the pipeline are in key order; anything else raises _OutOfOrder.
+    """
+    prev_key = None
+    for key, job in _keyed_jobs(records):
+        if prev_key is not None and key < prev_key:
+            raise _OutOfOrder(key)
+        prev_key = key
+        yield key, job.get("fingerprint") or job_fingerprint(job), job
+
+# Card fields the analytics syncs read (src.analytics.daily_sync, src.analytics.lifespan)
+_SYNC_FIELDS = ("job_key", "title", "url", "seniority", "discipline", "cluster_id")
+
+def _sync_card(card: Dict[str, Any]) -> Dict[str, Any]:
+    return {f: card.get(f) for f in _SYNC_FIELDS}
+
+def stream_diff(
+    company_slug: str,
+    current_ts: str,
+    current_snapshot_data: List[Dict],
+    snapshot_dir: str,
+    diff_path: str,
+    use_card_cache: bool = True,
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Bounded-memory diff for huge boards. Previous and current jobs are
+    merge-joined in job_key order in one sequential pass; added/removed/changed
+    cards are spooled to temporary NDJSON files as they are found, then the diff
+    file is streamed out in the usual format. Summary counts match build_diff.
+
+    The previous side streams from the card cache in primary-key order, else
+    from the previous snapshot file line by line (the pipeline writes snapshots
+    in key order, as full bases for boards this size). Only a snapshot that is
+    not streamable (legacy JSON, delta, archived, out of order) is loaded and
+    sorted in memory.
+
+    Returns (diff_path, sync_data): the summary plus, per added/removed/changed
+    job, just the fields the analytics syncs read, so callers never reload the
+    diff file.
+    """
+    prev_path = get_previous_snapshot_path(snapshot_dir, current_ts, company_slug)
+    prev_ts = snapshots.timestamp_from_path(prev_path) if prev_path and os.path.exists(prev_path) else None
+
+    conn = get_connection()
+    spools = {name: tempfile.TemporaryFile() for name in ("added", "removed", "changed", "upserts", "deletes")}
+
+    def merge(prev_rows, prev_card, from_cache):
+        for spool in spools.values():
+            spool.seek(0)
+            spool.truncate()
+        summary = {"added": 0, "removed": 0, "changed": 0, "us_added": 0, "us_remote_added": 0, "senior_plus_added": 0}
+        sync_data = {"summary": summary, "added": [], "removed": [], "changed": []}
+        for p, c in _merge_join(prev_rows, _iter_sorted_jobs(current_snapshot_data)):
+            if c is None:
+                card = prev_card(p)
+                summary["removed"] += 1
+                spools["removed"].write(serialization.dumps(card) + b"\n")
+                spools["deletes"].write(serialization.dumps(p[0]) + b"\n")
+                sync_data["removed"].append(_sync_card(card))
+                continue
+            curr_card = None
+            if p is None:
+                curr_card = _create_job_card(c[2])
+                summary["added"] += 1
+                summary["us_added"] += int(bool(curr_card["is_us"]))
+                summary["us_remote_added"] += int(bool(curr_card["is_us_remote"]))
+                summary["senior_plus_added"] += int(curr_card["seniority"] in SENIOR_PLUS_LEVELS)
+                spools["added"].write(serialization.dumps(curr_card) + b"\n")
+                sync_data["added"].append(_sync_card(curr_card))
+            elif p[1] != c[1]:
+                curr_card = _create_job_card(c[2])
+                changes = _detect_changes(prev_card(p), curr_card)
+                if changes:
+                    c_copy = curr_card.copy()
+                    c_copy["changes"] = changes
+                    summary["changed"] += 1
+                    spools["changed"].write(serialization.dumps(c_copy) + b"\n")
+                    sync_data["changed"].append({"job_key": curr_card["job_key"], "changes": changes})
+            if use_card_cache:
+                # Every card that differs from its cached copy is rewritten, not just re-fingerprinted ones
+                if curr_card is None:
+                    curr_card = _create_job_card(c[2])
+                if not (from_cache and p is not None and p[2] == serialization.dumps(curr_card)):
+                    spools["upserts"].write(serialization.dumps([c[0], curr_card]) + b"\n")
+        return sync_data
+
+    try:
+        from_cache = bool(prev_ts) and use_card_cache and card_cache.is_current(company_slug, prev_ts, conn)
+        if from_cache:
+            sync_data = merge(card_cache.iter_sorted(company_slug, conn), lambda row: serialization.loads(row[2]), True)
+        else:
+            prev_card = lambda row: _create_job_card(row[2])
+            sync_data = None
+            if prev_ts:
+                try:
+                    sync_data = merge(_stream_jobs(snapshots.iter_records(prev_path)), prev_card, False)
+                except (_OutOfOrder, OSError, EOFError, ValueError) as e:
+                    print(f"Previous snapshot {prev_path} not streamable ({e!r}); loading it whole")
+                    try:
+                        sync_data = merge(_iter_sorted_jobs(snapshots.load(prev_path)), prev_card, False)
+                    except Exception as e:
+                        print(f"Error loading previous snapshot {prev_path}: {e}")
+                        prev_ts = None
+            if sync_data is None:
+                sync_data = merge(iter(()), prev_card, False)
+
+        header = {
+            "company_slug": company_slug,
+            "current_snapshot_ts": current_ts,
+            "previous_snapshot_ts": prev_ts,
+            "summary": sync_data["summary"],
+        }
+        with snapshots.open_atomic(diff_path) as out:
+            out.write(serialization.dumps(header)[:-1])
+            for name in ("added", "removed", "changed"):
+                out.write(b',"' + name.encode() + b'":')
+                _write_json_array(out, spools[name])
+            out.write(b"}")
+    finally:
+        conn.close()
+
+    try:
+        if use_card_cache:
+            for name in ("upserts", "deletes"):
+                spools[name].seek(0)
+            card_cache.update(
+                company_slug,
+                current_ts,
+                (tuple(serialization.loads(line)) for line in spools["upserts"]),
+                (serialization.loads(line) for line in spools["deletes"]),
+                replace=not from_cache,
+            )
+    finally:
+        for spool in spools.values():
+            spool.close()
+
+    print(f"Diff saved to {diff_path}")
+    return diff_path, sync_data
+
+def generate_diff(company_slug: str, current_ts: str, current_snapshot_data: List[Dict], snapshot_dir: str, diff_dir: str):
+    """
+    Main entry point to generate differences: builds the diff and saves it.
+    """
+    diff_output = build_diff(company_slug, current_ts, current_snapshot_data, snapshot_dir)
+    diff_path = diff_path_for(diff_dir, company_slug, current_ts)
     
-    # Save
-    os.makedirs(diff_dir, exist_ok=True)
-    diff_filename = f"jobs_diff_{company_slug}_{current_ts}.json"
-    diff_path = os.path.join(diff_dir, diff_filename)
-    
-    with open(diff_path, 'w', encoding='utf-8') as f:
-        json.dump(diff_output, f, indent=2, ensure_ascii=False)
+    snapshots.save(diff_output, diff_path)
         
     print(f"Diff saved to {diff_path}")
     return diff_path
@@ -5,6 +5,7 @@ import random
 import re
 from bs4 import BeautifulSoup
 from src.utils import parse_location
+from src.jobs import identity
 
 def fetch_jobs(config, max_pages=None):
     """
@@ -85,10 +86,8 @@ def fetch_jobs(config, max_pages=None):
                         job_id = match.group(1)
                 
                 if not job_id:
-                    if item_url:
-                        job_id = str(abs(hash(item_url)))
-                    else:
-                        job_id = str(abs(hash(title + str(raw_locs))))
+                    # Deterministic fallback (hash() is randomized per process)
+                    job_id = identity.canonical_url(item_url) or identity.content_key(title, raw_locs)
                 
                 page_ids.append(job_id)
                 
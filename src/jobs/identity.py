@@ -0,0 +1,127 @@
+import hashlib
+import re
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# ---------------------------------------------------------------------------
+# Job identity
+# ---------------------------------------------------------------------------
+# job_key is what diffs, lifecycles and the card cache join on, so it must be
+# the same for the same posting on every run. Resolution order:
+#   1. an explicit job_key (ATS fetchers set it from the board's job id)
+#   2. the source's own id, via a per-fetcher rule (custom fetchers emit job_id)
+#   3. the canonical URL (scheme/host case, tracking params, fragment and
+#      trailing slash removed; remaining params sorted)
+#   4. a content hash of title + locations
+# Keys are computed from the job record alone, so snapshots written before a
+# job_key was stamped resolve to the same key on read. Never use hash() here:
+# it is randomized per process.
+
+# Query parameters that vary per visit/referrer, never per posting
+TRACKING_PARAMS = {
+    "gclid", "fbclid", "mc_cid", "mc_eid", "ref", "referrer", "source", "src", "trk",
+    "gh_src", "gh_jid_src", "lever-source", "lever-origin", "lever-via", "ashby_src",
+}
+TRACKING_PREFIXES = ("utm_",)
+
+# Bump whenever resolution below changes: stored keys from another scheme no
+# longer match, so keyed caches (src.jobs.card_cache) are treated as misses
+KEY_SCHEME = "1"
+
+_GOOGLE_ID = re.compile(r"jobs/results/(\d+)")
+_META_ID = re.compile(r"/jobs/(\d+)")
+
+
+def _clean(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    s = str(value).strip()
+    return s if s and s.lower() not in ("none", "null") else None
+
+
+def canonical_url(url: Optional[str]) -> Optional[str]:
+    """Normalizes a job URL so tracking params, case and trailing slashes don't change identity."""
+    url = _clean(url)
+    if not url:
+        return None
+    parts = urlsplit(url)
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ""))
+
+
+def _loc_text(loc: Any) -> str:
+    if isinstance(loc, dict):
+        raw = loc.get("raw") or ", ".join(p for p in (loc.get("city"), loc.get("state"), loc.get("country_code")) if p)
+        return " ".join(str(raw).lower().split())
+    return " ".join(str(loc).lower().split())
+
+
+def content_key(title: Optional[str], locations: Any = ()) -> str:
+    """Last-resort key: deterministic hash of normalized title + location set."""
+    locs = sorted({_loc_text(l) for l in (locations or [])})
+    payload = "\x1f".join([" ".join((title or "").lower().split())] + locs)
+    return "h:" + hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _native_id(job: Dict[str, Any]) -> Optional[str]:
+    return _clean(job.get("job_id"))
+
+
+def _google_id(job: Dict[str, Any]) -> Optional[str]:
+    # Only the numeric id in the URL is stable; job_id fallbacks in older snapshots were hash()-based
+    match = _GOOGLE_ID.search(job.get("url") or "")
+    return match.group(1) if match else None
+
+
+def _meta_id(job: Dict[str, Any]) -> Optional[str]:
+    match = _META_ID.search(job.get("url") or "")
+    return _native_id(job) or (match.group(1) if match else None)
+
+
+# Per-fetcher id rules (keyed by the job's source/adapter name)
+SOURCE_KEYS: Dict[str, Callable[[Dict[str, Any]], Optional[str]]] = {
+    "google": _google_id,
+    "meta": _meta_id,
+    "amazon": _native_id,
+    "uber": _native_id,
+    "apple": _native_id,
+}
+
+
+def _source(job: Dict[str, Any]) -> Optional[str]:
+    return job.get("source") or job.get("adapter") or job.get("source_ats")
+
+
+def job_key(job: Dict[str, Any], source: Optional[str] = None) -> Optional[str]:
+    """Stable identity of a job record (see module comment). None only for records with nothing to key on."""
+    key = _clean(job.get("job_key"))
+    if key:
+        return key
+    rule = SOURCE_KEYS.get(_source(job) or source or "")
+    key = rule(job) if rule else (_clean(job.get("id")) or _native_id(job))
+    if key:
+        return key
+    url = canonical_url(job.get("url"))
+    if url:
+        return url
+    if job.get("title"):
+        return content_key(job.get("title"), job.get("locations"))
+    return None
+
+
+def legacy_job_key(job: Dict[str, Any]) -> Optional[str]:
+    """The key older code derived (job_key > id > raw URL); used to re-key existing history."""
+    key = job.get("job_key") or job.get("id") or job.get("url")
+    return str(key) if key else None
+
+
+def assign_job_key(job: Dict[str, Any], source: Optional[str] = None) -> Dict[str, Any]:
+    """Stamps job["job_key"] in place; `source` is the fetcher name for records that don't carry one."""
+    key = job_key(job, source)
+    if key:
+        job["job_key"] = key
+    return job
@@ -6,6 +6,7 @@ import datetime
 from src.utils import setup_logging
 from src.pipelines import jobs, news
 from src.news.models import init_db
+from src.storage.session import RunSession
 from src.analytics.signal_engine import compute_and_store_signals
 
 def load_companies():
@@ -21,6 +22,7 @@ def main():
     parser.add_argument("--all", action="store_true", help="Run Both (default)")
     parser.add_argument("--init-db", action="store_true", help="Init News DB")
     parser.add_argument("--days", type=int, default=7, help="Days back for news")
+    parser.add_argument("--news-rebuild", action="store_true", help="Rebuild all news aggregates (verifies the incremental ones)")
     
     args = parser.parse_args()
     
@@ -45,23 +47,30 @@ def main():
     if args.init_db:
         logger.info("Database initialized.")
 
+    # One DB session for the whole run (see src/storage/session.py)
+    session = RunSession()
+
     # 2. Run Jobs
     if args.jobs or args.all:
         print("\n--- Running Job Scraper ---")
-        job_results = jobs.run(run_timestamp, companies)
+        job_results = jobs.run(run_timestamp, companies, session=session)
         print(f"Jobs Done: {job_results['raw']} raw, {job_results['filtered']} filtered")
 
     # 3. Run News
     if args.news or args.all:
         print("\n--- Running News Scraper ---")
-        news_results = news.run(run_timestamp, companies, days_back=args.days, do_init_db=False)
+        news_results = news.run(run_timestamp, companies, days_back=args.days, do_init_db=False, full_rebuild=args.news_rebuild)
         print(f"News Done: +{news_results['new_articles']} new articles")
 
     # 4. Momentum/timing signals (used by the dashboard)
     try:
-        compute_and_store_signals(run_timestamp, lookback_days=7)
+        with session.unit("signals") as conn:
+            compute_and_store_signals(run_timestamp, lookback_days=7, conn=conn)
     except Exception as e:
         logger.error(f"Signal computation failed: {e}")
+    finally:
+        logger.info(session.summary())
+        session.close()
 
     print("\nAll Tasks Completed.")
 
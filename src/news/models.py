@@ -5,8 +5,69 @@ from datetime import datetime
 
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "news.db")
 
+# Applied to every connection. WAL lets readers (the dashboard) run alongside a
+# writing pipeline and turns commits into sequential log appends; under WAL,
+# synchronous=NORMAL only risks the last commits on power loss, never corruption.
+# cache_size is in KiB when negative.
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -65536,
+    "mmap_size": 268435456,
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,
+}
+# Compiled statements kept per connection, keyed by SQL text
+STATEMENT_CACHE_SIZE = 256
+
+# Role episodes: stretches during which at least one posting of a role
+# (cluster_id, else job_key) was open, from job_intervals. Overlapping or
+# back-to-back postings merge; a gap with nothing open starts a new episode, so
+# the gap never counts as open time. {where} filters the intervals scanned
+# (e.g. "WHERE i.company_slug = ?"): SQLite does not push a filter on the
+# role_lifecycle view down through its window functions.
+ROLE_EPISODES_SQL = """
+    WITH postings AS (
+        SELECT
+            i.id, i.company_slug, i.role_key, i.open_date, i.close_date,
+            jl.title, jl.discipline, jl.seniority,
+            -- latest close among the role's earlier postings (open ones reach forever)
+            MAX(COALESCE(i.close_date, '9999-12-31')) OVER (
+                PARTITION BY i.company_slug, i.role_key ORDER BY i.open_date, i.id
+                ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+            ) AS reach
+        FROM job_intervals i
+        LEFT JOIN job_lifecycle jl ON jl.company_slug = i.company_slug AND jl.job_key = i.job_key
+        {where}
+    ),
+    episodes AS (
+        SELECT *, SUM(reach IS NULL OR open_date > reach) OVER (
+            PARTITION BY company_slug, role_key ORDER BY open_date, id
+        ) AS episode
+        FROM postings
+    )
+    SELECT
+        company_slug,
+        role_key AS cluster_id,
+        MIN(open_date) AS first_seen_date,
+        NULLIF(MAX(COALESCE(close_date, '9999-12-31')), '9999-12-31') AS closed_date,
+        MIN(title) AS title,
+        MIN(discipline) AS discipline,
+        MIN(seniority) AS seniority,
+        COUNT(*) AS postings
+    FROM episodes
+    GROUP BY company_slug, role_key, episode
+"""
+
+
+def configure(conn: sqlite3.Connection) -> sqlite3.Connection:
+    for name, value in PRAGMAS.items():
+        conn.execute(f"PRAGMA {name}={value}")
+    return conn
+
+
 def get_connection():
-    return sqlite3.connect(DB_PATH)
+    return configure(sqlite3.connect(DB_PATH, cached_statements=STATEMENT_CACHE_SIZE))
 
 def init_db():
     conn = get_connection()
@@ -53,6 +114,21 @@ def init_db():
             UNIQUE(raw_news_id)
         )
     ''')
+    # Per-company timelines, and day windows/grouping on the derived date (agg_daily_news)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_normalized_news_company_published ON normalized_news(company_slug, published_at)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_normalized_news_day ON normalized_news(date(published_at), company_slug)")
+
+    # Every category the categorizer matched per article (news_category keeps the
+    # first one); articles without rows here predate it and count by news_category
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS news_labels (
+            news_id TEXT,  -- normalized_news.id
+            category TEXT,
+            hit_count INTEGER,
+            positions TEXT,  -- comma-separated match offsets in "title. summary"
+            PRIMARY KEY (news_id, category)
+        )
+    ''')
 
     # Analytics: Job Diffs Daily
     c.execute('''
@@ -113,6 +189,10 @@ def init_db():
             PRIMARY KEY (company_slug, date, discipline)
         )
     ''')
+    # All-company date windows (signal engine); per-company reads use the primary keys
+    c.execute("CREATE INDEX IF NOT EXISTS idx_job_diffs_daily_date ON job_diffs_daily(date, company_slug, added_count, removed_count)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_company_open_now_daily_date ON company_open_now_daily(date)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_job_diffs_discipline_daily_date ON job_diffs_discipline_daily(date)")
 
     # Analytics: Job Lifecycles (open -> closed) inferred from snapshots
     c.execute('''
@@ -131,6 +211,24 @@ def init_db():
     ''')
     c.execute("CREATE INDEX IF NOT EXISTS idx_job_lifecycle_company_closed ON job_lifecycle(company_slug, closed_date)")
     c.execute("CREATE INDEX IF NOT EXISTS idx_job_lifecycle_company_first_seen ON job_lifecycle(company_slug, first_seen_date)")
+    # All-company date-range diffs (src/analytics/range_diff.py)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_job_lifecycle_first_seen ON job_lifecycle(first_seen_date)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_job_lifecycle_closed ON job_lifecycle(closed_date)")
+
+    # Analytics: Field-level job changes, one row per changed job per run (from diffs)
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS job_changes (
+            company_slug TEXT,
+            job_key TEXT,
+            date TEXT,          -- YYYY-MM-DD
+            run_timestamp TEXT,
+            fields TEXT,        -- comma-separated changed fields
+            changes TEXT,       -- JSON {field: {"before": ..., "after": ...}}
+            PRIMARY KEY (company_slug, job_key, run_timestamp)
+        )
+    ''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_job_changes_date ON job_changes(date)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_job_changes_company_date ON job_changes(company_slug, date)")
 
     # Analytics: Lifespan Summary (precomputed for dashboard speed)
     c.execute('''
@@ -180,6 +278,178 @@ def init_db():
     ''')
     c.execute("CREATE INDEX IF NOT EXISTS idx_company_signals_date_mover ON company_signals_daily(date, is_mover)")
     
+    # Storage: Snapshot/Diff Manifest (one row per file written under data/)
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS snapshot_manifest (
+            company_slug TEXT,
+            ats TEXT,
+            run_timestamp TEXT, -- YYYY-MM-DDTHH-MM-SSZ (file timestamp)
+            kind TEXT,          -- raw/filtered/diff
+            path TEXT,          -- relative to repo root
+            job_count INTEGER,  -- jobs in snapshot, or added+removed+changed for diffs
+            content_hash TEXT,  -- sha256 of file bytes
+            created_at TEXT,
+            PRIMARY KEY (company_slug, kind, run_timestamp)
+        )
+    ''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_snapshot_manifest_kind_ts ON snapshot_manifest(kind, run_timestamp)")
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS snapshot_manifest_state (
+            name TEXT PRIMARY KEY,  -- 'indexed_at': scripts/build_manifest.py has indexed every file on disk
+            value TEXT
+        )
+    ''')
+
+    # Diff: cards of each company's latest diffed snapshot (see src/jobs/card_cache.py)
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS job_card_cache (
+            company_slug TEXT,
+            job_key TEXT,
+            fingerprint TEXT,
+            card BLOB,          -- compact JSON of the diff card
+            PRIMARY KEY (company_slug, job_key)
+        )
+    ''')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS job_card_cache_state (
+            company_slug TEXT PRIMARY KEY,
+            run_timestamp TEXT  -- snapshot the cached cards describe
+        )
+    ''')
+    # job_key scheme the cached keys were derived with (src.jobs.identity.KEY_SCHEME)
+    _ensure_column("job_card_cache_state", "key_scheme", "key_scheme TEXT")
+
+    # Near-duplicate clusters: one row per job ever clustered (see src/jobs/dedupe.py)
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS job_clusters (
+            company_slug TEXT,
+            job_key TEXT,
+            cluster_id TEXT,    -- key of the cluster's first job
+            signature BLOB,     -- MinHash signature (uint32 array)
+            PRIMARY KEY (company_slug, job_key)
+        )
+    ''')
+    _ensure_column("job_lifecycle", "cluster_id", "cluster_id TEXT")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_job_lifecycle_company_cluster ON job_lifecycle(company_slug, cluster_id)")
+    _ensure_column("job_diffs_daily", "roles_added_count", "roles_added_count INTEGER")
+    _ensure_column("job_diffs_daily", "roles_removed_count", "roles_removed_count INTEGER")
+
+    # Lifecycle intervals: one row per open stretch of a job (a reopen starts a new one)
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS job_intervals (
+            id INTEGER PRIMARY KEY,
+            company_slug TEXT,
+            job_key TEXT,
+            role_key TEXT,       -- cluster_id, or job_key for unclustered jobs
+            open_date TEXT,      -- YYYY-MM-DD
+            close_date TEXT,     -- YYYY-MM-DD (null while open; not open on this date)
+            is_repost INTEGER DEFAULT 0,  -- role had closed and no posting was open
+            gap_days INTEGER     -- days since the role's previous close (reposts only)
+        )
+    ''')
+    c.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_job_intervals_job ON job_intervals(company_slug, job_key, open_date)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_job_intervals_company_open ON job_intervals(company_slug, open_date)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_job_intervals_company_close ON job_intervals(company_slug, close_date)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_job_intervals_role ON job_intervals(company_slug, role_key, open_date)")
+    # Interval index for as-of queries: R*Tree over [open_day, close_day) (julian days),
+    # kept in sync by triggers. Optional: builds without the rtree module use the B-tree indexes.
+    try:
+        c.execute("CREATE VIRTUAL TABLE IF NOT EXISTS job_intervals_rtree USING rtree_i32(id, open_day, close_day)")
+        c.executescript('''
+            CREATE TRIGGER IF NOT EXISTS job_intervals_rtree_ins AFTER INSERT ON job_intervals BEGIN
+                INSERT INTO job_intervals_rtree VALUES (
+                    new.id, CAST(julianday(new.open_date) AS INTEGER),
+                    COALESCE(CAST(julianday(new.close_date) AS INTEGER), 2147483647));
+            END;
+            CREATE TRIGGER IF NOT EXISTS job_intervals_rtree_upd AFTER UPDATE OF open_date, close_date ON job_intervals BEGIN
+                UPDATE job_intervals_rtree SET
+                    open_day = CAST(julianday(new.open_date) AS INTEGER),
+                    close_day = COALESCE(CAST(julianday(new.close_date) AS INTEGER), 2147483647)
+                WHERE id = new.id;
+            END;
+            CREATE TRIGGER IF NOT EXISTS job_intervals_rtree_del AFTER DELETE ON job_intervals BEGIN
+                DELETE FROM job_intervals_rtree WHERE id = old.id;
+            END;
+        ''')
+    except sqlite3.OperationalError:
+        pass
+    # Distinct roles: one row per role episode (see ROLE_EPISODES_SQL). Recreated
+    # on every init so a changed definition reaches existing databases.
+    c.execute("DROP VIEW IF EXISTS role_lifecycle")
+    c.execute("CREATE VIEW role_lifecycle AS " + ROLE_EPISODES_SQL.format(where=""))
+    # Lifespan histograms, maintained from job_intervals by triggers so every writer
+    # (live sync, backfill, re-key) keeps them exact:
+    #   - lifespan_closed_hist: closed intervals by close date and days open
+    #   - lifespan_open_hist: open intervals by open date; the open-age histogram
+    #     as of any later date is this one shifted by that date
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS lifespan_closed_hist (
+            company_slug TEXT,
+            close_date TEXT,
+            days_open INTEGER,   -- close_date - open_date + 1
+            count INTEGER,
+            PRIMARY KEY (company_slug, close_date, days_open)
+        )
+    ''')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS lifespan_open_hist (
+            company_slug TEXT,
+            open_date TEXT,
+            count INTEGER,
+            PRIMARY KEY (company_slug, open_date)
+        )
+    ''')
+    hist_add = '''
+        INSERT INTO lifespan_open_hist (company_slug, open_date, count)
+        SELECT {r}.company_slug, {r}.open_date, 1 WHERE {r}.close_date IS NULL
+        ON CONFLICT(company_slug, open_date) DO UPDATE SET count = count + 1;
+        INSERT INTO lifespan_closed_hist (company_slug, close_date, days_open, count)
+        SELECT {r}.company_slug, {r}.close_date, {days}, 1 WHERE {r}.close_date IS NOT NULL AND {days} > 0
+        ON CONFLICT(company_slug, close_date, days_open) DO UPDATE SET count = count + 1;
+    '''
+    hist_remove = '''
+        UPDATE lifespan_open_hist SET count = count - 1
+        WHERE {r}.close_date IS NULL AND company_slug = {r}.company_slug AND open_date = {r}.open_date;
+        UPDATE lifespan_closed_hist SET count = count - 1
+        WHERE company_slug = {r}.company_slug AND close_date = {r}.close_date AND days_open = {days};
+        DELETE FROM lifespan_open_hist
+        WHERE company_slug = {r}.company_slug AND open_date = {r}.open_date AND count <= 0;
+        DELETE FROM lifespan_closed_hist
+        WHERE company_slug = {r}.company_slug AND close_date = {r}.close_date AND days_open = {days} AND count <= 0;
+    '''
+    days = "(CAST(julianday({r}.close_date) - julianday({r}.open_date) AS INTEGER) + 1)"
+    add_new = hist_add.format(r="new", days=days.format(r="new"))
+    remove_old = hist_remove.format(r="old", days=days.format(r="old"))
+    c.executescript(f'''
+        CREATE TRIGGER IF NOT EXISTS job_intervals_hist_ins AFTER INSERT ON job_intervals BEGIN {add_new} END;
+        CREATE TRIGGER IF NOT EXISTS job_intervals_hist_upd AFTER UPDATE OF open_date, close_date ON job_intervals
+        BEGIN {remove_old} {add_new} END;
+        CREATE TRIGGER IF NOT EXISTS job_intervals_hist_del AFTER DELETE ON job_intervals BEGIN {remove_old} END;
+    ''')
+    # Migration: seed one interval per existing lifecycle row (gaps before this point are unknown)
+    c.execute('''
+        INSERT INTO job_intervals (company_slug, job_key, role_key, open_date, close_date)
+        SELECT company_slug, job_key, COALESCE(cluster_id, job_key), first_seen_date, closed_date
+        FROM job_lifecycle
+        WHERE NOT EXISTS (SELECT 1 FROM job_intervals)
+    ''')
+    # Migration: histograms for intervals recorded before the triggers existed
+    if not c.execute("SELECT 1 FROM lifespan_open_hist UNION ALL SELECT 1 FROM lifespan_closed_hist LIMIT 1").fetchone():
+        c.execute('''
+            INSERT INTO lifespan_open_hist (company_slug, open_date, count)
+            SELECT company_slug, open_date, COUNT(*) FROM job_intervals
+            WHERE close_date IS NULL GROUP BY company_slug, open_date
+        ''')
+        c.execute('''
+            INSERT INTO lifespan_closed_hist (company_slug, close_date, days_open, count)
+            SELECT company_slug, close_date, CAST(julianday(close_date) - julianday(open_date) AS INTEGER) + 1 AS d, COUNT(*)
+            FROM job_intervals
+            WHERE close_date IS NOT NULL AND d > 0
+            GROUP BY company_slug, close_date, d
+        ''')
+    _ensure_column("company_lifespan_daily", "repost_rate", "repost_rate REAL")
+    _ensure_column("company_lifespan_daily", "median_time_to_fill_days", "median_time_to_fill_days REAL")
+
     # User Preferences: Starred Companies
     c.execute('''
         CREATE TABLE IF NOT EXISTS starred_companies (
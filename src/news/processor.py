@@ -1,4 +1,5 @@
 import json
+import re
 import uuid
 import logging
 import sqlite3
@@ -17,73 +18,179 @@ CATEGORIES = {
     "regulatory": ["regulatory", "lawsuit", "compliance", "fine", "investigation", "gdpr", "ftc"],
 }
 
+
+# All keywords compiled into one pattern, scanned once per text. The pattern is
+# the keyword trie (shared prefixes factored, so each position is checked
+# against a few first characters, not every keyword), preferring longer words.
+# Each search finds the next position where a keyword starts and the longest
+# keyword there; any keyword inside it starts there or within it, so each match
+# also credits the keywords it contains, but only those of its own category: the
+# longer phrase decides the meaning ("hiring freeze" is a layoff, not hiring).
+def _trie_pattern(words):
+    trie = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node):
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # Greedy optional: a longer keyword wins, this one matches if it does not
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+def _compile_matcher():
+    keywords = {k for kws in CATEGORIES.values() for k in kws}
+    own = {k: {cat for cat, kws in CATEGORIES.items() if k in kws} for k in keywords}
+    contained = {
+        k: [(cat, k.find(sub)) for cat, kws in CATEGORIES.items() if cat in own[k] for sub in kws if sub in k]
+        for k in keywords
+    }
+    return re.compile(_trie_pattern(keywords)), contained
+
+
+_KEYWORD_PATTERN, _KEYWORD_HITS = _compile_matcher()
+
+
+def match_categories(text):
+    """Category -> sorted offsets of its keyword hits in `text`, categories in CATEGORIES order."""
+    hits = {}
+    text_lower = text.lower()
+    search = _KEYWORD_PATTERN.search
+    covered = 0
+    m = search(text_lower)
+    while m:
+        start = m.start()
+        # A match inside an earlier one was credited (or overruled) by that one
+        if m.end() > covered:
+            covered = m.end()
+            for cat, offset in _KEYWORD_HITS[m.group()]:
+                if cat in hits:
+                    hits[cat].append(start + offset)
+                else:
+                    hits[cat] = [start + offset]
+        m = search(text_lower, start + 1)  # overlapping matches too
+    # A contained keyword can be credited by two matches, hence the set
+    return {cat: sorted(set(hits[cat])) for cat in CATEGORIES if cat in hits}
+
+
 class NewsProcessor:
     def __init__(self):
-        pass
+        # (company_slug, day) pairs that gained articles, for incremental aggregation
+        self.touched = set()
 
     def categorize(self, text):
-        text_lower = text.lower()
-        for cat, keywords in CATEGORIES.items():
-            if any(k in text_lower for k in keywords):
-                return cat
-        return "other"
-
-    def process_and_store(self, articles, company_slug, source_name, company_name=None):
-        conn = get_connection()
-        c = conn.cursor()
-        
-        count = 0
+        """Primary category: the first one in CATEGORIES order with a keyword hit."""
+        return next(iter(match_categories(text)), "other")
+
+    def _article_row(self, art, source_name):
+        """(source_article_id, url, title, desc, pub_at, source_domain, raw_json) for one fetched article."""
+        if source_name == "gnews":
+            return (
+                art.get('url'), art.get('url'), art.get('title'), art.get('description'),
+                art.get('publishedAt'), art.get('source', {}).get('name'), json.dumps(art),
+            )
+        if source_name == "finnhub":
+            # Finnhub returns timestamp int
+            ts = art.get('datetime')
+            pub_at = datetime.utcfromtimestamp(ts).isoformat() + "Z" if ts else None
+            return (
+                str(art.get('id')), art.get('url'), art.get('headline'), art.get('summary'),
+                pub_at, art.get('source'), json.dumps(art),
+            )
+        raise ValueError(f"unknown news source {source_name!r}")
+
+    def process_and_store(self, articles, company_slug, source_name, company_name=None, *, conn=None):
+        """
+        Stores new articles (raw + normalized) and returns how many were new.
+        The batch is staged in a temp table and merged into raw_news in one
+        statement, already-ingested articles skipped by the (source_id,
+        source_article_id) UNIQUE constraint; only the new ones are normalized.
+        With `conn` the writes join the caller's transaction (one per fetch run)
+        and errors propagate.
+        """
+        now_iso = datetime.utcnow().isoformat()
+        staged = []
         for art in articles:
-            # Map fields based on source
-            raw_id = str(uuid.uuid4())
             try:
-                if source_name == "gnews":
-                    source_article_id = art.get('url')
-                    title = art.get('title')
-                    desc = art.get('description')
-                    pub_at = art.get('publishedAt')
-                    source_domain = art.get('source', {}).get('name')
-                    raw_json = json.dumps(art)
-                    url = art.get('url')
-                elif source_name == "finnhub":
-                    source_article_id = str(art.get('id'))
-                    title = art.get('headline')
-                    desc = art.get('summary')
-                    # Finnhub returns timestamp int
-                    ts = art.get('datetime')
-                    pub_at = datetime.utcfromtimestamp(ts).isoformat() + "Z" if ts else None
-                    source_domain = art.get('source')
-                    raw_json = json.dumps(art)
-                    url = art.get('url')
-                
-                # Deduplication check
-                # Check if exists
-                c.execute("SELECT id FROM raw_news WHERE source_id=? AND source_article_id=?", (source_name, source_article_id))
-                existing = c.fetchone()
-                
-                if existing:
-                    continue
-
-                # Insert Raw
-                c.execute('''
-                    INSERT INTO raw_news (id, source_id, source_article_id, article_url, title, description, published_at, ingested_at, source_domain, raw_json)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (raw_id, source_name, source_article_id, url, title, desc, pub_at, datetime.utcnow().isoformat(), source_domain, raw_json))
-                
-                # Normalize
-                norm_id = str(uuid.uuid4())
-                full_text = f"{title}. {desc}"
-                category = self.categorize(full_text)
-                
-                c.execute('''
-                    INSERT INTO normalized_news (id, raw_news_id, company_slug, company_name, news_category, published_at, title, summary, source_url, processed_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (norm_id, raw_id, company_slug, company_name, category, pub_at, title, desc, url, datetime.utcnow().isoformat()))
-                
-                count += 1
+                staged.append((str(uuid.uuid4()), source_name) + self._article_row(art, source_name))
             except Exception as e:
                 logging.error(f"Error processing article: {e}")
-                
-        conn.commit()
-        conn.close()
-        return count
+        if not staged:
+            return 0
+
+        close_conn = False
+        if conn is None:
+            conn = get_connection()
+            close_conn = True
+        savepoint = False
+        try:
+            c = conn.cursor()
+            # A failed batch leaves nothing behind, even inside the caller's transaction
+            c.execute("SAVEPOINT news_batch")
+            savepoint = True
+            c.execute('''
+                CREATE TEMP TABLE IF NOT EXISTS news_stage (
+                    raw_id TEXT, source_id TEXT, source_article_id TEXT, url TEXT, title TEXT,
+                    description TEXT, published_at TEXT, source_domain TEXT, raw_json TEXT
+                )
+            ''')
+            c.execute("DELETE FROM news_stage")
+            c.executemany("INSERT INTO news_stage VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", staged)
+
+            # Known articles (and repeats within the batch) keep their existing row,
+            # so only staged rows whose raw_id landed are new
+            c.execute('''
+                INSERT INTO raw_news (id, source_id, source_article_id, article_url, title, description, published_at, ingested_at, source_domain, raw_json)
+                SELECT raw_id, source_id, source_article_id, url, title, description, published_at, ?, source_domain, raw_json
+                FROM news_stage WHERE true
+                ON CONFLICT(source_id, source_article_id) DO NOTHING
+            ''', (now_iso,))
+            new_rows = c.execute('''
+                SELECT s.raw_id, s.title, s.description, s.published_at, s.url, date(s.published_at)
+                FROM news_stage s JOIN raw_news r ON r.id = s.raw_id
+            ''').fetchall()
+
+            # Normalize (only new articles are categorized): primary category on the
+            # article, every matched category with its hit offsets in news_labels
+            normalized, labels = [], []
+            for raw_id, title, desc, pub_at, url, _ in new_rows:
+                norm_id = str(uuid.uuid4())
+                hits = match_categories(f"{title}. {desc}")
+                normalized.append((norm_id, raw_id, company_slug, company_name, next(iter(hits), "other"), pub_at, title, desc, url, now_iso))
+                labels.extend((norm_id, cat, len(pos), ",".join(map(str, pos))) for cat, pos in hits.items())
+                if not hits:
+                    labels.append((norm_id, "other", 0, ""))
+            c.executemany('''
+                INSERT INTO normalized_news (id, raw_news_id, company_slug, company_name, news_category, published_at, title, summary, source_url, processed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', normalized)
+            c.executemany("INSERT OR REPLACE INTO news_labels (news_id, category, hit_count, positions) VALUES (?, ?, ?, ?)", labels)
+            count = len(new_rows)
+
+            # Same day derivation as the aggregation (date(published_at))
+            self.touched.update((company_slug, day) for *_, day in new_rows if day)
+            c.execute("DELETE FROM news_stage")
+            c.execute("RELEASE news_batch")
+
+            if close_conn:
+                conn.commit()
+            return count
+        except Exception as e:
+            if savepoint:
+                conn.execute("ROLLBACK TO news_batch")
+                conn.execute("RELEASE news_batch")
+            if not close_conn:
+                raise
+            logging.error(f"Error storing articles for {company_slug}: {e}")
+            conn.rollback()
+            return 0
+        finally:
+            if close_conn:
+                conn.close()
@@ -2,11 +2,15 @@
 import os
 import json
 import logging
+from concurrent.futures import Future
 from src.jobs.fetchers import greenhouse, lever, ashby, smartrecruiters, workday
 from src.jobs.fetchers.custom import google, meta, amazon, uber, apple
-from src.utils import is_valid_job, is_us_eligible
-from src.jobs import diff
+from src.utils import tag_job, is_us_eligible
+from src.jobs import dedupe, diff, identity
 from src.analytics.lifespan import sync_open_now, sync_job_lifecycle
+from src.storage import history, manifest, snapshots
+from src.storage.session import RunSession
+from src.storage.writer import SnapshotWriter
 
 def get_fetcher(ats_name):
     """Returns the fetcher module based on ATS name."""
@@ -33,108 +37,221 @@ def get_fetcher(ats_name):
     else:
         raise ValueError(f"Unknown ATS: {ats_name}")
 
-def save_json(data, filepath):
-    """Saves data to a JSON file."""
-    os.makedirs(os.path.dirname(filepath), exist_ok=True)
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+def save_snapshot(data, directory, run_timestamp, full=False):
+    """
+    Saves a snapshot (delta against the previous run, or a periodic full base;
+    always a full base with `full`). Returns (path, sha256 of the written bytes).
+    """
+    return history.save_snapshot(data, directory, run_timestamp, full=full)
 
-def run(run_timestamp, companies):
+def save_diff(diff_output, diff_path):
+    """Saves a diff. Returns (path, sha256 of the written bytes)."""
+    return diff_path, snapshots.save(diff_output, diff_path)
+
+def _sync_company(logger, session, run_timestamp, pending):
+    """
+    Manifest + analytics for one company, once its files are on disk. Everything
+    is written in one unit of work (one commit); each step is a savepoint, so a
+    failing step is logged and undone without losing the others.
+    """
+    slug = pending["slug"]
+    ats = pending["ats"]
+    filtered_jobs = pending["filtered_jobs"]
+
+    raw_path, raw_hash = pending["raw"].result()
+    filtered_path, filtered_hash = pending["filtered"].result()
+    with session.unit(slug) as conn:
+        try:
+            with session.step("manifest"):
+                manifest.record(slug, ats, run_timestamp, "raw", raw_path, pending["raw_count"], raw_hash, conn=conn)
+                manifest.record(slug, ats, run_timestamp, "filtered", filtered_path, len(filtered_jobs), filtered_hash, conn=conn)
+        except Exception as e:
+            logger.warning(f"Manifest update failed for {slug}: {e}")
+
+        try:
+            with session.step("clusters"):
+                dedupe.save_clusters(pending.get("cluster_rows", []), conn=conn)
+        except Exception as e:
+            logger.warning(f"Cluster index update failed for {slug}: {e}")
+
+        diff_data = pending.get("diff_data")
+        if diff_data is None:
+            return
+
+        try:
+            diff_path, diff_hash = pending["diff"].result()
+            logger.info(f"Diff saved to {diff_path}")
+        except Exception as e:
+            logger.error(f"Diff generation failed for {slug}: {e}")
+            return
+
+        # Sync to Analytics DB (from the in-memory diff, not the file just written)
+        try:
+            from src.analytics.daily_sync import sync_job_diff
+            try:
+                with session.step("manifest"):
+                    s = diff_data.get("summary", {})
+                    diff_count = s.get("added", 0) + s.get("removed", 0) + s.get("changed", 0)
+                    manifest.record(slug, ats, run_timestamp, "diff", diff_path, diff_count, diff_hash, conn=conn)
+            except Exception as e:
+                logger.warning(f"Manifest update failed for {slug} diff: {e}")
+            with session.step("job_diff"):
+                sync_job_diff(diff_data, slug, run_timestamp, conn=conn)
+        except ImportError:
+            logger.warning("Analytics module not found, skipping sync.")
+        except Exception as e:
+            logger.error(f"Analytics sync failed for {slug}: {e}")
+
+        # Sync open-now + lifecycles (powers timing + durability analytics)
+        try:
+            with session.step("lifespan"):
+                sync_open_now(slug, run_timestamp, len(filtered_jobs), conn=conn)
+                sync_job_lifecycle(slug, run_timestamp, filtered_jobs, diff_data, window_days=180, conn=conn)
+        except Exception as e:
+            logger.error(f"Lifespan sync failed for {slug}: {e}")
+
+def run(run_timestamp, companies, session=None):
+    """
+    Fetches, snapshots and diffs every company, then syncs analytics through
+    `session` (a RunSession shared with the rest of the run; one is opened and
+    closed here when not given).
+    """
     logger = logging.getLogger("jobs")
     logger.info("--- Starting Job Pipeline ---")
     
     total_raw = 0
     total_filtered = 0
     stats = []
+    pending_syncs = []
 
-    for company in companies:
-        slug = company["slug"]
-        ats = company["ats"]
-        
-        try:
-            fetcher = get_fetcher(ats)
-            logger.info(f"Fetching {slug} ({ats})...")
-            
-            # Fetch data
-            if ats in ["google", "meta", "amazon", "uber", "apple"]:
-                config = company.get("config", {})
-                raw_jobs = fetcher.fetch_jobs(config)
-            else:
-                raw_jobs = fetcher.fetch_jobs(slug)
-
-            # Normalize data
-            if hasattr(fetcher, 'normalize_job'):
-                normalized_jobs = [fetcher.normalize_job(job) for job in raw_jobs]
-            else:
-                normalized_jobs = raw_jobs
-
-            # Inject company_slug
-            for job in normalized_jobs:
-                job["company_slug"] = slug
-
-            # Filter jobs
-            filtered_jobs = [
-                job for job in normalized_jobs 
-                if is_valid_job(job.get('title')) and is_us_eligible(job)
-            ]
-
-            # Write files
-            raw_path = f"data/raw/{ats}/{slug}/{run_timestamp}.json"
-            save_json(raw_jobs, raw_path)
-            
-            filtered_path = f"data/filtered/{ats}/{slug}/{run_timestamp}.json"
-            save_json(filtered_jobs, filtered_path)
-            
-            msg = f"{slug}: {len(raw_jobs)} raw, {len(filtered_jobs)} filtered"
-            logger.info(msg)
-            stats.append(msg)
+    # Snapshot/diff files are written behind the fetch loop; analytics run after the flush barrier
+    own_session = session is None
+    if own_session:
+        session = RunSession()
+    writer = SnapshotWriter()
+    try:
+        for company in companies:
+            slug = company["slug"]
+            ats = company["ats"]
             
-            total_raw += len(raw_jobs)
-            total_filtered += len(filtered_jobs)
-
-            # Generate Diff
             try:
-                snapshot_dir = os.path.dirname(filtered_path)
-                diff_dir = f"data/diffs/{ats}/{slug}"
-                
-                diff_path = diff.generate_diff(
-                    company_slug=slug,
-                    current_ts=run_timestamp,
-                    current_snapshot_data=filtered_jobs,
-                    snapshot_dir=snapshot_dir,
-                    diff_dir=diff_dir
-                )
+                fetcher = get_fetcher(ats)
+                logger.info(f"Fetching {slug} ({ats})... [writer backlog: {writer.backlog()}]")
                 
-                # Sync to Analytics DB
-                diff_data = None
+                # Fetch data
+                if ats in ["google", "meta", "amazon", "uber", "apple"]:
+                    config = company.get("config", {})
+                    raw_jobs = fetcher.fetch_jobs(config)
+                else:
+                    raw_jobs = fetcher.fetch_jobs(slug)
+
+                # Normalize data
+                if hasattr(fetcher, 'normalize_job'):
+                    normalized_jobs = [fetcher.normalize_job(job) for job in raw_jobs]
+                else:
+                    normalized_jobs = raw_jobs
+
+                # Inject company_slug + stable job_key + title tags (relevance, family, seniority, discipline)
+                for job in normalized_jobs:
+                    job["company_slug"] = slug
+                    identity.assign_job_key(job, ats)
+                    tag_job(job)
+
+                # Filter jobs
+                filtered_jobs = [
+                    job for job in normalized_jobs 
+                    if job["is_relevant"] and is_us_eligible(job)
+                ]
+
+                # Fingerprint diff-relevant fields once; stored with the snapshot for the next run's diff
+                for job in filtered_jobs:
+                    job["fingerprint"] = diff.job_fingerprint(job)
+                # Near-duplicate postings (per-location copies, reposts) share a cluster_id;
+                # new index rows are written with the company's analytics
                 try:
-                    from src.analytics.daily_sync import sync_job_diff
-                    if diff_path and os.path.exists(diff_path):
-                        with open(diff_path, 'r', encoding='utf-8') as f:
-                            diff_data = json.load(f)
-                        sync_job_diff(diff_data, slug, run_timestamp)
-                except ImportError:
-                    logger.warning("Analytics module not found, skipping sync.")
+                    cluster_rows = dedupe.cluster_jobs(slug, filtered_jobs, conn=session.conn, as_of_date=run_timestamp[:10])
                 except Exception as e:
-                    logger.error(f"Analytics sync failed for {slug}: {e}")
+                    logger.warning(f"Clustering failed for {slug}: {e}")
+                    cluster_rows = []
+                # Key order lets the next run's streaming diff merge-join without sorting
+                filtered_jobs.sort(key=diff.sort_key)
 
-                # Sync open-now + lifecycles (powers timing + durability analytics)
+                # Write files (background). Huge boards are stored as full NDJSON bases:
+                # no previous snapshot is loaded to delta-encode, and the next
+                # streaming diff reads this one line by line
+                huge = len(filtered_jobs) >= diff.STREAMING_DIFF_MIN_JOBS
+                pending = {
+                    "slug": slug,
+                    "ats": ats,
+                    "raw_count": len(raw_jobs),
+                    "filtered_jobs": filtered_jobs,
+                    "cluster_rows": cluster_rows,
+                    "raw": writer.submit(save_snapshot, raw_jobs, f"data/raw/{ats}/{slug}", run_timestamp, full=huge),
+                    "filtered": writer.submit(save_snapshot, filtered_jobs, f"data/filtered/{ats}/{slug}", run_timestamp, full=huge),
+                }
+                
+                msg = f"{slug}: {len(raw_jobs)} raw, {len(filtered_jobs)} filtered"
+                logger.info(msg)
+                stats.append(msg)
+                
+                total_raw += len(raw_jobs)
+                total_filtered += len(filtered_jobs)
+
+                # Generate Diff against the previous run (current snapshot stays in memory)
                 try:
-                    sync_open_now(slug, run_timestamp, len(filtered_jobs))
-                    sync_job_lifecycle(slug, run_timestamp, filtered_jobs, diff_data, window_days=180)
+                    diff_path = diff.diff_path_for(f"data/diffs/{ats}/{slug}", slug, run_timestamp)
+                    if huge:
+                        # Huge board: bounded-memory merge-join straight to the diff file; the
+                        # analytics syncs get its summary and slim per-job rows, not the file
+                        _, pending["diff_data"] = diff.stream_diff(
+                            company_slug=slug,
+                            current_ts=run_timestamp,
+                            current_snapshot_data=filtered_jobs,
+                            snapshot_dir=f"data/filtered/{ats}/{slug}",
+                            diff_path=diff_path,
+                        )
+                        pending["diff"] = Future()
+                        pending["diff"].set_result((diff_path, manifest.file_hash(diff_path)))
+                    else:
+                        diff_data = diff.build_diff(
+                            company_slug=slug,
+                            current_ts=run_timestamp,
+                            current_snapshot_data=filtered_jobs,
+                            snapshot_dir=f"data/filtered/{ats}/{slug}",
+                            use_card_cache=True,
+                        )
+                        pending["diff_data"] = diff_data
+                        pending["diff"] = writer.submit(save_diff, diff_data, diff_path)
                 except Exception as e:
-                    logger.error(f"Lifespan sync failed for {slug}: {e}")
+                    logger.error(f"Diff generation failed for {slug}: {e}")
+
+                pending_syncs.append(pending)
 
             except Exception as e:
-                logger.error(f"Diff generation failed for {slug}: {e}")
+                error_path = f"data/raw/{ats}/{slug}/{run_timestamp}_ERROR.txt"
+                os.makedirs(os.path.dirname(error_path), exist_ok=True)
+                with open(error_path, 'w', encoding='utf-8') as f:
+                    f.write(str(e))
+                logger.error(f"Failed {slug}: {e}")
+                stats.append(f"{slug}: FAILED")
 
-        except Exception as e:
-            error_path = f"data/raw/{ats}/{slug}/{run_timestamp}_ERROR.txt"
-            os.makedirs(os.path.dirname(error_path), exist_ok=True)
-            with open(error_path, 'w', encoding='utf-8') as f:
-                f.write(str(e))
-            logger.error(f"Failed {slug}: {e}")
-            stats.append(f"{slug}: FAILED")
+        # Barrier: every snapshot/diff is on disk before the manifest/analytics point at it
+        writer.flush()
+    finally:
+        writer.close()
+        logger.info(writer.summary())
+
+    try:
+        for pending in pending_syncs:
+            try:
+                _sync_company(logger, session, run_timestamp, pending)
+            except Exception as e:
+                logger.error(f"Snapshot write failed for {pending['slug']}: {e}")
+                stats.append(f"{pending['slug']}: WRITE FAILED")
+    finally:
+        logger.info(session.summary())
+        if own_session:
+            session.close()
 
     logger.info("--- Job Pipeline Complete ---")
     return {
@@ -1,11 +1,17 @@
 
 import logging
+from datetime import datetime
 from src.news.fetchers.gnews import GNewsFetcher, GNewsQuotaExceeded
 from src.news.fetchers.finnhub import FinnhubFetcher
 from src.news.processor import NewsProcessor
-from src.news.models import init_db
+from src.news.models import init_db, get_connection
 
-def run(run_timestamp, companies, days_back=7, do_init_db=False):
+# Weekday (0=Mon) whose run rebuilds the whole news window and reports drift
+# from the incremental aggregates
+FULL_REBUILD_WEEKDAY = 6
+
+
+def run(run_timestamp, companies, days_back=7, do_init_db=False, full_rebuild=False):
     logger = logging.getLogger("news")
     logger.info("--- Starting News Pipeline ---")
 
@@ -25,13 +31,15 @@ def run(run_timestamp, companies, days_back=7, do_init_db=False):
         "failures": 0
     }
 
+    # Fetch everything first, so no write transaction is held across HTTP calls
+    batches = []
     gnews_enabled = True
     for company in companies:
         slug = company.get("slug")
         name = company.get("name") or slug.replace("-", " ").title()
         ticker = company.get("ticker")
-        
-        logger.info(f"Processing News: {name}")
+
+        logger.info(f"Fetching News: {name}")
         stats["processed"] += 1
 
         # 1. GNews
@@ -39,11 +47,8 @@ def run(run_timestamp, companies, days_back=7, do_init_db=False):
             try:
                 articles = gnews.fetch_company_news(name, days_back=days_back)
                 if articles:
-                    count = processor.process_and_store(articles, slug, "gnews", company_name=name)
-                    if count > 0:
-                        logger.info(f"  GNews: +{count} new")
+                    batches.append((slug, name, "gnews", articles))
                     stats["gnews_fetched"] += len(articles)
-                    total_new += count
             except GNewsQuotaExceeded as e:
                 gnews_enabled = False
                 logger.error(f"  GNews quota exhausted; skipping remaining companies: {e}")
@@ -56,19 +61,45 @@ def run(run_timestamp, companies, days_back=7, do_init_db=False):
             try:
                 articles = finnhub.fetch_company_news(ticker, days_back=days_back)
                 if articles:
-                    count = processor.process_and_store(articles, slug, "finnhub", company_name=name)
-                    if count > 0:
-                        logger.info(f"  Finnhub: +{count} new")
+                    batches.append((slug, name, "finnhub", articles))
                     stats["finnhub_fetched"] += len(articles)
-                    total_new += count
             except Exception as e:
                 logger.error(f"  Finnhub failed for {slug}: {e}")
                 stats["failures"] += 1
-        
+
+    # Then ingest all batches in one transaction, committed once; a failed batch
+    # is rolled back to its savepoint and the rest still land
+    labels = {"gnews": "GNews", "finnhub": "Finnhub"}
+    conn = get_connection()
+    conn.isolation_level = None
+    conn.execute("BEGIN")
+    try:
+        for slug, name, source, articles in batches:
+            try:
+                count = processor.process_and_store(articles, slug, source, company_name=name, conn=conn)
+            except Exception as e:
+                logger.error(f"  {labels[source]} store failed for {slug}: {e}")
+                stats["failures"] += 1
+                continue
+            if count > 0:
+                logger.info(f"  {name} {labels[source]}: +{count} new")
+            total_new += count
+
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
     # Analytics Aggregation
     try:
         from src.analytics.daily_sync import agg_daily_news
-        agg_daily_news(days_back=30)
+        weekday = datetime.strptime(run_timestamp, "%Y-%m-%dT%H-%M-%SZ").weekday()
+        if full_rebuild or weekday == FULL_REBUILD_WEEKDAY:
+            agg_daily_news(days_back=30, verify=True)
+        elif processor.touched:
+            agg_daily_news(days_back=30, keys=processor.touched)
     except ImportError:
         pass
     except Exception as e:
@@ -0,0 +1,123 @@
+import os
+import shutil
+import zipfile
+from typing import Dict, Iterable, Optional, Tuple
+
+# ---------------------------------------------------------------------------
+# Monthly snapshot archives
+# ---------------------------------------------------------------------------
+# Snapshots/diffs that fall out of the hot retention window are rolled into
+# one zip per company per month:
+#   data/{kind}/{ats}/{slug}/archive/{YYYY-MM}.zip
+# Each member keeps its original filename and bytes (already gzip-compressed,
+# so members are stored, not re-deflated). The zip central directory is the
+# index: a single member is read with one seek, without unpacking the archive.
+#
+# An archived file is addressed as "{zip_path}!{member}", e.g.
+#   data/filtered/greenhouse/acme/archive/2025-01.zip!2025-01-03T00-00-00Z.ndjson.gz
+# and src.storage.snapshots reads these paths like any other file.
+
+ARCHIVE_DIRNAME = "archive"
+ARCHIVE_EXT = ".zip"
+MEMBER_SEP = "!"
+
+
+def archive_dir(directory: str) -> str:
+    return os.path.join(directory, ARCHIVE_DIRNAME)
+
+
+def archive_path(directory: str, month: str) -> str:
+    """Archive for `month` (YYYY-MM) of the company directory `directory`."""
+    return os.path.join(archive_dir(directory), month + ARCHIVE_EXT)
+
+
+def member_path(zip_path: str, member: str) -> str:
+    return f"{zip_path}{MEMBER_SEP}{member}"
+
+
+def is_archived(path: str) -> bool:
+    zip_path, sep, _ = path.partition(MEMBER_SEP)
+    return bool(sep) and zip_path.endswith(ARCHIVE_EXT)
+
+
+def split(path: str) -> Tuple[str, str]:
+    """Returns (zip_path, member) for an archived path."""
+    zip_path, _, member = path.partition(MEMBER_SEP)
+    return zip_path, member
+
+
+def company_dir(path: str) -> str:
+    """Company directory that an archived path belongs to."""
+    return os.path.dirname(os.path.dirname(split(path)[0]))
+
+
+def read_bytes(path: str) -> bytes:
+    zip_path, member = split(path)
+    with zipfile.ZipFile(zip_path) as zf:
+        return zf.read(member)
+
+
+def exists(path: str) -> bool:
+    if not is_archived(path):
+        return os.path.exists(path)
+    zip_path, member = split(path)
+    if not os.path.exists(zip_path):
+        return False
+    with zipfile.ZipFile(zip_path) as zf:
+        return member in zf.NameToInfo
+
+
+def members(zip_path: str) -> Dict[str, str]:
+    """Maps member name -> archived path for one archive."""
+    if not os.path.exists(zip_path):
+        return {}
+    with zipfile.ZipFile(zip_path) as zf:
+        return {name: member_path(zip_path, name) for name in zf.namelist()}
+
+
+def list_archived(directory: str) -> Dict[str, str]:
+    """Maps member name -> archived path across every monthly archive of `directory`."""
+    out: Dict[str, str] = {}
+    adir = archive_dir(directory)
+    if not os.path.isdir(adir):
+        return out
+    for filename in sorted(os.listdir(adir)):
+        if filename.endswith(ARCHIVE_EXT):
+            out.update(members(os.path.join(adir, filename)))
+    return out
+
+
+def find_member(zip_path: str, stem: str, exts: Iterable[str]) -> Optional[str]:
+    """Archived path of `{stem}<ext>` inside `zip_path` (first matching ext wins), else None."""
+    names = members(zip_path)
+    for ext in exts:
+        if stem + ext in names:
+            return names[stem + ext]
+    return None
+
+
+def add(zip_path: str, files: Dict[str, bytes]) -> None:
+    """
+    Adds {member: payload} to `zip_path`, creating it if needed. Existing members
+    are left untouched. Written to a temp file and swapped in, so a crash never
+    leaves a half-written archive behind.
+    """
+    os.makedirs(os.path.dirname(zip_path), exist_ok=True)
+    tmp_path = zip_path + ".tmp"
+    if os.path.exists(zip_path):
+        shutil.copyfile(zip_path, tmp_path)
+    elif os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    with zipfile.ZipFile(tmp_path, "a") as zf:
+        existing = set(zf.namelist())
+        for member, payload in files.items():
+            if member in existing:
+                continue
+            # Members are already gzip'd; only legacy plain .json benefits from deflate
+            compress = zipfile.ZIP_STORED if member.endswith(".gz") else zipfile.ZIP_DEFLATED
+            info = zipfile.ZipInfo(member, date_time=(1980, 1, 1, 0, 0, 0))
+            info.compress_type = compress
+            zf.writestr(info, payload)
+
+    os.replace(tmp_path, zip_path)
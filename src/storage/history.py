@@ -0,0 +1,224 @@
+import logging
+import os
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from src.storage import snapshots
+
+# ---------------------------------------------------------------------------
+# Delta-encoded snapshot history
+# ---------------------------------------------------------------------------
+# Consecutive snapshots of a company are mostly identical, so most runs are
+# stored as a delta against the previous run ({ts}.delta.json.gz) and every
+# CHECKPOINT_INTERVAL runs a full base ({ts}.ndjson.gz) is written. A delta
+# holds:
+#   delta_of: timestamp of the snapshot it applies to
+#   depth:    number of deltas since the last full base (bounds reconstruction)
+#   keys:     record keys of the new snapshot, in order
+#   new:      {key: record} for records that are new or not patchable
+#   patch:    {key: {"set": {field: value}, "unset": [field, ...]}} for changed records
+# Records that did not change are not stored at all.
+
+DELTA_EXT = snapshots.DELTA_EXT
+
+# Full base every N runs; reconstruction reads at most N files.
+CHECKPOINT_INTERVAL = 7
+
+# Identity fields tried in order (normalized jobs first, then raw ATS payloads)
+ID_FIELDS = ("job_key", "id", "job_id", "jobId", "externalPath", "req_id", "url", "absolute_url", "hostedUrl")
+
+
+def _record_key(record: Any) -> Optional[str]:
+    if not isinstance(record, dict):
+        return None
+    for field in ID_FIELDS:
+        val = record.get(field)
+        if val not in (None, ""):
+            return f"{field}:{val}"
+    return None
+
+
+def _keyed(records: List[Any]) -> Optional[Dict[str, Any]]:
+    """Maps key -> record, or None if any record lacks a key or keys collide."""
+    out: Dict[str, Any] = {}
+    for rec in records:
+        k = _record_key(rec)
+        if k is None or k in out:
+            return None
+        out[k] = rec
+    return out
+
+
+def compute_delta(prev: List[Any], curr: List[Any]) -> Optional[Dict[str, Any]]:
+    """Delta that turns `prev` into `curr`, or None when either side cannot be keyed."""
+    if not isinstance(prev, list) or not isinstance(curr, list):
+        return None
+    prev_map = _keyed(prev)
+    curr_map = _keyed(curr)
+    if prev_map is None or curr_map is None:
+        return None
+
+    new: Dict[str, Any] = {}
+    patch: Dict[str, Dict[str, Any]] = {}
+    for k, rec in curr_map.items():
+        old = prev_map.get(k)
+        if old is None:
+            new[k] = rec
+            continue
+        if old == rec:
+            continue
+        changed = {f: v for f, v in rec.items() if f not in old or old[f] != v}
+        removed = [f for f in old if f not in rec]
+        p: Dict[str, Any] = {}
+        if changed:
+            p["set"] = changed
+        if removed:
+            p["unset"] = removed
+        patch[k] = p
+
+    return {"keys": list(curr_map.keys()), "new": new, "patch": patch}
+
+
+def apply_delta(prev: List[Any], delta: Dict[str, Any]) -> List[Any]:
+    prev_map = {_record_key(rec): rec for rec in prev}
+    new = delta.get("new", {})
+    patch = delta.get("patch", {})
+    out = []
+    for k in delta["keys"]:
+        if k in new:
+            out.append(new[k])
+        elif k in patch:
+            rec = dict(prev_map[k])
+            rec.update(patch[k].get("set", {}))
+            for f in patch[k].get("unset", []):
+                rec.pop(f, None)
+            out.append(rec)
+        else:
+            out.append(prev_map[k])
+    return out
+
+
+def _previous_path(directory: str, ts: str) -> Optional[str]:
+    files = snapshots.list_files(directory)
+    older = [t for t in files if t < ts]
+    return files[max(older)] if older else None
+
+
+def _is_delta(path: str) -> bool:
+    return snapshots.split_ext(path)[1] == DELTA_EXT
+
+
+def load_with_depth(path: str) -> Tuple[Any, int]:
+    """Reconstructs the snapshot at `path`. Returns (records, delta depth)."""
+    chain = []
+    cursor = path
+    while _is_delta(cursor):
+        delta = snapshots.load_raw(cursor)
+        chain.append(delta)
+        if len(chain) > 10 * CHECKPOINT_INTERVAL:
+            raise ValueError(f"Delta chain too long at {path}")
+        base = snapshots.find_sibling(cursor, delta["delta_of"])
+        if base is None:
+            raise FileNotFoundError(f"Missing base snapshot {delta['delta_of']} for {cursor}")
+        cursor = base
+
+    data = snapshots.load_raw(cursor)
+    for delta in reversed(chain):
+        data = apply_delta(data, delta)
+    return data, (chain[0].get("depth", len(chain)) if chain else 0)
+
+
+def load_snapshot(path: str) -> Any:
+    return load_with_depth(path)[0]
+
+
+def materialize(path: str) -> Tuple[str, str]:
+    """Rewrites the delta snapshot at `path` as a self-contained full base. Returns (new path, sha256)."""
+    data = load_snapshot(path)
+    full_path = snapshots.split_ext(path)[0] + snapshots.SNAPSHOT_EXT
+    digest = snapshots.save(data, full_path)
+    os.remove(path)
+    return full_path, digest
+
+
+def _write(data: Any, directory: str, ts: str, prev_ts: Optional[str], prev_data: Any, prev_depth: int) -> Tuple[str, str, int]:
+    """Writes run `ts` as a delta against (prev_ts, prev_data) or as a full base. Returns (path, sha256, depth)."""
+    delta = None
+    if prev_ts is not None and isinstance(data, list) and prev_depth + 1 < CHECKPOINT_INTERVAL:
+        delta = compute_delta(prev_data, data)
+
+    if delta is None:
+        full_path = os.path.join(directory, ts + snapshots.SNAPSHOT_EXT)
+        return full_path, snapshots.save(data, full_path), 0
+
+    delta["delta_of"] = prev_ts
+    delta["depth"] = prev_depth + 1
+    delta_path = os.path.join(directory, ts + DELTA_EXT)
+    return delta_path, snapshots.save(delta, delta_path), delta["depth"]
+
+
+def save_snapshot(data: Any, directory: str, ts: str, *, full: bool = False) -> Tuple[str, str]:
+    """
+    Writes the snapshot for run `ts` into `directory` as a delta against the
+    previous run when possible, else as a full base. Returns (path, sha256).
+    With `full`, always writes a base without reading the previous run (huge
+    boards: keeps memory flat here and lets the next diff stream this file).
+    """
+    prev_ts = prev_data = None
+    prev_depth = 0
+    prev_path = None if full else _previous_path(directory, ts)
+    if prev_path is not None:
+        try:
+            prev_data, prev_depth = load_with_depth(prev_path)
+            prev_ts = snapshots.timestamp_from_path(prev_path)
+        except Exception:
+            prev_ts = None
+
+    path, digest, _ = _write(data, directory, ts, prev_ts, prev_data, prev_depth)
+    return path, digest
+
+
+def iter_snapshots(directory: str, include_archived: bool = True) -> Iterator[Tuple[str, str, Any]]:
+    """
+    Yields (ts, path, records) for every snapshot in `directory` (archived runs
+    included unless `include_archived` is False), oldest first. Sequential replay applies each delta to the
+    previously yielded snapshot, so a full history replay costs one file read
+    per run. Unreadable files are skipped.
+    """
+    prev_ts = None
+    prev_data = None
+    for path in snapshots.sorted_paths(directory, include_archived):
+        ts = snapshots.timestamp_from_path(path)
+        try:
+            if _is_delta(path):
+                delta = snapshots.load_raw(path)
+                if prev_data is not None and delta.get("delta_of") == prev_ts:
+                    data = apply_delta(prev_data, delta)
+                else:
+                    data = load_snapshot(path)
+            else:
+                data = snapshots.load_raw(path)
+        except Exception as e:
+            logging.warning(f"Skipping unreadable snapshot {path}: {e}")
+            continue
+        yield ts, path, data
+        prev_ts, prev_data = ts, data
+
+
+def rebase_directory(directory: str) -> Tuple[int, int]:
+    """
+    Rewrites every snapshot in `directory` as base + deltas (one-shot migration
+    of existing history), one run at a time. Returns (bytes_before, bytes_after).
+    """
+    before = sum(os.path.getsize(p) for p in snapshots.sorted_paths(directory))
+    after = 0
+
+    prev_ts = prev_data = None
+    depth = 0
+    for ts, old_path, data in iter_snapshots(directory, include_archived=False):
+        path, _, depth = _write(data, directory, ts, prev_ts, prev_data, depth)
+        if os.path.abspath(path) != os.path.abspath(old_path):
+            os.remove(old_path)
+        after += os.path.getsize(path)
+        prev_ts, prev_data = ts, data
+
+    return before, after
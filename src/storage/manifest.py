@@ -0,0 +1,198 @@
+import hashlib
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from src.news.models import get_connection
+
+# ---------------------------------------------------------------------------
+# Snapshot manifest
+# ---------------------------------------------------------------------------
+# Every raw/filtered snapshot and diff written under data/ gets one row in
+# `snapshot_manifest` (see src.news.models.init_db). "Previous", "latest" and
+# "by date" lookups become primary-key range queries instead of globbing and
+# sorting ever-growing directories.
+
+KINDS = ("raw", "filtered", "diff")
+
+_COLUMNS = ["company_slug", "ats", "run_timestamp", "kind", "path", "job_count", "content_hash", "created_at"]
+
+
+def content_hash(payload: bytes) -> str:
+    """sha256 of the bytes as written; these depend on the JSON backend (see serialization)."""
+    return hashlib.sha256(payload).hexdigest()
+
+
+def file_hash(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _norm_path(path: str) -> str:
+    return path.replace(os.sep, "/")
+
+
+def record(
+    company_slug: str,
+    ats: str,
+    run_timestamp: str,
+    kind: str,
+    path: str,
+    job_count: int,
+    digest: Optional[str] = None,
+    *,
+    conn=None,
+) -> None:
+    """
+    Upserts the manifest row for a file that was just written.
+    `digest` defaults to hashing the file on disk.
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Unknown manifest kind: {kind}")
+
+    close_conn = False
+    if conn is None:
+        conn = get_connection()
+        close_conn = True
+    try:
+        if digest is None:
+            digest = file_hash(path)
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO snapshot_manifest
+                (company_slug, ats, run_timestamp, kind, path, job_count, content_hash, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (company_slug, ats, run_timestamp, kind, _norm_path(path), int(job_count), digest, datetime.utcnow().isoformat()),
+        )
+        if close_conn:
+            conn.commit()
+    finally:
+        if close_conn:
+            conn.close()
+
+
+def update_path(
+    company_slug: str,
+    kind: str,
+    run_timestamp: str,
+    path: str,
+    digest: Optional[str] = None,
+    *,
+    conn=None,
+) -> None:
+    """Repoints an existing row at a moved file (e.g. rolled into an archive). Keeps the hash unless `digest` is given."""
+    close_conn = False
+    if conn is None:
+        conn = get_connection()
+        close_conn = True
+    try:
+        conn.execute(
+            """
+            UPDATE snapshot_manifest
+            SET path=?, content_hash=COALESCE(?, content_hash)
+            WHERE company_slug=? AND kind=? AND run_timestamp=?
+            """,
+            (_norm_path(path), digest, company_slug, kind, run_timestamp),
+        )
+        if close_conn:
+            conn.commit()
+    finally:
+        if close_conn:
+            conn.close()
+
+
+def mark_complete(*, conn=None) -> None:
+    """Records that every file on disk has been indexed (files written since are recorded as they land)."""
+    close_conn = False
+    if conn is None:
+        conn = get_connection()
+        close_conn = True
+    try:
+        conn.execute(
+            "INSERT OR REPLACE INTO snapshot_manifest_state (name, value) VALUES ('indexed_at', ?)",
+            (datetime.utcnow().isoformat(),),
+        )
+        if close_conn:
+            conn.commit()
+    finally:
+        if close_conn:
+            conn.close()
+
+
+def _query_one(sql: str, params) -> Optional[Dict[str, Any]]:
+    conn = get_connection()
+    try:
+        row = conn.execute(sql, params).fetchone()
+    except Exception as e:
+        # Manifest is an index, never the source of truth: callers fall back to the filesystem.
+        logging.warning(f"Manifest lookup failed: {e}")
+        return None
+    finally:
+        conn.close()
+    return dict(zip(_COLUMNS, row)) if row else None
+
+
+def get_previous(company_slug: str, kind: str, before_ts: str) -> Optional[Dict[str, Any]]:
+    """Most recent entry strictly before `before_ts`."""
+    return _query_one(
+        f"""
+        SELECT {", ".join(_COLUMNS)}
+        FROM snapshot_manifest
+        WHERE company_slug=? AND kind=? AND run_timestamp < ?
+        ORDER BY run_timestamp DESC
+        LIMIT 1
+        """,
+        (company_slug, kind, before_ts),
+    )
+
+
+def get_latest(company_slug: str, kind: str) -> Optional[Dict[str, Any]]:
+    return _query_one(
+        f"""
+        SELECT {", ".join(_COLUMNS)}
+        FROM snapshot_manifest
+        WHERE company_slug=? AND kind=?
+        ORDER BY run_timestamp DESC
+        LIMIT 1
+        """,
+        (company_slug, kind),
+    )
+
+
+def get_by_date(company_slug: str, kind: str, date_str: str) -> Optional[Dict[str, Any]]:
+    """Latest entry whose run timestamp falls on `date_str` (YYYY-MM-DD)."""
+    return _query_one(
+        f"""
+        SELECT {", ".join(_COLUMNS)}
+        FROM snapshot_manifest
+        WHERE company_slug=? AND kind=? AND run_timestamp >= ? AND run_timestamp < ?
+        ORDER BY run_timestamp DESC
+        LIMIT 1
+        """,
+        (company_slug, kind, f"{date_str}T", f"{date_str}U"),
+    )
+
+
+def list_entries(company_slug: str, kind: str) -> List[Dict[str, Any]]:
+    conn = get_connection()
+    try:
+        rows = conn.execute(
+            f"""
+            SELECT {", ".join(_COLUMNS)}
+            FROM snapshot_manifest
+            WHERE company_slug=? AND kind=?
+            ORDER BY run_timestamp ASC
+            """,
+            (company_slug, kind),
+        ).fetchall()
+    except Exception as e:
+        logging.warning(f"Manifest lookup failed: {e}")
+        return []
+    finally:
+        conn.close()
+    return [dict(zip(_COLUMNS, r)) for r in rows]
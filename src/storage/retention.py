@@ -0,0 +1,209 @@
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config import RETENTION_POLICY
+from src.news.models import get_connection
+from src.storage import archive, history, manifest, snapshots
+
+# ---------------------------------------------------------------------------
+# Snapshot retention
+# ---------------------------------------------------------------------------
+# Keeps the last `hot_days` (and at least `keep_min`) runs of every company as
+# individual files and rolls older runs into monthly archives (see
+# src.storage.archive). Archived runs stay readable through snapshots.load()
+# and history.iter_snapshots(), so the analytics backfill still sees them.
+#
+# Safety rules:
+# - A run is only archived once the analytics tables have consumed it
+#   (filtered -> company_open_now_daily, diff -> job_diffs_daily); newer runs
+#   are refused and reported, since the lifecycle backfill has not seen them.
+# - The newest run always stays hot (the next pipeline run diffs against it).
+# - Delta chains never cross the hot/archive boundary or two archives: a delta
+#   whose base leaves its file set is rewritten as a full base first.
+
+DATA_ROOTS = {
+    "raw": "data/raw",
+    "filtered": "data/filtered",
+    "diff": "data/diffs",
+}
+
+# Analytics table whose run_timestamp marks how far each kind has been consumed
+CONSUMED_BY = {
+    "filtered": "company_open_now_daily",
+    "diff": "job_diffs_daily",
+}
+
+TS_FORMAT = "%Y-%m-%dT%H-%M-%SZ"
+
+
+def consumed_through(conn, kind: str, company_slug: str) -> Optional[str]:
+    """
+    Latest run timestamp of `kind` already folded into the analytics tables.
+    None means no guard applies (raw); "" means nothing has been consumed yet.
+    """
+    table = CONSUMED_BY.get(kind)
+    if table is None:
+        return None
+    row = conn.execute(
+        f"SELECT MAX(run_timestamp) FROM {table} WHERE company_slug=?",
+        (company_slug,),
+    ).fetchone()
+    return (row[0] if row else None) or ""
+
+
+def plan_directory(
+    directory: str,
+    policy: Dict[str, int],
+    now: datetime,
+    consumed: Optional[str],
+) -> Tuple[List[str], List[str]]:
+    """
+    Splits the hot files of one company directory into (to_archive, refused).
+    Both are oldest-first prefixes of the hot history.
+    """
+    files = snapshots.list_files(directory)
+    ordered = [ts for ts in sorted(files) if len(ts) >= 15]
+    keep_min = max(1, int(policy.get("keep_min", 1)))
+    cutoff = (now - timedelta(days=int(policy["hot_days"]))).strftime(TS_FORMAT)
+
+    candidates = [ts for ts in ordered[: max(0, len(ordered) - keep_min)] if ts < cutoff]
+    to_archive = [files[ts] for ts in candidates if consumed is None or ts <= consumed]
+    refused = [files[ts] for ts in candidates if consumed is not None and ts > consumed]
+    return to_archive, refused
+
+
+def _archive_entries(paths: List[str], kind: str) -> Dict[str, List[Tuple[str, str, str, bytes, bool]]]:
+    """
+    Groups files by month into {zip month: [(ts, old_path, member, payload, rewritten)]}.
+    Deltas whose base is not in the same archive are rewritten as full bases.
+    """
+    directory = os.path.dirname(paths[0])
+    by_month: Dict[str, List[Tuple[str, str, str, bytes, bool]]] = {}
+    for path in paths:
+        ts = snapshots.timestamp_from_path(path)
+        month = ts[:7]
+        entries = by_month.setdefault(month, [])
+        zip_path = archive.archive_path(directory, month)
+        member = os.path.basename(path)
+        payload = snapshots.read_bytes(path)
+        rewritten = False
+
+        if kind != "diff" and snapshots.split_ext(path)[1] == snapshots.DELTA_EXT:
+            base_ts = snapshots.decode(payload, path).get("delta_of")
+            in_batch = any(e[0] == base_ts for e in entries)
+            in_archive = archive.find_member(zip_path, base_ts, snapshots.KNOWN_EXTS) is not None
+            if not (in_batch or in_archive):
+                member = ts + snapshots.SNAPSHOT_EXT
+                payload = snapshots.encode(history.load_snapshot(path), member)
+                rewritten = True
+
+        entries.append((ts, path, member, payload, rewritten))
+    return by_month
+
+
+def compact_directory(
+    directory: str,
+    kind: str,
+    paths: List[str],
+    *,
+    conn=None,
+    dry_run: bool = False,
+) -> Dict[str, int]:
+    """Rolls `paths` (hot files of one company directory) into monthly archives."""
+    stats = {"archived": 0, "rewritten": 0, "bytes": 0}
+    if not paths:
+        return stats
+    company_slug = os.path.basename(os.path.normpath(directory))
+    stats["bytes"] = sum(os.path.getsize(p) for p in paths)
+
+    by_month = _archive_entries(paths, kind)
+    if dry_run:
+        stats["archived"] = len(paths)
+        stats["rewritten"] = sum(1 for entries in by_month.values() for e in entries if e[4])
+        return stats
+
+    # The first run left hot must not be a delta against a run that is leaving
+    if kind != "diff":
+        archived = set(paths)
+        remaining = [p for p in snapshots.sorted_paths(directory) if p not in archived]
+        if remaining and snapshots.split_ext(remaining[0])[1] == snapshots.DELTA_EXT:
+            head_ts = snapshots.timestamp_from_path(remaining[0])
+            head_path, head_hash = history.materialize(remaining[0])
+            manifest.update_path(company_slug, kind, head_ts, head_path, head_hash, conn=conn)
+            stats["rewritten"] += 1
+
+    for month, entries in sorted(by_month.items()):
+        zip_path = archive.archive_path(directory, month)
+        archive.add(zip_path, {member: payload for _, _, member, payload, _ in entries})
+
+        for ts, old_path, member, payload, rewritten in entries:
+            new_path = archive.member_path(zip_path, member)
+            if archive.read_bytes(new_path) != payload:
+                raise IOError(f"Archive verification failed for {new_path}")
+            digest = manifest.content_hash(payload) if rewritten else None
+            manifest.update_path(company_slug, kind, ts, new_path, digest, conn=conn)
+            os.remove(old_path)
+            stats["archived"] += 1
+            stats["rewritten"] += int(rewritten)
+        if conn is not None:
+            conn.commit()
+
+    return stats
+
+
+def _company_dirs(root: str):
+    if not os.path.isdir(root):
+        return
+    for ats in sorted(os.listdir(root)):
+        ats_dir = os.path.join(root, ats)
+        if not os.path.isdir(ats_dir):
+            continue
+        for slug in sorted(os.listdir(ats_dir)):
+            slug_dir = os.path.join(ats_dir, slug)
+            if os.path.isdir(slug_dir):
+                yield slug, slug_dir
+
+
+def apply_retention(
+    policy: Optional[Dict[str, Dict[str, int]]] = None,
+    *,
+    now: Optional[datetime] = None,
+    dry_run: bool = False,
+    roots: Optional[Dict[str, str]] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Applies the retention policy to every company under data/. Returns per-kind
+    totals: archived files, rewritten deltas, bytes moved and refused files.
+    """
+    policy = policy or RETENTION_POLICY
+    roots = roots or DATA_ROOTS
+    now = now or datetime.utcnow()
+
+    totals: Dict[str, Dict[str, Any]] = {}
+    conn = get_connection()
+    try:
+        for kind, root in roots.items():
+            if kind not in policy:
+                continue
+            kind_totals = {"archived": 0, "rewritten": 0, "bytes": 0, "refused": 0}
+            for slug, slug_dir in _company_dirs(root):
+                consumed = consumed_through(conn, kind, slug)
+                to_archive, refused = plan_directory(slug_dir, policy[kind], now, consumed)
+                if refused:
+                    print(
+                        f"Refusing to archive {len(refused)} {kind} runs of {slug}: "
+                        f"not yet synced into {CONSUMED_BY[kind]} (synced through {consumed or 'nothing'})"
+                    )
+                    kind_totals["refused"] += len(refused)
+                try:
+                    stats = compact_directory(slug_dir, kind, to_archive, conn=conn, dry_run=dry_run)
+                except Exception as e:
+                    print(f"Failed to archive {slug_dir}: {e}")
+                    continue
+                for k, v in stats.items():
+                    kind_totals[k] += v
+            totals[kind] = kind_totals
+    finally:
+        conn.close()
+    return totals
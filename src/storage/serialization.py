@@ -0,0 +1,96 @@
+import json
+import os
+from typing import Any, Iterable, Union
+
+# ---------------------------------------------------------------------------
+# JSON serialization backend
+# ---------------------------------------------------------------------------
+# All snapshot/diff (de)serialization goes through dumps()/loads() here. The
+# fastest installed backend is picked at import time (orjson, then msgspec,
+# then the stdlib); set JSON_BACKEND=orjson|msgspec|json to force one.
+# Output is compact UTF-8 bytes unless indent=True. If a fast backend rejects
+# a value (e.g. non-string dict keys, ints beyond 64 bits), that call falls
+# back to the stdlib so behaviour never depends on what is installed.
+# (One known difference: orjson decodes integers beyond 64 bits as floats; ATS ids
+# are far below that.)
+# Decoded values are the same on every backend, but the encoded bytes are not
+# (float formatting, escaping and indentation differ), so the manifest's content
+# hashes are only comparable between files written by the same backend.
+
+try:
+    import orjson
+except ImportError:  # optional
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # optional
+    msgspec = None
+
+BACKENDS = ("orjson", "msgspec", "json")
+
+# Raised by fast backends for values they do not support; retried with the stdlib
+_FALLBACK_ERRORS = (TypeError, ValueError, OverflowError) + ((msgspec.EncodeError,) if msgspec is not None else ())
+
+
+def _available(name: str) -> bool:
+    return name == "json" or (name == "orjson" and orjson is not None) or (name == "msgspec" and msgspec is not None)
+
+
+def _pick_backend() -> str:
+    forced = os.getenv("JSON_BACKEND", "").strip().lower()
+    if forced:
+        if forced not in BACKENDS or not _available(forced):
+            raise ValueError(f"JSON_BACKEND={forced} is not available (installed: {available_backends()})")
+        return forced
+    return next(name for name in BACKENDS if _available(name))
+
+
+def available_backends():
+    return [name for name in BACKENDS if _available(name)]
+
+
+BACKEND = _pick_backend()
+
+
+def set_backend(name: str) -> None:
+    """Switches the backend at runtime (benchmarks/tests)."""
+    global BACKEND
+    if name not in BACKENDS or not _available(name):
+        raise ValueError(f"JSON backend {name} is not available (installed: {available_backends()})")
+    BACKEND = name
+
+
+def _stdlib_dumps(obj: Any, indent: bool) -> bytes:
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def dumps(obj: Any, *, indent: bool = False) -> bytes:
+    """Serializes obj to UTF-8 JSON bytes (compact unless `indent`)."""
+    try:
+        if BACKEND == "orjson":
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+        if BACKEND == "msgspec":
+            out = msgspec.json.encode(obj)
+            return msgspec.json.format(out, indent=2) if indent else out
+    except _FALLBACK_ERRORS:
+        pass
+    return _stdlib_dumps(obj, indent)
+
+
+def dumps_lines(items: Iterable[Any]) -> bytes:
+    """NDJSON: one compact JSON document per line (strings never contain raw newlines)."""
+    return b"".join(dumps(item) + b"\n" for item in items)
+
+
+def loads(data: Union[bytes, bytearray, str]) -> Any:
+    try:
+        if BACKEND == "orjson":
+            return orjson.loads(data)
+        if BACKEND == "msgspec":
+            return msgspec.json.decode(data)
+    except _FALLBACK_ERRORS + ((msgspec.DecodeError,) if msgspec is not None else ()):
+        pass
+    return json.loads(data)
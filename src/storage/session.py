@@ -0,0 +1,95 @@
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+from src.news.models import get_connection
+
+# ---------------------------------------------------------------------------
+# Run-scoped database session
+# ---------------------------------------------------------------------------
+# One connection (tuned by models.PRAGMAS) is shared by the whole run instead of
+# every sync helper opening, committing and closing its own. Statements are
+# compiled once into the connection's statement cache and reused for every
+# company. Writes are grouped into units of work:
+#   - unit(label): BEGIN ... COMMIT, so each company commits exactly once
+#   - step(name): a SAVEPOINT inside a unit; a failing step rolls back only its
+#     own writes and re-raises, so the caller can log it and carry on
+# Helpers that take `conn=` join the open unit and never commit themselves.
+# Outside a unit the connection is in autocommit mode (reads only, by convention).
+
+
+class RunSession:
+    def __init__(self):
+        self.conn = get_connection()
+        self.conn.isolation_level = None  # transactions are explicit (unit/step)
+        self._closed = False
+        self._savepoints = 0
+        self.stats: Dict[str, float] = {
+            "units": 0,
+            "commits": 0,
+            "rollbacks": 0,
+            "failed_steps": 0,
+            "unit_seconds": 0.0,  # wall time inside units, commits included
+            "commit_seconds": 0.0,
+        }
+        self.step_seconds: Dict[str, float] = {}
+
+    @contextmanager
+    def unit(self, label: str = "") -> Iterator[Any]:
+        """One transaction: everything written inside commits once, or not at all."""
+        t0 = time.perf_counter()
+        self.conn.execute("BEGIN")
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.rollback()
+            self.stats["rollbacks"] += 1
+            raise
+        else:
+            t1 = time.perf_counter()
+            self.conn.commit()
+            self.stats["commits"] += 1
+            self.stats["commit_seconds"] += time.perf_counter() - t1
+        finally:
+            self.stats["units"] += 1
+            self.stats["unit_seconds"] += time.perf_counter() - t0
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[Any]:
+        """Savepoint within the current unit; timed under `name`."""
+        self._savepoints += 1
+        sp = f"sp_{self._savepoints}"
+        t0 = time.perf_counter()
+        self.conn.execute(f"SAVEPOINT {sp}")
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute(f"ROLLBACK TO {sp}")
+            self.conn.execute(f"RELEASE {sp}")
+            self.stats["failed_steps"] += 1
+            raise
+        else:
+            self.conn.execute(f"RELEASE {sp}")
+        finally:
+            self.step_seconds[name] = self.step_seconds.get(name, 0.0) + time.perf_counter() - t0
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self.conn.close()
+
+    def __enter__(self) -> "RunSession":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def summary(self) -> str:
+        s = self.stats
+        steps = ", ".join(f"{name} {secs:.2f}s" for name, secs in sorted(self.step_seconds.items()))
+        return (
+            f"db session: {int(s['commits'])}/{int(s['units'])} units committed, {int(s['rollbacks'])} rolled back, "
+            f"{int(s['failed_steps'])} failed steps, unit time {s['unit_seconds']:.2f}s "
+            f"(commit {s['commit_seconds']:.2f}s)" + (f"; steps: {steps}" if steps else "")
+        )
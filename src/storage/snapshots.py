@@ -0,0 +1,227 @@
+import gzip
+import hashlib
+import os
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional
+
+from src.storage import archive, serialization
+
+# ---------------------------------------------------------------------------
+# Snapshot / diff file encoding
+# ---------------------------------------------------------------------------
+# New files are written compactly and gzip-compressed:
+#   - snapshots (lists of jobs): NDJSON, one job per line  -> {ts}.ndjson.gz
+#   - diffs (single object):     compact JSON              -> jobs_diff_{slug}_{ts}.json.gz
+#   - delta snapshots (see src.storage.history)           -> {ts}.delta.json.gz
+# Legacy pretty-printed .json files remain readable; every reader goes through
+# load() so the on-disk encoding is transparent. The same holds for files rolled
+# into monthly archives ("{zip}!{member}" paths, see src.storage.archive).
+
+SNAPSHOT_EXT = ".ndjson.gz"
+DIFF_EXT = ".json.gz"
+DELTA_EXT = ".delta.json.gz"
+
+# Longest first so ".json.gz" is not mistaken for ".json"
+KNOWN_EXTS = (".delta.json.gz", ".ndjson.gz", ".json.gz", ".ndjson", ".json")
+
+# When one timestamp exists in several encodings, prefer self-contained compressed files
+_PREFERENCE = (".ndjson.gz", ".json.gz", ".delta.json.gz", ".ndjson", ".json")
+
+COMPRESS_LEVEL = 6
+
+
+def split_ext(path: str):
+    """Returns (path_without_ext, ext) for known snapshot/diff encodings, else (path, "")."""
+    for ext in KNOWN_EXTS:
+        if path.endswith(ext):
+            return path[: -len(ext)], ext
+    return path, ""
+
+
+def is_data_file(filename: str) -> bool:
+    return split_ext(filename)[1] != ""
+
+
+def timestamp_from_path(path: str) -> str:
+    """
+    Run timestamp encoded in a snapshot or diff filename.
+    Snapshots: {ts}.<ext>, diffs: jobs_diff_{slug}_{ts}.<ext>
+    """
+    name = os.path.basename(path).split(archive.MEMBER_SEP)[-1]
+    stem = split_ext(name)[0]
+    return stem.split("_")[-1]
+
+
+def encode(data: Any, path: str) -> bytes:
+    """Serializes `data` to the bytes that save() would write for `path`."""
+    ext = split_ext(path)[1]
+    if ext in (".ndjson.gz", ".ndjson") and isinstance(data, list):
+        payload = serialization.dumps_lines(data)
+    elif ext == ".json":
+        payload = serialization.dumps(data, indent=True)
+    else:
+        payload = serialization.dumps(data)
+    if ext.endswith(".gz"):
+        # mtime=0 keeps output deterministic so content hashes are stable
+        payload = gzip.compress(payload, compresslevel=COMPRESS_LEVEL, mtime=0)
+    return payload
+
+
+def decode(payload: bytes, path: str) -> Any:
+    ext = split_ext(path)[1]
+    if ext.endswith(".gz"):
+        payload = gzip.decompress(payload)
+    if ext in (".ndjson.gz", ".ndjson"):
+        # JSON escapes newlines inside strings, so each line is one record:
+        # parse the whole file as a single array instead of one loads() per line.
+        body = payload.strip().replace(b"\n", b",")
+        try:
+            return serialization.loads(b"[" + body + b"]")
+        except ValueError:
+            return [serialization.loads(line) for line in payload.splitlines() if line.strip()]
+    return serialization.loads(payload)
+
+
+def save(data: Any, path: str) -> str:
+    """
+    Writes data to path (encoding picked from the extension). Returns sha256 of the bytes written.
+    Written to a temp file and renamed, so readers never see a partial file.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    payload = encode(data, path)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+    return hashlib.sha256(payload).hexdigest()
+
+
+@contextmanager
+def open_atomic(path: str) -> Iterator[BinaryIO]:
+    """
+    Binary writer for incremental (streamed) output to `path`: gzip'd when the
+    extension ends in .gz (same settings as save()), written to a temp file and
+    renamed into place on success.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as raw:
+            if split_ext(path)[1].endswith(".gz"):
+                with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=COMPRESS_LEVEL, mtime=0) as gz:
+                    yield gz
+            else:
+                yield raw
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_raw(path: str) -> Any:
+    """Decodes a single file as stored (delta files are returned as the delta object)."""
+    if archive.is_archived(path):
+        return decode(archive.read_bytes(path), path)
+    with open(path, "rb") as f:
+        return decode(f.read(), path)
+
+
+def read_bytes(path: str) -> bytes:
+    if archive.is_archived(path):
+        return archive.read_bytes(path)
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def exists(path: str) -> bool:
+    """os.path.exists that also understands archived paths."""
+    return archive.exists(path)
+
+
+def load(path: str) -> Any:
+    """Reads a snapshot or diff in any supported encoding, reconstructing delta snapshots."""
+    if split_ext(path)[1] == DELTA_EXT:
+        from src.storage import history
+        return history.load_snapshot(path)
+    return load_raw(path)
+
+
+def iter_records(path: str) -> Iterator[Any]:
+    """
+    Streams a snapshot's records one line at a time (hot NDJSON files, so memory
+    does not grow with the snapshot). Other encodings (legacy JSON, deltas,
+    archived members) are loaded whole; a non-list file yields nothing.
+    """
+    ext = split_ext(path)[1]
+    if ext in (".ndjson.gz", ".ndjson") and not archive.is_archived(path):
+        with (gzip.open(path, "rb") if ext.endswith(".gz") else open(path, "rb")) as f:
+            for line in f:
+                if line.strip():
+                    yield serialization.loads(line)
+        return
+    data = load(path)
+    if isinstance(data, list):
+        yield from data
+
+
+def _add_preferred(out: Dict[str, str], filename: str, path: str) -> None:
+    ext = split_ext(filename)[1]
+    if not ext:
+        return
+    ts = timestamp_from_path(filename)
+    prev = out.get(ts)
+    if prev is None or _PREFERENCE.index(ext) < _PREFERENCE.index(split_ext(prev)[1]):
+        out[ts] = path
+
+
+def list_files(directory: str, include_archived: bool = False) -> Dict[str, str]:
+    """
+    Maps run timestamp -> path for every snapshot/diff file in `directory`.
+    If the same timestamp exists in several encodings (mid-conversion), the
+    self-contained compressed one wins. With `include_archived`, files rolled
+    into monthly archives are included too (a hot file wins over an archived one).
+    """
+    out: Dict[str, str] = {}
+    if not os.path.isdir(directory):
+        return out
+    if include_archived:
+        for member, path in archive.list_archived(directory).items():
+            _add_preferred(out, member, path)
+    hot: Dict[str, str] = {}
+    for filename in os.listdir(directory):
+        _add_preferred(hot, filename, os.path.join(directory, filename))
+    out.update(hot)
+    return out
+
+
+def find_file(directory: str, stem: str) -> Optional[str]:
+    """Path of `{directory}/{stem}<ext>` in whichever encoding exists, else None."""
+    for ext in _PREFERENCE:
+        path = os.path.join(directory, stem + ext)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def find_sibling(path: str, stem: str) -> Optional[str]:
+    """
+    Path of `{stem}<ext>` next to `path`: inside the same archive for archived
+    paths, else in the company directory (hot files first, then archives).
+    """
+    if archive.is_archived(path):
+        found = archive.find_member(archive.split(path)[0], stem, _PREFERENCE)
+        if found is not None:
+            return found
+        directory = archive.company_dir(path)
+    else:
+        directory = os.path.dirname(path)
+    found = find_file(directory, stem)
+    if found is None:
+        found = list_files(directory, include_archived=True).get(timestamp_from_path(stem))
+    return found
+
+
+def sorted_paths(directory: str, include_archived: bool = False) -> List[str]:
+    """Snapshot/diff paths in `directory`, oldest first."""
+    files = list_files(directory, include_archived)
+    return [files[ts] for ts in sorted(files)]
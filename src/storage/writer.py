@@ -0,0 +1,100 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict
+
+# ---------------------------------------------------------------------------
+# Write-behind snapshot writer
+# ---------------------------------------------------------------------------
+# The job pipeline hands finished snapshots/diffs to a single background
+# thread and moves on to the next company's fetch. Serialization, delta
+# computation and the (atomic temp-file + rename) write happen on the writer
+# thread, in submission order. The queue is bounded, so a slow disk throttles
+# the pipeline instead of buffering every company's raw payload in memory.
+# Call flush() as a barrier before anything that must see the files on disk.
+
+DEFAULT_MAX_PENDING = 8
+
+_STOP = object()
+
+
+class SnapshotWriter:
+    def __init__(self, max_pending: int = DEFAULT_MAX_PENDING, name: str = "snapshot-writer"):
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._closed = False
+        self.stats: Dict[str, float] = {
+            "submitted": 0,
+            "written": 0,
+            "failed": 0,
+            "max_backlog": 0,
+            "blocked_seconds": 0.0,  # pipeline time spent waiting on a full queue
+            "write_seconds": 0.0,  # writer time spent serializing + writing
+        }
+        self._thread.start()
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """Queues fn(*args, **kwargs) on the writer thread. Blocks only while the queue is full."""
+        if self._closed:
+            raise RuntimeError("SnapshotWriter is closed")
+        future: Future = Future()
+        t0 = time.perf_counter()
+        self._queue.put((future, fn, args, kwargs))
+        self.stats["blocked_seconds"] += time.perf_counter() - t0
+        self.stats["submitted"] += 1
+        self.stats["max_backlog"] = max(self.stats["max_backlog"], self._queue.qsize())
+        return future
+
+    def backlog(self) -> int:
+        return self._queue.qsize()
+
+    def flush(self) -> None:
+        """Barrier: returns once every submitted write has finished (successfully or not)."""
+        self._queue.join()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def __enter__(self) -> "SnapshotWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                future, fn, args, kwargs = item
+                if not future.set_running_or_notify_cancel():
+                    continue
+                t0 = time.perf_counter()
+                try:
+                    result = fn(*args, **kwargs)
+                except BaseException as e:
+                    self.stats["failed"] += 1
+                    logging.getLogger("jobs").error(f"Background write failed: {e}")
+                    future.set_exception(e)
+                else:
+                    self.stats["written"] += 1
+                    future.set_result(result)
+                finally:
+                    self.stats["write_seconds"] += time.perf_counter() - t0
+            finally:
+                self._queue.task_done()
+
+    def summary(self) -> str:
+        s = self.stats
+        return (
+            f"writer: {int(s['written'])}/{int(s['submitted'])} written, {int(s['failed'])} failed, "
+            f"max backlog {int(s['max_backlog'])}, pipeline blocked {s['blocked_seconds']:.2f}s, "
+            f"write time {s['write_seconds']:.2f}s"
+        )
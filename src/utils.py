@@ -4,7 +4,11 @@ from datetime import datetime, timedelta, timezone
 import dateutil.parser
 import logging
 import os
-from src.config import HARD_NEGATIVES, ABBREVIATIONS, ROLE_FAMILIES, SPECIAL_TOKENS
+from src import gazetteer
+from src.config import (
+    HARD_NEGATIVES, ABBREVIATIONS, ROLE_FAMILIES, SPECIAL_TOKENS,
+    DISCIPLINES, SENIORITY_LEVELS, SENIOR_PLUS_LEVELS,
+)
 
 def setup_logging(run_timestamp):
     """
@@ -69,12 +73,14 @@ def parse_location(location_name):
     """
     Parses a location string into a structured dictionary.
     Strict US detection rules applied.
+    City / state / metro are resolved from the offline US gazetteer (US locations only).
     """
     if not location_name:
         return {
             "raw": None, 
             "city": None, 
             "state": None, 
+            "metro": None,
             "country_code": None, 
             "is_us": False, 
             "is_remote": False,
@@ -151,11 +157,17 @@ def parse_location(location_name):
             if city in loc_lower:
                 is_us = True
                 break
+
+    # 4. City / state / metro facets (US only; single hash-index pass)
+    city = state = metro = None
+    if is_us:
+        city, state, metro = gazetteer.resolve(location_name)
     
     return {
         "raw": location_name,
-        "city": None,
-        "state": None,
+        "city": city,
+        "state": state,
+        "metro": metro,
         "country_code": "US" if is_us else None,
         "is_us": is_us,
         "is_remote": is_remote,
@@ -357,25 +369,75 @@ def calculate_title_score(tokens):
 
     return max_score, best_family
 
-def is_valid_job(title):
+def match_seniority(title_lower):
     """
-    Main entry point for filtering.
-    Returns True if the job title is valid/relevant.
+    Maps an already-lowercased title to a seniority level (first match wins).
+    Falls back to "Mid".
+    """
+    for level, keywords in SENIORITY_LEVELS:
+        for kw in keywords:
+            if kw in title_lower:
+                return level
+    return "Mid"
+
+def match_discipline(title_lower):
+    """
+    Maps an already-lowercased title to a discipline. Falls back to "Other".
     """
+    for disc, keywords in DISCIPLINES.items():
+        for kw in keywords:
+            if kw in title_lower:
+                return disc
+    return "Other"
+
+def classify_title(title):
+    """
+    Single-pass title classifier.
+    Lowercases + tokenizes the title once and derives every tag downstream
+    consumers need:
+    - is_relevant: passes the role-relevance filter (see is_valid_job)
+    - role_family: best matching ROLE_FAMILIES key (or None)
+    - seniority: Intern / Junior / Mid / Senior / Staff+
+    - discipline: ML / Data / Platform / Infra / Other
+    - is_senior_plus: seniority in Senior / Staff+
+    """
+    title_lower = (title or "Unknown").lower()
+    seniority = match_seniority(title_lower)
+    tags = {
+        "is_relevant": False,
+        "role_family": None,
+        "seniority": seniority,
+        "discipline": match_discipline(title_lower),
+        "is_senior_plus": seniority in SENIOR_PLUS_LEVELS,
+    }
     if not title:
-        return False
+        return tags
 
     tokens = normalize_title(title)
-    
+
     # 1. Hard negative filter
     if is_hard_negative(tokens):
-        return False
+        return tags
 
     # 2. Scoring
     score, family = calculate_title_score(tokens)
-    
+    tags["role_family"] = family
+
     # Threshold: score >= 2 means it matched a strong phrase OR (core + role)
-    if score >= 2:
-        return True
-        
-    return False
+    tags["is_relevant"] = score >= 2
+    return tags
+
+def tag_job(job):
+    """
+    Classifies job["title"] and stores the tags on the job record in place.
+    Returns the job for convenience.
+    """
+    job.update(classify_title(job.get("title")))
+    return job
+
+def is_valid_job(title):
+    """
+    Main entry point for filtering.
+    Returns True if the job title is valid/relevant.
+    """
+    return classify_title(title)["is_relevant"]
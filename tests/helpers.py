@@ -0,0 +1,22 @@
+import os
+import tempfile
+from contextlib import contextmanager
+
+from src.news import models
+
+
+@contextmanager
+def temp_db():
+    """Points get_connection() at a fresh, initialized database for the duration; yields a connection."""
+    db_path = models.DB_PATH
+    with tempfile.TemporaryDirectory() as d:
+        models.DB_PATH = os.path.join(d, "test.db")
+        conn = None
+        try:
+            models.init_db()
+            conn = models.get_connection()
+            yield conn
+        finally:
+            if conn is not None:
+                conn.close()
+            models.DB_PATH = db_path
@@ -0,0 +1,104 @@
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Ensure src is in path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.analytics.daily_sync import agg_daily_news, sync_job_diff
+from src.news.processor import NewsProcessor
+from src.utils import classify_title
+from helpers import temp_db
+
+TITLES = ["Senior Associate", "Associate Director", "Senior ML Engineer", "Staff Data Engineer", "Data Engineer"]
+
+
+def test_senior_plus_same_for_tagged_and_legacy_diffs():
+    tagged = {"added": [{"title": t, "seniority": classify_title(t)["seniority"]} for t in TITLES]}
+    legacy = {"added": [{"title": t} for t in TITLES]}
+    with temp_db() as conn:
+        sync_job_diff(tagged, "tagged", "2025-01-01T08-00-00Z", conn=conn)
+        sync_job_diff(legacy, "legacy", "2025-01-01T08-00-00Z", conn=conn)
+        counts = dict(conn.execute("SELECT company_slug, senior_plus_added_count FROM job_diffs_daily"))
+    assert counts == {"tagged": 2, "legacy": 2}, counts
+
+
+TITLES_NEWS = [
+    "Acme raises Series C funding", "Acme announces hiring freeze", "Acme beats quarterly results",
+    "Acme unveiled a new AI model", "Acme faces FTC investigation", "Acme is hiring engineers", "Acme update",
+]
+
+
+def _day(days_ago):
+    return (datetime.utcnow().date() - timedelta(days=days_ago)).isoformat()
+
+
+def _news(run, slug, days_ago, hour, n):
+    title = TITLES_NEWS[(run + n) % len(TITLES_NEWS)]
+    return {
+        "url": f"https://news.example.com/{slug}/{run}/{n}", "title": f"{title} ({run}/{n})",
+        "description": "", "publishedAt": f"{_day(days_ago)}T{hour:02d}:{n:02d}:00Z",
+    }
+
+
+def _ingest(conn, articles_by_slug):
+    processor = NewsProcessor()
+    for slug, articles in articles_by_slug.items():
+        processor.process_and_store(articles, slug, "gnews", conn=conn)
+    conn.commit()
+    return processor.touched
+
+
+def _news_daily(conn):
+    return conn.execute("SELECT * FROM company_news_daily ORDER BY company_slug, date").fetchall()
+
+
+def test_incremental_news_matches_full_rebuild():
+    with temp_db() as conn:
+        for run in range(4):
+            # Each run adds articles to recent days, some already aggregated, and one outside the window
+            touched = _ingest(conn, {
+                slug: [_news(run, slug, (run + n) % 5 + (40 if n == 6 else 0), 8 + n, n) for n in range(7 if slug == "acme" else 3)]
+                for slug in ("acme", "beta")
+            })
+            agg_daily_news(days_back=30, keys=touched)
+            incremental = _news_daily(conn)
+            assert agg_daily_news(days_back=30) == len(incremental)
+            assert _news_daily(conn) == incremental, run
+        assert _day(40) not in {r[1] for r in incremental}
+
+        # A company-day whose articles were removed (e.g. re-attributed) is dropped by both paths
+        day = _day(1)
+        conn.execute("DELETE FROM normalized_news WHERE company_slug = 'beta' AND date(published_at) = ?", (day,))
+        conn.commit()
+        agg_daily_news(days_back=30, keys={("beta", day)})
+        incremental = _news_daily(conn)
+        assert ("beta", day) not in {(r[0], r[1]) for r in incremental}
+        conn.execute("INSERT INTO company_news_daily (company_slug, date, article_count) VALUES ('gone', ?, 1)", (day,))
+        conn.commit()
+        agg_daily_news(days_back=30)
+        assert _news_daily(conn) == incremental
+
+
+def test_top_headline_is_latest_article():
+    day = _day(2)
+    articles = [
+        {"url": f"https://news.example.com/{h}", "title": f"Acme story at {h}", "description": "", "publishedAt": f"{day}T{h}:00:00Z"}
+        for h in ("09", "17", "12")
+    ]
+    with temp_db() as conn:
+        for full in (False, True):
+            conn.execute("DELETE FROM company_news_daily")
+            touched = _ingest(conn, {"acme": articles})
+            agg_daily_news(keys=None if full else touched)
+            assert conn.execute(
+                "SELECT article_count, top_headline_title, top_headline_url FROM company_news_daily WHERE company_slug = 'acme' AND date = ?", (day,)
+            ).fetchone() == (3, "Acme story at 17", "https://news.example.com/17")
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"{name:<45} | PASS")
+    print("\nAll daily sync tests passed!")
@@ -0,0 +1,58 @@
+import sys
+import os
+
+# Ensure src is in path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.jobs.dedupe import assign_clusters
+from src.analytics.intervals import sync_intervals
+from src.utils import parse_location
+from helpers import temp_db
+
+
+def _job(key, title, *locations, department=None):
+    return {"job_key": key, "title": title, "locations": [parse_location(l) for l in locations], "department": department}
+
+
+def test_same_title_in_different_cities_or_teams_are_distinct_roles():
+    jobs = [
+        _job("a1", "Senior Machine Learning Engineer", "New York, NY"),
+        _job("a2", "Senior Machine Learning Engineer", "Brooklyn, NY"),  # same metro
+        _job("b1", "Senior Machine Learning Engineer", "San Francisco, CA"),
+        _job("c1", "Senior Machine Learning Engineer", "Remote - US"),
+        _job("d1", "Data Engineer", "Seattle, WA", department="Ads"),
+        _job("d2", "Data Engineer", "Seattle, WA", department="Search"),
+    ]
+    with temp_db() as conn:
+        assert assign_clusters("acme", jobs, conn=conn, as_of_date="2025-01-01") == 5
+    clusters = {j["job_key"]: j["cluster_id"] for j in jobs}
+    assert clusters["a1"] == clusters["a2"] == "a1"
+    assert len({clusters[k] for k in ("a1", "b1", "c1", "d1", "d2")}) == 5
+
+
+def test_repost_rejoins_its_role_only_while_live():
+    with temp_db() as conn:
+        first = [_job("k1", "Staff Data Scientist", "Austin, TX")]
+        assign_clusters("acme", first, conn=conn, as_of_date="2025-01-01")
+        sync_intervals(conn, "acme", "2025-01-01", [("k1", first[0]["cluster_id"])])
+        sync_intervals(conn, "acme", "2025-01-10", [], ["k1"])
+
+        # Reposted under a new id a month after it closed: same role
+        repost = [_job("k2", "Staff Data Scientist", "Austin, TX")]
+        assign_clusters("acme", repost, conn=conn, as_of_date="2025-02-10")
+        assert repost[0]["cluster_id"] == "k1"
+        sync_intervals(conn, "acme", "2025-02-10", [("k2", "k1")])
+        sync_intervals(conn, "acme", "2025-02-20", [], ["k2"])
+
+        # A year later the title is a new role
+        later = [_job("k3", "Staff Data Scientist", "Austin, TX")]
+        assign_clusters("acme", later, conn=conn, as_of_date="2026-02-20")
+        assert later[0]["cluster_id"] == "k3"
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"{name:<45} | PASS")
+    print("\nAll dedupe tests passed!")
@@ -0,0 +1,154 @@
+import sys
+import os
+import json
+import tempfile
+
+# Ensure src is in path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.jobs import card_cache, diff
+from src.storage import history, manifest, snapshots
+from helpers import temp_db
+
+
+def _runs(n=5):
+    """
+    n runs of a board. Each run adds and drops jobs, changes fields the diff
+    compares (title, locations, status, posted_at) and fields it only carries
+    on the card (url, last_seen_at, seniority); some records lack a stored
+    fingerprint, as legacy snapshots do.
+    """
+    jobs = {}
+    out = []
+    for run in range(n):
+        for i in range(run * 4, run * 4 + 12):
+            jobs.setdefault(i, {
+                "job_key": f"k{i:03d}", "title": f"Engineer {i}", "status": "open",
+                "locations": [{"raw": "New York, NY", "is_us": True, "country_code": "US"}],
+            })
+        for i in range(run * 4 - 6, run * 4 - 3):
+            jobs.pop(i, None)
+        for i, job in jobs.items():
+            job["url"] = f"https://boards.example.com/{i}?run={run}"
+            job["last_seen_at"] = f"2025-01-0{run + 1}"
+            if (i + run) % 5 == 0:
+                job["title"] = f"Senior Engineer {i} r{run}"
+            if (i + run) % 7 == 0:
+                job["locations"] = job["locations"] + [{"raw": "Remote - US", "is_us": True, "is_remote": True}]
+            if (i + run) % 6 == 0:
+                job["status"] = "closed" if job["status"] == "open" else "open"
+            if (i + run) % 8 == 0:
+                job["posted_at"] = f"2025-01-0{run + 1}"
+            if (i + run) % 3 == 0:
+                job["seniority"] = "Senior" if job.get("seniority") != "Senior" else "Mid"
+        records = []
+        for i, job in sorted(jobs.items()):
+            rec = json.loads(json.dumps(job))
+            if i % 4:
+                rec["fingerprint"] = diff.job_fingerprint(rec)
+            records.append(rec)
+        out.append((f"2025-01-0{run + 1}T08-00-00Z", records))
+    return out
+
+
+def _full_diff(prev, curr):
+    """Reference: cards of both runs, every common job compared field by field."""
+    prev_cards = {c["job_key"]: c for c in map(diff._create_job_card, prev)}
+    curr_cards = {c["job_key"]: c for c in map(diff._create_job_card, curr)}
+    changed = {}
+    for k in prev_cards.keys() & curr_cards.keys():
+        changes = diff._detect_changes(prev_cards[k], curr_cards[k])
+        if changes:
+            changed[k] = dict(curr_cards[k], changes=changes)
+    return {
+        "added": {k: c for k, c in curr_cards.items() if k not in prev_cards},
+        "removed": {k: c for k, c in prev_cards.items() if k not in curr_cards},
+        "changed": changed,
+    }
+
+
+def _by_key(d):
+    return {part: {c["job_key"]: c for c in d[part]} for part in ("added", "removed", "changed")}
+
+
+def _save(records, directory, ts, storage):
+    if storage == "json":
+        return snapshots.save(records, os.path.join(directory, ts + ".json"))
+    return history.save_snapshot(records, directory, ts)
+
+
+def _check_sequence(storage, differ):
+    """Runs every run through `differ(ts, records, directory, n)` and compares it with _full_diff."""
+    with temp_db(), tempfile.TemporaryDirectory() as d:
+        prev = []
+        for n, (ts, records) in enumerate(_runs()):
+            got = differ(ts, records, d, n)
+            assert got == _full_diff(prev, records), (storage, ts)
+            _save(records, d, ts, storage)
+            prev = records
+        exts = {snapshots.split_ext(p)[1] for p in snapshots.list_files(d).values()}
+        assert exts == ({".json"} if storage == "json" else {snapshots.SNAPSHOT_EXT, history.DELTA_EXT}), exts
+
+
+def test_build_diff_matches_full_comparison():
+    for storage in ("delta", "json"):
+        _check_sequence(storage, lambda ts, records, d, n: _by_key(diff.build_diff("acme", ts, records, d)))
+
+
+def test_card_cache_matches_full_comparison():
+    def differ(ts, records, d, n):
+        prev_path = diff.get_previous_snapshot_path(d, ts)
+        if n > 1:
+            # From the third run on, the previous side comes from the cache
+            assert card_cache.load("acme", snapshots.timestamp_from_path(prev_path)) is not None
+        return _by_key(diff.build_diff("acme", ts, records, d, use_card_cache=True))
+
+    for storage in ("delta", "json"):
+        _check_sequence(storage, differ)
+
+
+def test_stream_diff_matches_build_diff():
+    def differ(use_card_cache):
+        def run(ts, records, d, n):
+            expected = diff.build_diff("acme", ts, records, d)
+            path, sync = diff.stream_diff(
+                "acme", ts, sorted(records, key=diff.sort_key), d,
+                os.path.join(d, "diffs", f"{ts}{snapshots.DIFF_EXT}"), use_card_cache=use_card_cache,
+            )
+            got = snapshots.load(path)
+            assert got["summary"] == sync["summary"] == expected["summary"], ts
+            assert sync["added"] == [diff._sync_card(c) for c in got["added"]]
+            assert sync["removed"] == [diff._sync_card(c) for c in got["removed"]]
+            assert sync["changed"] == [{"job_key": c["job_key"], "changes": c["changes"]} for c in got["changed"]]
+            assert _by_key(got) == _by_key(expected), ts
+            return _by_key(got)
+        return run
+
+    for storage in ("delta", "json"):
+        for use_card_cache in (False, True):
+            _check_sequence(storage, differ(use_card_cache))
+
+
+def test_previous_snapshot_ignores_stale_manifest():
+    with temp_db(), tempfile.TemporaryDirectory() as d:
+        first = os.path.join(d, "2025-01-01T08-00-00Z" + snapshots.SNAPSHOT_EXT)
+        second = os.path.join(d, "2025-01-02T08-00-00Z" + snapshots.SNAPSHOT_EXT)
+        snapshots.save([{"id": 1}], first)
+        snapshots.save([{"id": 1}, {"id": 2}], second)
+
+        # The second run's file is on disk but its manifest row was never written
+        manifest.record("acme", "greenhouse", "2025-01-01T08-00-00Z", "filtered", first, 1)
+        assert diff.get_previous_snapshot_path(d, "2025-01-03T08-00-00Z", "acme") == second
+
+        manifest.record("acme", "greenhouse", "2025-01-02T08-00-00Z", "filtered", second, 2)
+        assert diff.get_previous_snapshot_path(d, "2025-01-03T08-00-00Z", "acme") == second
+        assert diff.get_previous_snapshot_path(d, "2025-01-02T08-00-00Z", "acme") == first
+        assert diff.get_previous_snapshot_path(d, "2025-01-01T08-00-00Z", "acme") is None
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"{name:<45} | PASS")
+    print("\nAll diff tests passed!")
@@ -4,7 +4,7 @@ import os
 # Ensure src is in path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.utils import is_valid_job, normalize_title, calculate_title_score
+from src.utils import is_valid_job, normalize_title, calculate_title_score, classify_title
 
 test_cases = [
     # Should be ACCEPTED
@@ -52,3 +52,30 @@ if failures == 0:
     print("\nAll tests passed!")
 else:
     print(f"\n{failures} tests failed.")
+
+# classify_title must agree with is_valid_job and tag seniority/discipline in the same pass
+tag_cases = [
+    ("Senior Data Scientist – Agentic AI & Decision Intelligence", "Senior", "ML"),
+    ("Staff Applied Scientist, ML – Recommendations", "Staff+", "ML"),
+    ("Site Reliability Engineer", "Mid", "Platform"),
+    ("Marketing Intern", "Intern", "Other"),
+]
+
+print()
+tag_failures = 0
+for title, seniority, discipline in tag_cases:
+    tags = classify_title(title)
+    ok = (
+        tags["seniority"] == seniority
+        and tags["discipline"] == discipline
+        and tags["is_relevant"] == is_valid_job(title)
+    )
+    if not ok:
+        tag_failures += 1
+        print(f"DEBUG: {title}: {tags}")
+    print(f"{title[:60]:<60} | {seniority + '/' + discipline:<20} | {'PASS' if ok else 'FAIL':<10}")
+
+if tag_failures == 0:
+    print("\nAll tag tests passed!")
+else:
+    print(f"\n{tag_failures} tag tests failed.")
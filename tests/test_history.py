@@ -0,0 +1,79 @@
+import sys
+import os
+import tempfile
+
+# Ensure src is in path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.storage import archive, history, snapshots
+
+
+def _runs(n):
+    """n consecutive runs of a board: each adds and edits a job; some drop a job or a field."""
+    jobs = {i: {"id": i, "title": f"Engineer {i}", "location": "Remote"} for i in range(20)}
+    out = []
+    for day in range(n):
+        jobs[100 + day] = {"id": 100 + day, "title": f"New role {day}", "location": "NYC"}
+        if day % 20 in jobs:
+            jobs[day % 20]["title"] = f"Engineer {day % 20} v{day}"
+        if day % 3 == 0:
+            jobs.pop((day + 7) % 20, None)
+        if day % 4 == 1:
+            jobs[99 + day].pop("location")
+        out.append((f"2025-01-{day + 1:02d}T08-00-00Z", [dict(j) for j in jobs.values()]))
+    return out
+
+
+def _save_all(directory, runs):
+    return [history.save_snapshot(data, directory, ts)[0] for ts, data in runs]
+
+
+def test_delta_round_trip_across_checkpoint():
+    runs = _runs(history.CHECKPOINT_INTERVAL * 2 + 2)
+    with tempfile.TemporaryDirectory() as d:
+        paths = _save_all(d, runs)
+
+        # Full base every CHECKPOINT_INTERVAL runs, deltas in between
+        bases = [i for i, p in enumerate(paths) if not p.endswith(history.DELTA_EXT)]
+        assert bases == [0, history.CHECKPOINT_INTERVAL, 2 * history.CHECKPOINT_INTERVAL], bases
+
+        for (ts, data), path in zip(runs, paths):
+            assert history.load_snapshot(path) == data, ts
+        assert [rec for _, _, rec in history.iter_snapshots(d)] == [data for _, data in runs]
+
+        # A materialized delta stays equal, and so do the deltas built on top of it
+        i = history.CHECKPOINT_INTERVAL - 1
+        full_path, _ = history.materialize(paths[i])
+        assert not os.path.exists(paths[i])
+        assert history.load_snapshot(full_path) == runs[i][1]
+        assert history.load_snapshot(paths[history.CHECKPOINT_INTERVAL + 1]) == runs[history.CHECKPOINT_INTERVAL + 1][1]
+
+
+def test_delta_round_trip_from_archive():
+    runs = _runs(history.CHECKPOINT_INTERVAL - 2)
+    with tempfile.TemporaryDirectory() as d:
+        paths = _save_all(d, runs)
+
+        # Roll all but the newest run into the month's archive
+        zip_path = archive.archive_path(d, "2025-01")
+        archive.add(zip_path, {os.path.basename(p): snapshots.read_bytes(p) for p in paths[:-1]})
+        for p in paths[:-1]:
+            os.remove(p)
+
+        for (ts, data), path in zip(runs[:-1], paths):
+            member = archive.member_path(zip_path, os.path.basename(path))
+            assert archive.is_archived(member)
+            assert history.load_snapshot(member) == data, ts
+
+        # A hot delta whose base chain is archived still resolves
+        assert paths[-1].endswith(history.DELTA_EXT)
+        assert history.load_snapshot(paths[-1]) == runs[-1][1]
+        assert [rec for _, _, rec in history.iter_snapshots(d)] == [data for _, data in runs]
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"{name:<45} | PASS")
+    print("\nAll history tests passed!")
@@ -0,0 +1,54 @@
+import sys
+import os
+import random
+from datetime import date, timedelta
+
+# Ensure src is in path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.analytics.intervals import rebuild_lifespan_hist, sync_intervals
+from helpers import temp_db
+
+
+def _hist(conn, company_slug):
+    return (
+        sorted(conn.execute(
+            "SELECT open_date, count FROM lifespan_open_hist WHERE company_slug=? AND count > 0",
+            (company_slug,),
+        )),
+        sorted(conn.execute(
+            "SELECT close_date, days_open, count FROM lifespan_closed_hist WHERE company_slug=? AND count > 0",
+            (company_slug,),
+        )),
+    )
+
+
+def test_trigger_histograms_match_rebuild():
+    with temp_db() as conn:
+        rng = random.Random(7)
+        for slug in ("acme", "globex"):
+            live = set()
+            for n in range(60):
+                day = (date(2025, 1, 1) + timedelta(days=n)).isoformat()
+                removed = {k for k in live if rng.random() < 0.1}
+                live -= removed
+                # New postings and reposts of earlier keys (new intervals of the same job)
+                live |= {f"{slug}-{rng.randrange(80)}" for _ in range(3)}
+                sync_intervals(conn, slug, day, [(k, None) for k in sorted(live)], removed)
+
+        # Direct edits go through the same triggers
+        conn.execute("UPDATE job_intervals SET close_date='2025-03-15' WHERE company_slug='acme' AND close_date IS NULL AND job_key LIKE '%1'")
+        conn.execute("DELETE FROM job_intervals WHERE company_slug='globex' AND job_key LIKE '%7'")
+        conn.commit()
+
+        for slug in ("acme", "globex"):
+            incremental = _hist(conn, slug)
+            assert incremental[0] and incremental[1], slug
+            rebuild_lifespan_hist(conn, slug)
+            assert _hist(conn, slug) == incremental, slug
+
+
+if __name__ == "__main__":
+    test_trigger_histograms_match_rebuild()
+    print(f"{'test_trigger_histograms_match_rebuild':<45} | PASS")
+    print("\nAll interval tests passed!")
@@ -0,0 +1,77 @@
+import sys
+import os
+import random
+from datetime import date, timedelta
+
+# Ensure src is in path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.analytics.intervals import sync_intervals
+from src.analytics.lifespan import compute_company_lifespan_history, compute_company_lifespan_summary
+from helpers import temp_db
+
+START = date(2025, 1, 1)
+DAYS = 120
+WINDOWS = (7, 30, 180)
+
+
+def _day(n):
+    return (START + timedelta(days=n)).isoformat()
+
+
+def _fixture(conn):
+    """Jobs that close and come back (reposts, same key or a clustered copy), some never closing."""
+    rng = random.Random(5)
+    live = set()
+    for n in range(DAYS):
+        removed = {k for k in live if not k.startswith("keep") and rng.random() < 0.08}
+        live -= removed
+        live |= {f"job-{rng.randrange(60)}" for _ in range(2)}
+        if n % 17 == 0:
+            live.add(f"keep-{n}")  # open until the end
+        # job-N and job-(N+30) are copies of one role
+        present = [(k, "role-" + str(int(k.split("-")[1]) % 30) if k.startswith("job") else None) for k in sorted(live)]
+        sync_intervals(conn, "acme", _day(n), present, removed)
+    conn.commit()
+
+
+def _direct_counts(conn, as_of, window):
+    """Closed intervals in the window and open intervals by age, counted straight from the rows."""
+    start = (date.fromisoformat(as_of) - timedelta(days=window - 1)).isoformat()
+    closed = open_ = old = 0
+    for open_date, close_date in conn.execute("SELECT open_date, close_date FROM job_intervals WHERE company_slug='acme'"):
+        if close_date and start <= close_date <= as_of and close_date >= open_date:
+            closed += 1
+        if open_date <= as_of and (close_date is None or close_date > as_of):
+            open_ += 1
+            old += (date.fromisoformat(as_of) - date.fromisoformat(open_date)).days + 1 > 30
+    return closed, open_, old
+
+
+def test_sweep_matches_per_date_summaries():
+    with temp_db() as conn:
+        _fixture(conn)
+        assert conn.execute("SELECT COUNT(*) FROM job_intervals WHERE is_repost=1").fetchone()[0] > 0
+        assert conn.execute("SELECT COUNT(*) FROM job_intervals WHERE close_date IS NULL").fetchone()[0] > 0
+
+        dates = [_day(n) for n in range(0, DAYS + 10, 3)]
+        for by_role in (False, True):
+            swept = compute_company_lifespan_history("acme", dates, window_days=WINDOWS, by_role=by_role, conn=conn)
+            assert len(swept) == len(dates) * len(WINDOWS)
+            for as_of in dates:
+                for w in WINDOWS:
+                    direct = compute_company_lifespan_summary("acme", as_of, window_days=w, by_role=by_role, conn=conn)
+                    assert swept[(as_of, w)] == direct, (by_role, as_of, w)
+
+                    if not by_role:
+                        s = swept[(as_of, w)]
+                        n_open = sum((s.age_bucket_0_3, s.age_bucket_4_7, s.age_bucket_8_14, s.age_bucket_15_30, s.age_bucket_30_plus))
+                        assert (s.closed_roles_count, n_open, s.age_bucket_30_plus) == _direct_counts(conn, as_of, w)
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"{name:<45} | PASS")
+    print("\nAll lifespan tests passed!")
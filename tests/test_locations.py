@@ -0,0 +1,60 @@
+import sys
+import os
+
+# Ensure src is in path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils import parse_location
+
+
+def _facets(location):
+    r = parse_location(location)
+    return r["city"], r["state"], r["metro"], r["country_code"], r["is_remote"]
+
+
+def test_city_state():
+    assert _facets("Austin, TX") == ("Austin", "TX", "Austin Metro", "US", False)
+    assert _facets("Mountain View, CA") == ("Mountain View", "CA", "SF Bay Area", "US", False)
+    assert _facets("Washington, DC") == ("Washington", "DC", "Washington DC Metro", "US", False)
+    # The state code picks among cities sharing a name; lowercase words are never states
+    assert _facets("Portland, OR")[:2] == ("Portland", "OR")
+    assert _facets("Portland, ME")[:2] == ("Portland", "ME")
+    assert _facets("Albany, New York")[:2] == ("Albany", "NY")
+    assert _facets("Washington")[:3] == (None, "WA", None)
+
+
+def test_metro_alias():
+    assert _facets("NYC, NY") == ("New York", "NY", "New York Metro", "US", False)
+    assert _facets("Bay Area, CA") == (None, "CA", "SF Bay Area", "US", False)
+    assert _facets("Greater Seattle Area, WA") == (None, "WA", "Seattle Metro", "US", False)
+    # Facets are only resolved once the string is known to be US
+    assert _facets("Bay Area") == (None, None, None, None, False)
+
+
+def test_remote():
+    assert _facets("Remote - US") == (None, None, None, "US", True)
+    assert _facets("US-Remote") == (None, None, None, "US", True)
+    assert _facets("Remote") == (None, None, None, None, True)
+    r = parse_location("Remote - Canada")
+    assert (r["is_us"], r["is_remote"], r["has_non_us_marker"]) == (False, True, True)
+    assert parse_location(None)["raw"] is None
+
+
+def test_multi_location_strings():
+    # The first location wins ...
+    assert _facets("New York, NY; San Francisco, CA") == ("New York", "NY", "New York Metro", "US", False)
+    assert _facets("San Francisco, CA | New York, NY") == ("San Francisco", "CA", "SF Bay Area", "US", False)
+    assert _facets("Austin, TX, Portland, ME")[:2] == ("Austin", "TX")
+    assert _facets("Portland, ME / Austin, TX")[:2] == ("Portland", "ME")
+    assert _facets("Seattle, WA or Remote") == ("Seattle", "WA", "Seattle Metro", "US", True)
+    # ... unless the only state given belongs to a later city
+    assert _facets("Denver; Austin, TX") == ("Austin", "TX", "Austin Metro", "US", False)
+    assert _facets("Boston or Portland, OR")[:2] == ("Portland", "OR")
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"{name:<45} | PASS")
+    print("\nAll location tests passed!")
@@ -0,0 +1,83 @@
+import sys
+import os
+
+# Ensure src is in path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.news.processor import NewsProcessor, match_categories
+from helpers import temp_db
+
+
+def _article(n, title="Acme update", description="", day="2025-03-01"):
+    return {
+        "url": f"https://news.example.com/{n}", "title": title, "description": description,
+        "publishedAt": f"{day}T12:00:00Z", "source": {"name": "Example"},
+    }
+
+
+def _counts(conn):
+    return tuple(conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in ("raw_news", "normalized_news", "news_labels"))
+
+
+def test_reingest_inserts_nothing():
+    batch = [_article(1), _article(2, day="2025-03-02"), _article(1), _article(3, day="2025-03-02")]
+    with temp_db() as conn:
+        processor = NewsProcessor()
+        assert processor.process_and_store(batch, "acme", "gnews", "Acme", conn=conn) == 3
+        assert processor.touched == {("acme", "2025-03-01"), ("acme", "2025-03-02")}
+        counts = _counts(conn)
+        assert counts[:2] == (3, 3)
+
+        # The next run fetches the same articles (plus one new)
+        processor = NewsProcessor()
+        assert processor.process_and_store(batch, "acme", "gnews", "Acme", conn=conn) == 0
+        assert processor.touched == set()
+        assert _counts(conn) == counts
+        assert processor.process_and_store(batch + [_article(4, day="2025-03-04")], "acme", "gnews", conn=conn) == 1
+        assert processor.touched == {("acme", "2025-03-04")}
+
+        conn.commit()
+
+        # Without a conn it commits on its own and still skips known articles
+        processor = NewsProcessor()
+        assert processor.process_and_store(batch + [_article(5)], "acme", "gnews") == 1
+        assert processor.touched == {("acme", "2025-03-01")}
+        assert _counts(conn)[:2] == (5, 5)
+
+
+def test_labels_hold_every_category():
+    with temp_db() as conn:
+        articles = [
+            _article(1, "Acme raised Series B funding and is hiring", "Quarterly results beat estimates."),
+            _article(2, "Acme update", "Nothing to see."),
+        ]
+        assert NewsProcessor().process_and_store(articles, "acme", "gnews", conn=conn) == 2
+        rows = conn.execute('''
+            SELECT n.source_url, n.news_category, l.category, l.hit_count, l.positions
+            FROM normalized_news n JOIN news_labels l ON l.news_id = n.id
+        ''').fetchall()
+    labels = {(url[-1], cat): (hits, pos) for url, _, cat, hits, pos in rows}
+    assert labels == {
+        ("1", "earnings"): (1, "44"),
+        ("1", "funding"): (3, "5,12,21"),
+        ("1", "hiring"): (1, "36"),
+        ("2", "other"): (0, ""),
+    }
+    # The primary category is the first matched one in CATEGORIES order
+    assert {url[-1]: primary for url, primary, *_ in rows} == {"1": "earnings", "2": "other"}
+
+
+def test_longer_keyword_overrules_keywords_inside_it():
+    assert match_categories("Acme announces hiring freeze") == {"layoff": [15]}
+    assert match_categories("Hiring freeze at Acme; Beta is hiring") == {"layoff": [0], "hiring": [31]}
+    assert match_categories("Acme is hiring") == {"hiring": [8]}
+    assert match_categories("acme to acquire beta in merger") == {"acquisition": [8, 24]}
+    assert match_categories("") == {}
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"{name:<45} | PASS")
+    print("\nAll news tests passed!")
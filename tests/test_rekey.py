@@ -0,0 +1,67 @@
+import sys
+import os
+
+# Ensure src is in path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.analytics.intervals import rebuild_lifespan_hist
+from scripts.rekey_jobs import rekey_company
+from helpers import temp_db
+from test_intervals import _hist
+
+
+def test_rekey_with_collision_keeps_intervals_rtree_and_histograms_in_sync():
+    with temp_db() as conn:
+        conn.executemany(
+            "INSERT INTO job_intervals (company_slug, job_key, role_key, open_date, close_date) VALUES (?, ?, ?, ?, ?)",
+            [
+                # Same posting stored under both keys for the same open date: a collision
+                ("acme", "legacy-1", "legacy-1", "2025-01-01", "2025-01-20"),
+                ("acme", "stable-1", "stable-1", "2025-01-01", None),
+                ("acme", "legacy-1", "legacy-1", "2025-02-01", None),
+                # Clustered with legacy-1, so its role key follows the re-keyed cluster
+                ("acme", "legacy-2", "legacy-1", "2025-01-05", "2025-01-08"),
+                ("acme", "other", "other", "2025-01-03", None),
+            ],
+        )
+        conn.executemany(
+            "INSERT INTO job_clusters (company_slug, job_key, cluster_id, signature) VALUES (?, ?, ?, ?)",
+            [("acme", "legacy-1", "legacy-1", b""), ("acme", "legacy-2", "legacy-1", b"")],
+        )
+        conn.executemany(
+            "INSERT INTO job_lifecycle (company_slug, job_key, first_seen_date, last_seen_date, cluster_id) VALUES (?, ?, ?, ?, ?)",
+            [("acme", "legacy-1", "2025-01-01", "2025-02-01", "legacy-1"), ("acme", "legacy-2", "2025-01-05", "2025-01-07", "legacy-1")],
+        )
+        conn.commit()
+
+        rekey_company(conn, "acme", {"legacy-1": "stable-1", "legacy-2": "stable-2"})
+        conn.commit()
+
+        intervals = sorted(conn.execute("SELECT job_key, role_key, open_date, close_date FROM job_intervals"))
+        assert intervals == [
+            ("other", "other", "2025-01-03", None),
+            ("stable-1", "stable-1", "2025-01-01", "2025-01-20"),
+            ("stable-1", "stable-1", "2025-02-01", None),
+            ("stable-2", "stable-1", "2025-01-05", "2025-01-08"),
+        ], intervals
+
+        # Every interval indexed once, no orphans left in the rtree
+        ids = sorted(r[0] for r in conn.execute("SELECT id FROM job_intervals"))
+        assert sorted(r[0] for r in conn.execute("SELECT id FROM job_intervals_rtree")) == ids
+
+        incremental = _hist(conn, "acme")
+        rebuild_lifespan_hist(conn, "acme")
+        assert _hist(conn, "acme") == incremental
+
+        assert sorted(conn.execute("SELECT job_key, cluster_id FROM job_clusters")) == [
+            ("stable-1", "stable-1"), ("stable-2", "stable-1"),
+        ]
+        assert sorted(conn.execute("SELECT job_key, cluster_id FROM job_lifecycle")) == [
+            ("stable-1", "stable-1"), ("stable-2", "stable-1"),
+        ]
+
+
+if __name__ == "__main__":
+    test_rekey_with_collision_keeps_intervals_rtree_and_histograms_in_sync()
+    print(f"{'test_rekey_with_collision':<45} | PASS")
+    print("\nAll rekey tests passed!")
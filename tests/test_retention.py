@@ -0,0 +1,83 @@
+import sys
+import os
+import tempfile
+from datetime import date, datetime, timedelta
+
+# Ensure src is in path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.storage import archive, history, snapshots
+from src.storage.retention import apply_retention
+from helpers import temp_db
+
+START = date(2025, 1, 20)
+RUNS = 30  # crosses a month boundary, several checkpoints
+
+
+def _ts(n):
+    return (START + timedelta(days=n)).strftime("%Y-%m-%dT08-00-00Z")
+
+
+def _records(n):
+    return [{"job_key": f"k{i}", "title": f"Engineer {i}", "run": n if i % 3 == 0 else 0} for i in range(n, n + 10)]
+
+
+def _check_dependencies(directory):
+    """Every delta's base sits in the same file set: the hot directory, or the delta's own archive."""
+    hot = snapshots.list_files(directory)
+    for ts, path in snapshots.list_files(directory, include_archived=True).items():
+        if snapshots.split_ext(path)[1] != history.DELTA_EXT:
+            continue
+        base_ts = snapshots.load_raw(path)["delta_of"]
+        if archive.is_archived(path):
+            assert archive.find_member(archive.split(path)[0], base_ts, snapshots.KNOWN_EXTS), (ts, base_ts)
+        else:
+            assert base_ts in hot, (ts, base_ts)
+
+
+def _check_history(directory):
+    _check_dependencies(directory)
+    files = snapshots.list_files(directory, include_archived=True)
+    assert sorted(files) == [_ts(n) for n in range(RUNS)]
+    for n in range(RUNS):
+        assert history.load_snapshot(files[_ts(n)]) == _records(n), _ts(n)
+    assert [data for _, _, data in history.iter_snapshots(directory)] == [_records(n) for n in range(RUNS)]
+
+
+def test_retention_keeps_every_delta_base():
+    policy = {"filtered": {"hot_days": 10, "keep_min": 3}}
+    with temp_db() as conn, tempfile.TemporaryDirectory() as root:
+        directory = os.path.join(root, "greenhouse", "acme")
+        for n in range(RUNS):
+            history.save_snapshot(_records(n), directory, _ts(n))
+        assert sum(snapshots.split_ext(p)[1] == history.DELTA_EXT for p in snapshots.list_files(directory).values()) > RUNS // 2
+
+        def consume_through(n):
+            conn.execute(
+                "INSERT OR REPLACE INTO company_open_now_daily (company_slug, date, run_timestamp, open_now_count) VALUES ('acme', ?, ?, 10)",
+                (_ts(n)[:10], _ts(n)),
+            )
+            conn.commit()
+
+        # Synced through run 21: later runs past the cutoff are refused, so the
+        # hot head is a delta whose base is leaving
+        consume_through(21)
+        totals = apply_retention(policy, now=datetime(2025, 2, 28), roots={"filtered": root})["filtered"]
+        assert totals["archived"] == 22 and totals["refused"] == 5, totals
+        assert min(snapshots.list_files(directory)) == _ts(22)
+        _check_history(directory)
+
+        # Next pass appends to the existing February archive
+        consume_through(RUNS - 1)
+        totals = apply_retention(policy, now=datetime(2025, 3, 31), roots={"filtered": root})["filtered"]
+        assert totals["archived"] == RUNS - 3 - 22 and totals["refused"] == 0, totals
+        assert sorted(snapshots.list_files(directory)) == [_ts(n) for n in range(RUNS - 3, RUNS)]
+        _check_history(directory)
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"{name:<45} | PASS")
+    print("\nAll retention tests passed!")
@@ -0,0 +1,96 @@
+import sys
+import os
+import random
+from datetime import date, timedelta
+
+# Ensure src is in path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.analytics.signal_engine import compute_signals, iter_signal_history
+from helpers import temp_db
+from signal_reference import reference_company_signal
+
+START = date(2025, 1, 1)
+DAYS = 70
+
+
+def _day(n):
+    return (START + timedelta(days=n)).isoformat()
+
+
+def _fixture(conn, companies=12):
+    """Randomized signal inputs; some companies start late, skip days or lack whole tables."""
+    rng = random.Random(11)
+    for i in range(companies):
+        slug = f"co{i}"
+        first = rng.randrange(0, 30)
+        open_now = rng.randrange(0, 200)
+        for n in range(first, DAYS):
+            if rng.random() < 0.2:
+                continue  # no run that day
+            added, removed = rng.randrange(0, 25), rng.randrange(0, 25)
+            open_now = max(0, open_now + added - removed)
+            conn.execute(
+                "INSERT INTO job_diffs_daily (company_slug, date, run_timestamp, added_count, removed_count, changed_count) VALUES (?, ?, ?, ?, ?, 0)",
+                (slug, _day(n), _day(n) + "T08-00-00Z", added, removed),
+            )
+            conn.execute(
+                "INSERT INTO company_open_now_daily (company_slug, date, run_timestamp, open_now_count) VALUES (?, ?, ?, ?)",
+                (slug, _day(n), _day(n) + "T08-00-00Z", open_now),
+            )
+            if i % 3:
+                for disc in rng.sample(["ML", "Data", "Platform", "Infra", None], 2):
+                    conn.execute(
+                        "INSERT OR REPLACE INTO job_diffs_discipline_daily (company_slug, date, discipline, added_count, removed_count) VALUES (?, ?, ?, ?, ?)",
+                        (slug, _day(n), disc, rng.randrange(0, 10), rng.randrange(0, 10)),
+                    )
+            if i % 4 and rng.random() < 0.5:
+                conn.execute(
+                    "INSERT INTO company_lifespan_daily (company_slug, date, window_days, median_days, pct_close_within_7d, pct_open_gt_30d) VALUES (?, ?, 180, ?, ?, ?)",
+                    (slug, _day(n), rng.uniform(3, 60), rng.random(), rng.random()),
+                )
+            if i % 2 and rng.random() < 0.3:
+                major = rng.random() < 0.3
+                conn.execute(
+                    "INSERT INTO company_news_daily (company_slug, date, article_count, has_major_event, top_headline_title, top_headline_url) VALUES (?, ?, ?, ?, ?, ?)",
+                    (slug, _day(n), rng.randrange(0, 4), int(major), f"{slug} news {n}", f"https://example.com/{slug}/{n}"),
+                )
+    conn.commit()
+
+
+def test_bulk_signals_match_per_company_reference():
+    with temp_db() as conn:
+        _fixture(conn)
+        slugs = [r[0] for r in conn.execute("SELECT DISTINCT company_slug FROM job_diffs_daily")]
+        for lookback in (7, 14):
+            for n in (5, 29, 45, DAYS - 1):
+                signals = compute_signals(_day(n), lookback_days=lookback, conn=conn)
+                for slug in slugs:
+                    expected = reference_company_signal(slug, _day(n), lookback_days=lookback, conn=conn)
+                    assert signals[slug] == expected, (slug, _day(n), lookback)
+
+
+def test_signal_history_matches_daily_compute():
+    with temp_db() as conn:
+        _fixture(conn)
+        first_diff = dict(conn.execute("SELECT company_slug, MIN(date) FROM job_diffs_daily GROUP BY company_slug"))
+        start, end = _day(20), _day(DAYS - 1)
+        seen = set()
+        for slug, sigs in iter_signal_history(start, end, lookback_days=7, conn=conn):
+            assert [s.date for s in sigs] == sorted(s.date for s in sigs)
+            for sig in sigs:
+                assert sig == compute_signals(sig.date, lookback_days=7, conn=conn)[slug], (slug, sig.date)
+                seen.add((slug, sig.date))
+        expected = {
+            (slug, _day(n)) for slug, first in first_diff.items()
+            for n in range(20, DAYS) if _day(n) >= first
+        }
+        assert seen == expected
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"{name:<45} | PASS")
+    print("\nAll signal tests passed!")
@@ -0,0 +1,73 @@
+import sys
+import os
+import threading
+
+# Ensure src is in path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.storage.writer import SnapshotWriter
+
+
+def _fail(message):
+    raise IOError(message)
+
+
+def test_failed_write_surfaces_through_result():
+    with SnapshotWriter() as writer:
+        ok = writer.submit(lambda: "written")
+        failed = writer.submit(_fail, "disk full")
+        after = writer.submit(lambda: "still written")
+        try:
+            failed.result(timeout=5)
+            assert False, "expected the write error"
+        except IOError as e:
+            assert str(e) == "disk full"
+        # One failure does not stop the writer
+        assert ok.result(timeout=5) == "written"
+        assert after.result(timeout=5) == "still written"
+    assert (writer.stats["submitted"], writer.stats["written"], writer.stats["failed"]) == (3, 2, 1)
+
+
+def test_flush_waits_for_every_write_and_backlog_counts_queued_ones():
+    release = threading.Event()
+    started = threading.Event()
+    done = []
+
+    def slow(i):
+        started.set()
+        release.wait(5)
+        done.append(i)
+
+    with SnapshotWriter(max_pending=8) as writer:
+        writer.submit(slow, 0)
+        assert started.wait(5)
+        for i in range(1, 4):
+            writer.submit(done.append, i)
+        # The first write is running; the other three are queued behind it
+        assert writer.backlog() == 3
+
+        flushed = threading.Event()
+        threading.Thread(target=lambda: (writer.flush(), flushed.set()), daemon=True).start()
+        assert not flushed.wait(0.2)
+        release.set()
+        assert flushed.wait(5)
+        assert done == [0, 1, 2, 3]
+        assert writer.backlog() == 0
+
+        # A failed write still releases the barrier
+        writer.submit(_fail, "boom")
+        writer.flush()
+        assert writer.stats["failed"] == 1
+    try:
+        writer.submit(done.append, 4)
+        assert False, "expected a closed writer to refuse writes"
+    except RuntimeError:
+        pass
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_"):
+            fn()
+            print(f"{name:<45} | PASS")
+    print("\nAll writer tests passed!")